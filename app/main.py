@@ -1,7 +1,7 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from api.middleware import LoggingMiddleware  # Middleware personalizado para logueo
-from api.routers.user_router import router as user_router  # Router para usuarios
+from src.api.middleware import CompressionMiddleware, LoggingMiddleware  # Middleware personalizado
+from src.api.routers import router as content_router  # Router de generación de contenido
 from fastapi.responses import JSONResponse
 import logging
 
@@ -25,10 +25,12 @@ app.add_middleware(
 # Añadir middleware global (para todas las rutas)
 # El middleware se ejecutará en todas las solicitudes y respuestas
 app.add_middleware(LoggingMiddleware)
+# Compresión brotli/gzip de las respuestas JSON (la más externa: comprime lo que devuelven las demás)
+app.add_middleware(CompressionMiddleware)
 
 # Incluir los routers (para manejar las rutas de la API)
 # Aquí se agregan todos los routers definidos en otros archivos
-app.include_router(user_router)
+app.include_router(content_router)
 
 # Manejo de errores global
 
@@ -0,0 +1,175 @@
+"""
+Utilidades de medición: latencias, percentiles, throughput, memoria y comparación con baseline.
+"""
+import json
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    """Resultado de un escenario de benchmark."""
+    name: str
+    iterations: int
+    concurrency: int
+    throughput: float  # Operaciones por segundo
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    peak_rss_mb: float
+    errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """
+    Percentil con interpolación lineal (mismo criterio que numpy por defecto).
+
+    Args:
+        samples (Sequence[float]): Muestras
+        pct (float): Percentil entre 0 y 100
+
+    Returns:
+        float: Valor del percentil (0.0 si no hay muestras)
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_mb() -> float:
+    """Pico de memoria residente del proceso actual en MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devuelve KB; macOS, bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_benchmark(
+    name: str,
+    fn: Callable[[int], Any],
+    iterations: int = 50,
+    warmup: int = 3,
+    concurrency: int = 1
+) -> BenchmarkResult:
+    """
+    Ejecuta `fn(i)` `iterations` veces y mide la latencia de cada llamada.
+
+    Args:
+        name (str): Nombre del escenario
+        fn (Callable[[int], Any]): Operación a medir; recibe el índice de iteración
+        iterations (int): Número de llamadas medidas
+        warmup (int): Llamadas previas no medidas (cachés, conexiones...)
+        concurrency (int): Llamadas simultáneas
+
+    Returns:
+        BenchmarkResult: Throughput, percentiles de latencia y pico de RSS
+    """
+    for i in range(warmup):
+        fn(-(i + 1))
+
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(i: int) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            fn(i)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(timed, range(iterations)))
+    else:
+        samples = [timed(i) for i in range(iterations)]
+    elapsed = time.perf_counter() - start
+
+    for sample in samples:
+        if sample is None:
+            errors += 1
+        else:
+            latencies.append(sample * 1000)
+
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        concurrency=concurrency,
+        throughput=len(latencies) / elapsed if elapsed > 0 else 0.0,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+        mean_ms=sum(latencies) / len(latencies) if latencies else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+        errors=errors,
+    )
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Carga un baseline guardado (vacío si no existe)."""
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: List[BenchmarkResult]) -> None:
+    """Guarda los resultados como nuevo baseline."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({r.name: r.to_dict() for r in results}, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def compare_to_baseline(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.25,
+    slack_ms: float = 0.5
+) -> List[str]:
+    """
+    Detecta regresiones respecto al baseline.
+
+    Se considera regresión un p95 o un pico de RSS más de `tolerance` por encima
+    del baseline, un throughput más de `tolerance` por debajo, o nuevos errores.
+    `slack_ms` evita falsos positivos en escenarios de microsegundos.
+
+    Args:
+        results (List[BenchmarkResult]): Resultados actuales
+        baseline (Dict[str, Dict[str, Any]]): Resultados de referencia por escenario
+        tolerance (float): Margen relativo permitido
+        slack_ms (float): Margen absoluto añadido al límite de p95
+
+    Returns:
+        List[str]: Descripción de cada regresión
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        if result.p95_ms > reference["p95_ms"] * (1 + tolerance) + slack_ms:
+            regressions.append(f"{result.name}: p95 {result.p95_ms:.2f} ms > {reference['p95_ms']:.2f} ms")
+        if reference["mean_ms"] >= slack_ms and result.throughput < reference["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput:.1f}/s < {reference['throughput']:.1f}/s"
+            )
+        if result.peak_rss_mb > reference["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: RSS {result.peak_rss_mb:.1f} MB > {reference['peak_rss_mb']:.1f} MB"
+            )
+        if result.errors > reference.get("errors", 0):
+            regressions.append(f"{result.name}: {result.errors} errores")
+    return regressions
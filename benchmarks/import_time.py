@@ -0,0 +1,159 @@
+"""
+Benchmark del coste de importación de los puntos de entrada principales.
+
+Ejecuta `python -X importtime -c "import <módulo>"` en un proceso limpio para cada
+punto de entrada, extrae el tiempo acumulado y lo compara con el presupuesto de
+`import_budget.json`. Además comprueba que ningún punto de entrada arrastre
+backends pesados (torch, diffusers, langchain...) al importarse.
+
+Uso:
+    python -m benchmarks.import_time [--budget FICHERO] [--update]
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_FILE = Path(__file__).resolve().parent / "import_budget.json"
+
+# Módulos que nunca deberían cargarse solo por importar un punto de entrada
+HEAVY_MODULES = (
+    "torch",
+    "diffusers",
+    "numpy",
+    "PIL",
+    "langchain",
+    "langchain_community",
+    "deep_translator",
+    "chromadb",
+    "arxiv",
+)
+
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """
+    Mide el coste de importar un módulo en un intérprete nuevo.
+
+    Args:
+        module (str): Nombre del módulo a importar
+
+    Returns:
+        Dict[str, Any]: Tiempo acumulado en ms, módulos pesados cargados y error si lo hubo
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+
+    cumulative_us: Optional[int] = None
+    loaded: List[str] = []
+    error: Optional[str] = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Cabecera de la tabla
+        name = parts[2].strip()
+        loaded.append(name)
+        if name == module:
+            cumulative_us = int(parts[1])
+
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "error desconocido"
+
+    heavy = sorted({
+        name for name in loaded
+        if name.split(".")[0] in HEAVY_MODULES
+    })
+    return {
+        "module": module,
+        "cumulative_ms": cumulative_us / 1000 if cumulative_us is not None else None,
+        "heavy_modules": heavy,
+        "error": error,
+    }
+
+
+def load_budget(path: Path = DEFAULT_BUDGET_FILE) -> Dict[str, float]:
+    """Carga el presupuesto (ms por punto de entrada)."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Paquetes del propio proyecto: si falta uno de ellos es un error, no una dependencia opcional
+PROJECT_PACKAGES = ("src", "benchmarks", "app", "frontend")
+
+
+def missing_optional_dependency(error: Optional[str]) -> bool:
+    """True si el error es un ModuleNotFoundError de una dependencia externa no instalada."""
+    match = re.match(r"ModuleNotFoundError: No module named '([^']+)'", error or "")
+    return match is not None and match.group(1).split(".")[0] not in PROJECT_PACKAGES
+
+
+def check_budget(results: List[Dict[str, Any]], budget: Dict[str, float]) -> List[str]:
+    """
+    Compara los resultados con el presupuesto.
+
+    Args:
+        results (List[Dict[str, Any]]): Salida de `measure_import` por módulo
+        budget (Dict[str, float]): Milisegundos permitidos por módulo
+
+    Returns:
+        List[str]: Descripción de cada regresión encontrada (vacía si todo está bien)
+    """
+    failures = []
+    for result in results:
+        module = result["module"]
+        if result["error"]:
+            if not missing_optional_dependency(result["error"]):
+                failures.append(f"{module} no se puede importar: {result['error']}")
+            continue  # Dependencia opcional no instalada: no se puede medir
+        if result["heavy_modules"]:
+            failures.append(f"{module} importa backends pesados: {', '.join(result['heavy_modules'])}")
+        limit = budget.get(module)
+        if limit is not None and result["cumulative_ms"] > limit:
+            failures.append(f"{module}: {result['cumulative_ms']:.1f} ms > {limit:.1f} ms")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=Path, default=DEFAULT_BUDGET_FILE)
+    parser.add_argument("--update", action="store_true",
+                        help="Reescribe el presupuesto con 2x los tiempos medidos")
+    args = parser.parse_args(argv)
+
+    budget = load_budget(args.budget)
+    results = [measure_import(module) for module in budget]
+
+    for result in results:
+        if result["error"]:
+            print(f"{result['module']:<32} no medible ({result['error']})")
+        else:
+            print(f"{result['module']:<32} {result['cumulative_ms']:>9.1f} ms "
+                  f"(presupuesto {budget[result['module']]:.0f} ms)")
+
+    if args.update:
+        new_budget = {
+            r["module"]: round(max(r["cumulative_ms"] * 2, 20.0)) if not r["error"] else budget[r["module"]]
+            for r in results
+        }
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(new_budget, f, indent=4)
+            f.write("\n")
+        return 0
+
+    failures = check_budget(results, budget)
+    for failure in failures:
+        print(f"REGRESIÓN: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""
+Generador de carga para la API de generación de contenido.
+
+Reproduce mezclas configurables de plataformas, idiomas y temas contra una
+instancia en marcha (por ejemplo `python -m benchmarks.stub_app`), en lazo
+abierto (RPS objetivo, con escalones para buscar el punto de saturación) o en
+lazo cerrado (concurrencia fija). Registra latencias, errores, espera en cola
+del cliente y tiempo de proceso del servidor (`X-Process-Time`) por segundo,
+y emite un informe en JSON.
+
+Uso:
+    python -m benchmarks.loadtest --rps 2,4,8 --duration 30 --report informe.json
+    python -m benchmarks.loadtest --concurrency 16 --duration 60 --mix mezcla.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from benchmarks.harness import percentile
+
+
+@dataclass(slots=True)
+class TrafficMix:
+    """Mezcla de tráfico: pesos relativos por plataforma, idioma, tema y audiencia."""
+    platforms: Dict[str, float] = field(default_factory=lambda: {
+        "Twitter": 0.35, "Instagram": 0.25, "LinkedIn": 0.2, "Facebook": 0.1, "Blog": 0.1
+    })
+    languages: Dict[str, float] = field(default_factory=lambda: {"es": 0.7, "en": 0.2, "fr": 0.1})
+    topics: Dict[str, float] = field(default_factory=lambda: {
+        "IA en salud": 3, "inteligencia artificial en la salud": 2, "energía solar": 2,
+        "finanzas personales": 2, "ciberseguridad para pymes": 1, "teletrabajo": 1,
+    })
+    audiences: Dict[str, float] = field(default_factory=lambda: {
+        "audiencia general": 3, "profesionales": 1, "estudiantes": 1
+    })
+    variants: Dict[int, float] = field(default_factory=lambda: {1: 1.0})
+
+    @classmethod
+    def from_file(cls, path: Path) -> "TrafficMix":
+        """Carga una mezcla desde JSON o YAML; las claves omitidas usan los valores por defecto."""
+        with open(path, encoding="utf-8") as f:
+            if path.suffix.lower() in (".yaml", ".yml"):
+                import yaml
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        if "variants" in data:
+            data["variants"] = {int(k): v for k, v in data["variants"].items()}
+        return cls(**data)
+
+    def sample(self, rng: random.Random) -> Dict[str, Any]:
+        """Genera el cuerpo de una petición a /generate-content."""
+        def pick(weights: Dict[Any, float]):
+            return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+        body = {
+            "topic": pick(self.topics),
+            "platform": pick(self.platforms),
+            "language": pick(self.languages),
+            "audience": pick(self.audiences),
+        }
+        variants = pick(self.variants)
+        if variants > 1:
+            body["variants"] = variants
+        return body
+
+
+@dataclass(slots=True)
+class RequestRecord:
+    """Medidas de una petición (tiempos en segundos desde el inicio de la prueba)."""
+    scheduled: float
+    started: float = 0.0
+    finished: float = 0.0
+    status: int = 0
+    error: Optional[str] = None
+    server_time: Optional[float] = None
+    platform: str = ""
+
+    @property
+    def latency(self) -> float:
+        """Latencia vista por el usuario: desde que la petición debía salir hasta la respuesta."""
+        return self.finished - self.scheduled
+
+    @property
+    def queue_wait(self) -> float:
+        """Espera en el cliente hasta obtener conexión libre."""
+        return self.started - self.scheduled
+
+
+class HttpClient:
+    """Cliente HTTP/1.1 mínimo sobre asyncio con pool de conexiones keep-alive."""
+
+    def __init__(self, base_url: str, max_connections: int = 64, timeout: float = 120.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+        body = json.dumps(payload).encode("utf-8")
+        return await asyncio.wait_for(self._request("POST", path, body), self.timeout)
+
+    async def acquire(self) -> None:
+        await self._slots.acquire()
+
+    def release(self) -> None:
+        self._slots.release()
+
+    async def _request(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(
+                f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                "Connection: keep-alive\r\n\r\n".encode("ascii") + body
+            )
+            await writer.drain()
+
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError("Conexión cerrada por el servidor")
+            status = int(status_line.split()[1])
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            if "content-length" in headers:
+                data = await reader.readexactly(int(headers["content-length"]))
+            elif headers.get("transfer-encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int((await reader.readline()).split(b";")[0], 16)
+                    if size == 0:
+                        await reader.readline()
+                        break
+                    chunks.append(await reader.readexactly(size))
+                    await reader.readline()
+                data = b"".join(chunks)
+            else:
+                data = await reader.read()
+                headers["connection"] = "close"
+        except BaseException:
+            writer.close()
+            raise
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, headers, data
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+async def _send(client: HttpClient, body: Dict[str, Any], record: RequestRecord, t0: float) -> None:
+    await client.acquire()
+    record.started = time.perf_counter() - t0
+    try:
+        status, headers, _ = await client.post_json("/generate-content", body)
+        record.status = status
+        if "x-process-time" in headers:
+            record.server_time = float(headers["x-process-time"])
+        if status >= 400:
+            record.error = f"HTTP {status}"
+    except Exception as e:
+        record.error = type(e).__name__
+    finally:
+        record.finished = time.perf_counter() - t0
+        client.release()
+
+
+async def run_open_loop(
+    client: HttpClient,
+    mix: TrafficMix,
+    rps: float,
+    duration: float,
+    rng: random.Random,
+    poisson: bool = True
+) -> List[RequestRecord]:
+    """
+    Lanza peticiones a un ritmo objetivo independientemente de las respuestas.
+
+    Las llegadas siguen un proceso de Poisson (o son equiespaciadas con
+    `poisson=False`), así que si el servidor se satura la cola crece y se ve
+    reflejada en la latencia y en la espera del cliente.
+    """
+    records: List[RequestRecord] = []
+    tasks = []
+    t0 = time.perf_counter()
+    next_at = 0.0
+    while next_at < duration:
+        delay = next_at - (time.perf_counter() - t0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        body = mix.sample(rng)
+        record = RequestRecord(scheduled=next_at, platform=body["platform"])
+        records.append(record)
+        tasks.append(asyncio.create_task(_send(client, body, record, t0)))
+        next_at += rng.expovariate(rps) if poisson else 1.0 / rps
+    await asyncio.gather(*tasks)
+    return records
+
+
+async def run_closed_loop(
+    client: HttpClient,
+    mix: TrafficMix,
+    concurrency: int,
+    duration: float,
+    rng: random.Random
+) -> List[RequestRecord]:
+    """Mantiene `concurrency` usuarios que envían una petición nueva al recibir la anterior."""
+    records: List[RequestRecord] = []
+    t0 = time.perf_counter()
+
+    async def user():
+        while time.perf_counter() - t0 < duration:
+            body = mix.sample(rng)
+            record = RequestRecord(scheduled=time.perf_counter() - t0, platform=body["platform"])
+            records.append(record)
+            await _send(client, body, record, t0)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return records
+
+
+def summarize(records: List[RequestRecord], duration: float) -> Dict[str, Any]:
+    """Resumen global: throughput, errores y distribución de latencias (ms)."""
+    ok = [r for r in records if r.error is None]
+    latencies = [r.latency * 1000 for r in ok]
+    server = [r.server_time * 1000 for r in ok if r.server_time is not None]
+    waits = [r.queue_wait * 1000 for r in records]
+    elapsed = max((r.finished for r in records), default=duration)
+    by_platform = defaultdict(list)
+    for r in ok:
+        by_platform[r.platform].append(r.latency * 1000)
+
+    return {
+        "requests": len(records),
+        "ok": len(ok),
+        "error_rate": (len(records) - len(ok)) / len(records) if records else 0.0,
+        "errors": dict(Counter(r.error for r in records if r.error)),
+        "offered_rps": len(records) / duration if duration else 0.0,
+        "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=0.0),
+        },
+        "server_time_ms": {"p50": percentile(server, 50), "p95": percentile(server, 95)},
+        "client_queue_ms": {"p50": percentile(waits, 50), "p95": percentile(waits, 95)},
+        "latency_p95_by_platform_ms": {
+            platform: percentile(values, 95) for platform, values in sorted(by_platform.items())
+        },
+    }
+
+
+def timeline(records: List[RequestRecord], bucket: float = 1.0) -> List[Dict[str, Any]]:
+    """Serie temporal por intervalos: enviadas, completadas, errores, en vuelo y latencias."""
+    if not records:
+        return []
+    end = max(r.finished for r in records)
+    buckets = []
+    for i in range(int(end / bucket) + 1):
+        start, stop = i * bucket, (i + 1) * bucket
+        completed = [r for r in records if start <= r.finished < stop]
+        latencies = [r.latency * 1000 for r in completed if r.error is None]
+        buckets.append({
+            "t": start,
+            "sent": sum(1 for r in records if start <= r.scheduled < stop),
+            "completed": len(completed),
+            "errors": sum(1 for r in completed if r.error),
+            "in_flight": sum(1 for r in records if r.scheduled < stop and r.finished >= stop),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+        })
+    return buckets
+
+
+async def _run(args: argparse.Namespace, mix: TrafficMix) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    client = HttpClient(args.url, max_connections=args.max_connections, timeout=args.timeout)
+    steps = []
+    try:
+        if args.concurrency:
+            records = await run_closed_loop(client, mix, args.concurrency, args.duration, rng)
+            steps.append({"mode": "closed", "concurrency": args.concurrency,
+                          "summary": summarize(records, args.duration), "timeline": timeline(records)})
+        else:
+            for rps in args.rps:
+                records = await run_open_loop(client, mix, rps, args.duration, rng, poisson=not args.uniform)
+                steps.append({"mode": "open", "target_rps": rps,
+                              "summary": summarize(records, args.duration), "timeline": timeline(records)})
+    finally:
+        await client.close()
+    return {"url": args.url, "duration": args.duration, "mix": asdict(mix), "steps": steps}
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{'paso':<14}{'ofrecido':>10}{'logrado':>10}{'err %':>8}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'p99 ms':>10}{'srv p95':>10}{'cola p95':>10}")
+    for step in report["steps"]:
+        s = step["summary"]
+        label = f"{step['target_rps']} rps" if step["mode"] == "open" else f"{step['concurrency']} usuarios"
+        print(f"{label:<14}{s['offered_rps']:>10.2f}{s['throughput_rps']:>10.2f}{s['error_rate'] * 100:>8.1f}"
+              f"{s['latency_ms']['p50']:>10.1f}{s['latency_ms']['p95']:>10.1f}{s['latency_ms']['p99']:>10.1f}"
+              f"{s['server_time_ms']['p95']:>10.1f}{s['client_queue_ms']['p95']:>10.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--rps", type=lambda v: [float(x) for x in v.split(",")], default=[2.0],
+                       help="RPS objetivo; varios valores separados por comas se ejecutan como escalones")
+    group.add_argument("--concurrency", type=int, help="Usuarios concurrentes (lazo cerrado)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos por escalón")
+    parser.add_argument("--mix", type=Path, help="Fichero JSON/YAML con la mezcla de tráfico")
+    parser.add_argument("--uniform", action="store_true", help="Llegadas equiespaciadas en vez de Poisson")
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, help="Ruta del informe JSON")
+    args = parser.parse_args(argv)
+
+    mix = TrafficMix.from_file(args.mix) if args.mix else TrafficMix()
+    report = asyncio.run(_run(args, mix))
+    _print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Informe guardado en {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
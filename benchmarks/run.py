@@ -0,0 +1,129 @@
+"""
+Suite de benchmarks de extremo a extremo con backends locales sustitutos.
+
+Cada escenario se ejecuta en un subproceso propio para que el pico de RSS sea
+independiente. Los resultados se comparan con `baseline.json` y el comando
+termina con código 1 si hay regresiones.
+
+Uso:
+    python -m benchmarks.run [--only NOMBRE ...] [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from typing import List, Optional
+from benchmarks.harness import (
+    BenchmarkResult, compare_to_baseline, load_baseline, run_benchmark, save_baseline
+)
+from benchmarks.scenarios import SCENARIOS, StubLatency
+from src.utils.helpers import is_available
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def run_scenario(name: str, latency: StubLatency, iterations: Optional[int] = None) -> BenchmarkResult:
+    """Ejecuta un escenario en el proceso actual."""
+    definition = SCENARIOS[name]
+    with ExitStack() as stack:
+        fn = definition.build(stack, latency)
+        return run_benchmark(
+            name,
+            fn,
+            iterations=iterations or definition.iterations,
+            concurrency=definition.concurrency,
+        )
+
+
+def _run_isolated(name: str, args: argparse.Namespace) -> Optional[BenchmarkResult]:
+    """Ejecuta un escenario en un subproceso y recoge su resultado en JSON."""
+    command = [
+        sys.executable, "-m", "benchmarks.run", "--child", name,
+        "--llm-ttft", str(args.llm_ttft),
+        "--llm-per-token", str(args.llm_per_token),
+        "--translator-latency", str(args.translator_latency),
+        "--image-latency", str(args.image_latency),
+    ]
+    if args.iterations:
+        command += ["--iterations", str(args.iterations)]
+    proc = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"{name}: ERROR\n{proc.stderr.strip()}", file=sys.stderr)
+        return None
+    return BenchmarkResult(**json.loads(proc.stdout.strip().splitlines()[-1]))
+
+
+def _print_table(results: List[BenchmarkResult]) -> None:
+    print(f"{'escenario':<26}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>9}{'err':>5}")
+    for r in results:
+        print(f"{r.name:<26}{r.throughput:>10.1f}{r.p50_ms:>10.2f}{r.p95_ms:>10.2f}"
+              f"{r.p99_ms:>10.2f}{r.peak_rss_mb:>9.1f}{r.errors:>5}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = StubLatency()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="*", help="Escenarios a ejecutar (por defecto todos)")
+    parser.add_argument("--list", action="store_true", help="Lista los escenarios disponibles")
+    parser.add_argument("--iterations", type=int, help="Sobrescribe las iteraciones de cada escenario")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--llm-ttft", type=float, default=defaults.llm_ttft)
+    parser.add_argument("--llm-per-token", type=float, default=defaults.llm_per_token)
+    parser.add_argument("--translator-latency", type=float, default=defaults.translator)
+    parser.add_argument("--image-latency", type=float, default=defaults.image)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    latency = StubLatency(
+        llm_ttft=args.llm_ttft,
+        llm_per_token=args.llm_per_token,
+        translator=args.translator_latency,
+        image=args.image_latency,
+    )
+
+    if args.child:
+        result = run_scenario(args.child, latency, args.iterations)
+        print(json.dumps(result.to_dict()))
+        return 0
+
+    if args.list:
+        for definition in SCENARIOS.values():
+            print(f"{definition.name:<26}{definition.description}")
+        return 0
+
+    results = []
+    failed = []
+    for name in args.only or list(SCENARIOS):
+        missing = [module for module in SCENARIOS[name].requires if not is_available(module)]
+        if missing:
+            print(f"{name}: omitido (faltan {', '.join(missing)})")
+            continue
+        result = _run_isolated(name, args)
+        if result is None:
+            failed.append(name)
+        else:
+            results.append(result)
+
+    _print_table(results)
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update({r.name: r.to_dict() for r in results})
+        save_baseline(args.baseline, [BenchmarkResult(**value) for value in baseline.values()])
+        print(f"Baseline guardado en {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, load_baseline(args.baseline), args.tolerance)
+    regressions += [f"{name}: el escenario falló" for name in failed]
+    for regression in regressions:
+        print(f"REGRESIÓN: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
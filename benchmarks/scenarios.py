@@ -0,0 +1,195 @@
+"""
+Escenarios de benchmark sobre los componentes reales con backends sustitutos.
+
+Cada escenario declara los módulos que necesita; si alguno no está instalado el
+escenario se marca como omitido en lugar de fallar.
+"""
+import os
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+from benchmarks.stubs import FakeEmbeddings, FakeImageGenerator, FakeTranslator, OllamaStubServer, fake_text
+
+
+@dataclass(slots=True)
+class StubLatency:
+    """Latencias simuladas de los backends (segundos)."""
+    llm_ttft: float = 0.02
+    llm_per_token: float = 0.001
+    translator: float = 0.01
+    image: float = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    """Escenario de benchmark registrado."""
+    name: str
+    build: Callable[[ExitStack, StubLatency], Callable[[int], Any]]
+    requires: Tuple[str, ...] = ()
+    iterations: int = 50
+    concurrency: int = 1
+    description: str = ""
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str, requires: Tuple[str, ...] = (), iterations: int = 50, concurrency: int = 1):
+    """Decorador que registra una función de construcción de escenario."""
+    def register(build):
+        SCENARIOS[name] = Scenario(
+            name=name,
+            build=build,
+            requires=requires,
+            iterations=iterations,
+            concurrency=concurrency,
+            description=(build.__doc__ or "").strip(),
+        )
+        return build
+    return register
+
+
+def benchmark_config(stack: ExitStack, ollama_host: str = "http://127.0.0.1:9"):
+    """Config aislada en un directorio temporal apuntando al stub de Ollama."""
+    tmp = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["LLM_PROVIDER"] = "ollama"
+    os.environ["OLLAMA_HOST"] = ollama_host
+    os.environ["DATA_DIR"] = str(tmp / "data")
+    os.environ["TEMP_DIR"] = str(tmp / "temp")
+    os.environ["LOG_DIR"] = str(tmp / "logs")
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(tmp / "chroma")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from src.utils.config import Config
+    return Config(env_file=str(tmp / ".env"))
+
+
+def build_generator(stack: ExitStack, latency: StubLatency):
+    """ContentGenerator real con LLM vía stub HTTP de Ollama, traductor e imagen sustitutos."""
+    stub = stack.enter_context(OllamaStubServer(ttft=latency.llm_ttft, per_token=latency.llm_per_token))
+    config = benchmark_config(stack, stub.url)
+
+    from src.content.generator import ContentGenerator
+    return ContentGenerator(
+        config=config,
+        image_generator=FakeImageGenerator(latency=latency.image, output_dir=config.temp_dir),
+        translator=FakeTranslator(latency=latency.translator),
+    )
+
+
+_TOPICS = ("IA en salud", "energía solar", "finanzas personales", "ciberseguridad", "teletrabajo")
+
+
+@scenario("templates.build_prompt", iterations=2000)
+def _templates_build_prompt(stack, latency):
+    """Construcción del prompt desde el registro de templates."""
+    from src.content.templates import get_template
+    template = get_template("instagram")
+    return lambda i: template.build_prompt(_TOPICS[i % len(_TOPICS)], "audiencia general", "Acme")
+
+
+@scenario("validators.validate", iterations=2000)
+def _validators_validate(stack, latency):
+    """Validación de un post de Blog de ~5000 caracteres."""
+    from src.content.templates import get_template
+    from src.content.validators import ContentValidator
+    template = get_template("blog")
+    validator = ContentValidator(config=None)
+    text = fake_text("blog", 700) + "\nMeta descripción: " + "x" * 155
+    return lambda i: validator.validate_content(text, template, {"style": template.image_style})
+
+
+@scenario("validators.repair", iterations=2000)
+def _validators_repair(stack, latency):
+    """Reparación de un tweet demasiado largo y con exceso de hashtags."""
+    from src.content.templates import get_template
+    from src.content.validators import ContentValidator
+    template = get_template("twitter")
+    validator = ContentValidator(config=None)
+    text = fake_text("tweet", 80) + " #a #b #c #d #e"
+    report = validator.validate_content(text, template)
+    return lambda i: validator.repair_content(text, report, template, topic="IA en salud")
+
+
+@scenario("generator.twitter", requires=("dotenv", "langchain", "langchain_community"), iterations=30)
+def _generator_twitter(stack, latency):
+    """ContentGenerator.generate para Twitter con traducción al inglés."""
+    generator = build_generator(stack, latency)
+    return lambda i: generator.generate("twitter", _TOPICS[i % len(_TOPICS)], "general", language="en")
+
+
+@scenario("generator.instagram", requires=("dotenv", "langchain", "langchain_community"), iterations=20)
+def _generator_instagram(stack, latency):
+    """ContentGenerator.generate para Instagram (incluye imagen)."""
+    generator = build_generator(stack, latency)
+    return lambda i: generator.generate("instagram", _TOPICS[i % len(_TOPICS)], "general")
+
+
+@scenario("generator.variants", requires=("dotenv", "langchain", "langchain_community"), iterations=10)
+def _generator_variants(stack, latency):
+    """ContentGenerator.generate con 4 variantes para Instagram."""
+    generator = build_generator(stack, latency)
+    return lambda i: generator.generate("instagram", _TOPICS[i % len(_TOPICS)], "general", variants=4)
+
+
+@scenario(
+    "api.generate_content",
+    requires=("dotenv", "fastapi", "httpx", "langchain", "langchain_community"),
+    iterations=30,
+    concurrency=4,
+)
+def _api_generate_content(stack, latency):
+    """Endpoint /generate-content vía TestClient con el generador sustituto inyectado."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.api.routers import router, get_content_generator
+
+    generator = build_generator(stack, latency)
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_content_generator] = lambda: generator
+    client = stack.enter_context(TestClient(app))
+
+    def call(i):
+        response = client.post("/generate-content", json={
+            "topic": _TOPICS[i % len(_TOPICS)],
+            "platform": "Twitter",
+            "language": "es",
+            "audience": "general",
+        })
+        response.raise_for_status()
+    return call
+
+
+def _build_processor(stack, latency):
+    config = benchmark_config(stack)
+    from src.rag.document_processor import DocumentProcessor
+    return DocumentProcessor(config, embeddings=FakeEmbeddings())
+
+
+def _fake_paper(i: int) -> Dict[str, Any]:
+    return {
+        "title": f"Paper {i}",
+        "authors": ["Autora A", "Autor B"],
+        "abstract": fake_text(f"paper-{i}", 250),
+        "url": f"http://arxiv.org/abs/0000.{i:05d}",
+    }
+
+
+@scenario("rag.ingest", requires=("dotenv", "langchain", "chromadb"), iterations=30)
+def _rag_ingest(stack, latency):
+    """DocumentProcessor.process_papers de un paper por iteración."""
+    processor = _build_processor(stack, latency)
+    return lambda i: processor.process_papers([_fake_paper(i)])
+
+
+@scenario("rag.query", requires=("dotenv", "langchain", "chromadb"), iterations=200)
+def _rag_query(stack, latency):
+    """DocumentProcessor.query_knowledge_base sobre 200 papers ingeridos."""
+    processor = _build_processor(stack, latency)
+    processor.process_papers([_fake_paper(i) for i in range(200)])
+    return lambda i: processor.query_knowledge_base(_TOPICS[i % len(_TOPICS)], k=3)
@@ -0,0 +1,61 @@
+"""
+Arranca la API real (`app.main:app`) con los backends sustitutos para pruebas de carga.
+
+El LLM se sirve desde un `OllamaStubServer` local y la imagen y la traducción
+con `FakeImageGenerator`/`FakeTranslator`, así que no hacen falta GPU ni red.
+
+Uso:
+    python -m benchmarks.stub_app [--port 8000] [--workers-threads 40] [--llm-ttft 0.05 ...]
+"""
+import argparse
+import sys
+from contextlib import ExitStack
+from typing import List, Optional
+from benchmarks.scenarios import StubLatency, build_generator
+
+
+def create_app(stack: ExitStack, latency: StubLatency):
+    """Devuelve la app FastAPI con el generador sustituto inyectado."""
+    from app.main import app
+    from src.api.routers import get_content_generator
+
+    generator = build_generator(stack, latency)
+    app.dependency_overrides[get_content_generator] = lambda: generator
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = StubLatency()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--thread-limit", type=int, default=None,
+                        help="Hilos del threadpool de AnyIO (generaciones simultáneas)")
+    parser.add_argument("--llm-ttft", type=float, default=defaults.llm_ttft)
+    parser.add_argument("--llm-per-token", type=float, default=defaults.llm_per_token)
+    parser.add_argument("--translator-latency", type=float, default=defaults.translator)
+    parser.add_argument("--image-latency", type=float, default=defaults.image)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    latency = StubLatency(
+        llm_ttft=args.llm_ttft,
+        llm_per_token=args.llm_per_token,
+        translator=args.translator_latency,
+        image=args.image_latency,
+    )
+    with ExitStack() as stack:
+        app = create_app(stack, latency)
+        if args.thread_limit:
+            @app.on_event("startup")
+            async def _set_thread_limit():
+                import anyio.to_thread
+                anyio.to_thread.current_default_thread_limiter().total_tokens = args.thread_limit
+
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+Sustitutos locales y deterministas de los backends externos para benchmarks.
+
+- `OllamaStubServer`: servidor HTTP compatible con la API de Ollama (/api/generate, /api/tags)
+  y con la de chat de OpenAI (/v1/chat/completions, como Groq o vLLM)
+- `FakeTranslator`: misma interfaz que `Translator`, sin red
+- `FakeImageGenerator`: misma interfaz que `ImageGenerator`; escribe un PNG pequeño
+- `FakeEmbeddings`: embeddings por hashing compatibles con LangChain
+
+Todos admiten latencia configurable para simular backends lentos sin GPU ni servicios externos.
+"""
+import hashlib
+import io
+import json
+import math
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+_VOCABULARY = (
+    "la inteligencia artificial transforma la salud con diagnósticos más rápidos y "
+    "tratamientos personalizados para cada paciente mientras los hospitales ganan "
+    "eficiencia y los equipos médicos dedican más tiempo a las personas"
+).split()
+
+
+def fake_text(seed: str, words: int = 60) -> str:
+    """
+    Texto determinista en español derivado de `seed`.
+
+    Args:
+        seed (str): Semilla (normalmente el prompt)
+        words (int): Número de palabras
+
+    Returns:
+        str: Texto con frases terminadas en punto y un par de hashtags
+    """
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    out = []
+    for i in range(words):
+        word = _VOCABULARY[(digest[i % len(digest)] + i) % len(_VOCABULARY)]
+        out.append(word.capitalize() if i == 0 or out[-1].endswith(".") else word)
+        if i % 12 == 11:
+            out[-1] += "."
+    return " ".join(out).rstrip(".") + ". ✨ #IA #Salud"
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StubHTTPServer"
+
+    def log_message(self, format, *args):  # Silenciar el log por petición
+        pass
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": self.server.stub.model}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/v1/chat/completions":
+            self._chat_completions(request)
+            return
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        stub = self.server.stub
+        stub.requests += 1
+        tokens = stub.tokens_for(request.get("prompt", ""), request.get("options") or {})
+        time.sleep(stub.ttft)
+
+        if not request.get("stream", True):
+            time.sleep(stub.per_token * len(tokens))
+            self._send_json(stub.final_chunk(tokens, "".join(tokens)))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                time.sleep(stub.per_token)
+                self._write_chunk({"model": stub.model, "response": token, "done": False})
+            self._write_chunk(stub.final_chunk(tokens, ""))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            stub.cancelled += 1  # El cliente cortó el stream (p. ej. truncado por longitud)
+
+    def _chat_completions(self, request: Dict[str, Any]) -> None:
+        stub = self.server.stub
+        stub.requests += 1
+        if stub.rate_limit_failures > 0:
+            stub.rate_limit_failures -= 1
+            body = b'{"error": {"message": "rate limit"}}'
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Retry-After", "0")
+            self.send_header("x-ratelimit-reset-requests", "10ms")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        prompt = "".join(message.get("content", "") for message in request.get("messages", []))
+        options = {"num_predict": request.get("max_tokens"), "stop": request.get("stop")}
+        time.sleep(stub.ttft)
+
+        if not request.get("stream"):
+            choices = []
+            for index in range(request.get("n", 1)):
+                tokens = stub.tokens_for(prompt, dict(options, seed=index or ""))
+                time.sleep(stub.per_token * len(tokens))
+                choices.append({
+                    "index": index,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                })
+            self._send_json({"object": "chat.completion", "model": stub.model, "choices": choices})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in stub.tokens_for(prompt, options):
+                time.sleep(stub.per_token)
+                self._write_event({"choices": [{"index": 0, "delta": {"content": token}}]})
+            self._write_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            stub.cancelled += 1
+
+    def _write_event(self, payload: Any) -> None:
+        # Como Groq o vLLM: UTF-8 sin escapar, para que el cliente tenga que decodificarlo bien
+        text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        data = ("data: " + text + "\n\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "OllamaStubServer"
+
+
+class OllamaStubServer:
+    """
+    Servidor local compatible con Ollama con latencia y salida configurables.
+
+    Uso:
+        with OllamaStubServer(ttft=0.05, per_token=0.002) as stub:
+            config.ollama_host = stub.url
+    """
+
+    def __init__(
+        self,
+        ttft: float = 0.0,
+        per_token: float = 0.0,
+        words: int = 60,
+        model: str = "llama3.2",
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        Args:
+            ttft (float): Segundos hasta el primer token
+            per_token (float): Segundos por token emitido
+            words (int): Palabras por respuesta (antes de aplicar num_predict/stop)
+            model (str): Nombre de modelo que se anuncia
+            host (str): Interfaz de escucha
+            port (int): Puerto (0 para uno libre)
+        """
+        self.ttft = ttft
+        self.per_token = per_token
+        self.words = words
+        self.model = model
+        self.requests = 0
+        self.cancelled = 0
+        self.rate_limit_failures = 0  # Próximas peticiones de chat que responderán 429
+        self._server = _StubHTTPServer((host, port), _OllamaHandler)
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def tokens_for(self, prompt: str, options: Dict[str, Any]) -> List[str]:
+        """Tokens de la respuesta (palabras con su espacio), respetando num_predict y stop."""
+        text = fake_text(prompt + str(options.get("seed", "")), self.words)
+        for stop in options.get("stop") or []:
+            if stop and stop in text:
+                text = text[:text.index(stop)]
+        tokens = [word + " " for word in text.split(" ")]
+        num_predict = options.get("num_predict")
+        if num_predict is not None and num_predict >= 0:
+            tokens = tokens[:num_predict]
+        return tokens
+
+    def final_chunk(self, tokens: List[str], response: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "response": response,
+            "done": True,
+            "prompt_eval_count": 0,
+            "eval_count": len(tokens),
+        }
+
+    def start(self) -> "OllamaStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OllamaStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class FakeTranslator:
+    """Traductor determinista sin red con la interfaz de `Translator`."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+
+    def translate(self, content: str, target_lang: str) -> str:
+        self.requests += 1
+        time.sleep(self.latency)
+        return f"[{target_lang}] {content}"
+
+    def translate_batch(self, contents: List[str], target_lang: str) -> List[str]:
+        self.requests += 1
+        time.sleep(self.latency)
+        return [f"[{target_lang}] {content}" for content in contents]
+
+
+@lru_cache(maxsize=32)
+def tiny_png(seed: str, size: int = 64) -> bytes:
+    """PNG RGB determinista de `size`x`size` píxeles generado solo con la stdlib."""
+    r, g, b = hashlib.sha256(seed.encode("utf-8")).digest()[:3]
+    rows = b"".join(
+        b"\x00" + bytes(v for x in range(size) for v in ((r + x) % 256, (g + y) % 256, b))
+        for y in range(size)
+    )
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeImageGenerator:
+    """Sustituto de `ImageGenerator`: simula la latencia de difusión y guarda un PNG pequeño."""
+
+    def __init__(self, latency: float = 0.0, size: int = 512, output_dir: Optional[Path] = None):
+        self.latency = latency
+        self.size = size
+        self.output_dir = Path(output_dir or tempfile.gettempdir())
+        self.requests = 0
+
+    def generate(self, prompt: str) -> str:
+        data = self._generate_png(prompt)
+        path = self.output_dir / f"fake-{hashlib.sha256(data).hexdigest()[:16]}.png"
+        path.write_bytes(data)
+        return str(path)
+
+    def generate_image(self, prompt: str):
+        """Devuelve la imagen en memoria como PIL.Image (requiere Pillow)."""
+        from PIL import Image
+        return Image.open(io.BytesIO(self._generate_png(prompt)))
+
+    def _generate_png(self, prompt: str) -> bytes:
+        if not prompt:
+            raise ValueError("El prompt no puede estar vacío.")
+        self.requests += 1
+        time.sleep(self.latency)
+        return tiny_png(prompt, self.size)
+
+
+class FakeEmbeddings:
+    """Embeddings deterministas por hashing de tokens (interfaz de LangChain)."""
+
+    def __init__(self, dim: int = 384, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for token in text.lower().split():
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            vector[h % self.dim] += 1.0 if h & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency * len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._embed(text)
@@ -1,21 +1,77 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
+import sys
+import time
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al PATH
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.monitoring.history import get_history_store
+from src.utils.config import Config
+
+PERIODS = {"Últimas 24 horas": 1, "Últimos 7 días": 7, "Últimos 30 días": 30, "Últimos 90 días": 90}
+
+
+@st.cache_resource(show_spinner=False)
+def get_store():
+    """Historial compartido entre sesiones (mismo fichero que usa el generador)."""
+    return get_history_store(Config().history_db)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_rollups(days: int, group_by: tuple) -> pd.DataFrame:
+    """Agregados por hora ya calculados; la consulta no depende del número de generaciones."""
+    since = time.time() - days * 86400
+    return pd.DataFrame(get_store().rollups(since=since, group_by=group_by))
+
 
 def render():
     st.title("Métricas y Análisis")
-    
-    # Ejemplo de datos ficticios
-    data = pd.DataFrame({
-        "Tipo de Contenido": ["Blog", "Twitter", "LinkedIn", "Instagram"],
-        "Cantidad Generada": [50, 75, 30, 40],
-    })
-    
-    # Gráfico interactivo
-    chart = alt.Chart(data).mark_bar().encode(
-        x="Tipo de Contenido",
-        y="Cantidad Generada",
-        color="Tipo de Contenido"
+
+    period = st.selectbox("Periodo:", list(PERIODS))
+    days = PERIODS[period]
+
+    by_platform = load_rollups(days, ("platform",))
+    if by_platform.empty:
+        st.info("Todavía no hay generaciones registradas en este periodo.")
+        return
+
+    total = int(by_platform["count"].sum())
+    valid_rate = (by_platform["valid_rate"] * by_platform["count"]).sum() / total
+    avg_ms = (by_platform["avg_total_ms"] * by_platform["count"]).sum() / total
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Generaciones", f"{total:,}")
+    col2.metric("Válidas", f"{valid_rate:.0%}")
+    col3.metric("Latencia media", f"{avg_ms / 1000:.1f} s")
+
+    # Contenido generado por plataforma
+    chart = alt.Chart(by_platform).mark_bar().encode(
+        x=alt.X("platform", title="Tipo de Contenido"),
+        y=alt.Y("count", title="Cantidad Generada"),
+        color="platform"
     )
-    
     st.altair_chart(chart, use_container_width=True)
+
+    # Evolución diaria (u horaria en el último día)
+    bucket = "hour" if days == 1 else "day"
+    timeline = load_rollups(days, (bucket, "platform"))
+    timeline["fecha"] = pd.to_datetime(timeline[bucket], unit="s")
+    st.altair_chart(
+        alt.Chart(timeline).mark_line(point=True).encode(
+            x=alt.X("fecha", title="Fecha"),
+            y=alt.Y("count", title="Generaciones"),
+            color="platform"
+        ),
+        use_container_width=True
+    )
+
+    # Latencia y tokens por modelo
+    by_model = load_rollups(days, ("model",))
+    st.subheader("Por modelo")
+    st.dataframe(
+        by_model[["model", "count", "avg_total_ms", "avg_llm_ms", "prompt_tokens",
+                  "completion_tokens", "cache_hit_rate", "errors"]],
+        use_container_width=True
+    )
@@ -1,7 +1,7 @@
 import streamlit as st
 import sys
+from collections import OrderedDict
 from pathlib import Path
-from PIL import Image
 
 
 # Añadir el directorio raíz del proyecto al PATH
@@ -9,61 +9,87 @@ sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
 from src.content.generator import ContentGenerator
 from src.utils.config import Config  # Importar la clase Config
-from src.image.generator import ImageGenerator
+
+# Número de resultados recientes que se conservan por sesión
+MAX_RECENT_RESULTS = 10
+
+
+@st.cache_resource(show_spinner=False)
+def get_config() -> Config:
+    """Config compartida entre sesiones y reruns (se valida una sola vez)."""
+    config = Config()
+    config.validate()  # Validar configuración, en caso de errores en .env
+    return config
+
+
+@st.cache_resource(show_spinner="Cargando modelos...")
+def get_generator() -> ContentGenerator:
+    """Generador compartido: los modelos (LLM y Stable Diffusion) se cargan una sola vez por proceso."""
+    return ContentGenerator(config=get_config())
+
+
+def _recent_results() -> OrderedDict:
+    if "recent_results" not in st.session_state:
+        st.session_state["recent_results"] = OrderedDict()
+    return st.session_state["recent_results"]
+
+
+def _show_result(result):
+    # Mostrar el resultado
+    st.subheader("Resultado:")
+    st.write(result["content"]["text"])
+
+    # Mostrar la imagen que ya generó el pipeline (sin volver a generarla ni abrirla con PIL)
+    if result.get("image_url"):
+        st.image(result["image_url"], caption="Imagen generada")
+    elif get_generator().templates.get(result["platform"]).requires_image:
+        # Solo es un fallo si la plataforma lleva imagen (Twitter, LinkedIn... no la llevan)
+        st.warning("No se pudo generar la imagen.")
 
 
 def render():
     st.title("Generador de Contenido")
-    
-    # Crear una instancia de Config
-    config = Config()  # Instanciamos el config
-    
+
     # Validar configuración antes de continuar
     try:
-        config.validate()  # Validar configuración, en caso de errores en .env
+        get_config()
     except ValueError as e:
         st.error(f"Configuración inválida: {e}")
         return
-    
+
     # Inputs del usuario
     topic = st.text_input("Tema del contenido:", "")
     platform = st.selectbox("Plataforma objetivo:", ["Blog", "Instagram", "Twitter", "LinkedIn", "Facebook"])
     language = st.selectbox("Idioma:", ["es", "en", "fr", "de"])
     audience = st.text_input("Audiencia objetivo:", "audiencia general")
-    # Selector de dispositivo (CPU/GPU)
-    
+
+    recent = _recent_results()
+    key = (platform.lower(), topic.strip(), audience.strip(), language)
+
     if st.button("Generar Contenido"):
         if topic:
             try:
-                # Inicializar generador de contenido
-                generator = ContentGenerator(config=config)  # Pasar el config a ContentGenerator
-                
-                
-                # Generar el contenido
-                result = generator.generate(
-                    platform=platform.lower(),  # Asegurar que coincide con los nombres de templates
-                    topic=topic,
-                    audience=audience,
-                    language=language
-                )
-                
-                # Mostrar el resultado
-                st.subheader("Resultado:")
-                st.write(result["content"]["text"])
-                
-                # Generar imagen usando Hugging Face
-                image_generator = ImageGenerator(config=config)
-                image_path = image_generator.generate(prompt=topic)
-
-                # Mostrar la imagen generada
-                if image_path:
-                    # Abrir la imagen usando PIL y mostrarla con Streamlit
-                    image = Image.open(image_path)
-                    st.image(image, caption="Imagen generada")
+                if key in recent:
+                    # Misma petición que una reciente: reutilizar el resultado
+                    recent.move_to_end(key)
                 else:
-                    st.warning("No se pudo generar la imagen.")
-            
+                    with st.spinner("Generando contenido..."):
+                        recent[key] = get_generator().generate(
+                            platform=platform.lower(),  # Asegurar que coincide con los nombres de templates
+                            topic=topic,
+                            audience=audience,
+                            language=language
+                        )
+                    while len(recent) > MAX_RECENT_RESULTS:
+                        recent.popitem(last=False)
+                st.session_state["last_result_key"] = key
+
             except Exception as e:
                 st.error(f"Error al generar contenido: {str(e)}")
         else:
             st.error("Por favor, ingresa un tema.")
+
+    # En cada rerun se vuelve a pintar el último resultado sin regenerarlo
+    last_key = st.session_state.get("last_result_key")
+    if last_key in recent:
+        _show_result(recent[last_key])
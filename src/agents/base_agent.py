@@ -1,7 +1,75 @@
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from src.agents.runtime import AgentContext
+
+
 class BaseAgent:
-    """Clase base para agentes."""
-    def __init__(self, name):
+    """
+    Clase base para agentes.
+
+    Cada agente declara qué valores del contexto necesita (`inputs`) y cuáles
+    produce (`outputs`); `AgentGraph` usa esas declaraciones para componerlos
+    como un DAG y ejecutar en paralelo los que no dependen entre sí.
+    """
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    timeout: Optional[float] = None  # Segundos máximos por ejecución
+    required: bool = True  # Si falla un agente opcional, sus salidas quedan a None y el grafo sigue
+
+    def __init__(
+        self,
+        name,
+        inputs: Optional[Sequence[str]] = None,
+        outputs: Optional[Sequence[str]] = None,
+        timeout: Optional[float] = None,
+        required: Optional[bool] = None
+    ):
         self.name = name
+        if inputs is not None:
+            self.inputs = tuple(inputs)
+        if outputs is not None:
+            self.outputs = tuple(outputs)
+        if timeout is not None:
+            self.timeout = timeout
+        if required is not None:
+            self.required = required
 
     def process(self, task):
         raise NotImplementedError("Este método debe ser implementado por agentes específicos.")
+
+    async def arun(self, context: "AgentContext") -> Dict[str, Any]:
+        """
+        Ejecuta el agente dentro de un grafo.
+
+        Por defecto llama a `process` en el pool de hilos del contexto: con una sola
+        entrada declarada recibe su valor; con varias, un dict con todas. Los agentes
+        con E/S asíncrona pueden sobrescribir este método.
+
+        Args:
+            context (AgentContext): Contexto compartido de la petición
+
+        Returns:
+            Dict[str, Any]: Valores producidos, por nombre de salida
+        """
+        if len(self.inputs) == 1:
+            task = context.values[self.inputs[0]]
+        else:
+            task = {key: context.values[key] for key in self.inputs}
+        result = await context.run_in_executor(self.process, task)
+        return self.as_outputs(result)
+
+    def as_outputs(self, result: Any) -> Dict[str, Any]:
+        """
+        Asocia el resultado de `process` a las salidas declaradas.
+
+        Raises:
+            ValueError: Si el agente declara varias salidas y el resultado no las incluye todas
+        """
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        if not isinstance(result, Mapping) or not set(self.outputs) <= set(result):
+            raise ValueError(f"El agente {self.name} debe devolver un dict con {list(self.outputs)}")
+        return {key: result[key] for key in self.outputs}
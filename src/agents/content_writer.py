@@ -1,6 +1,35 @@
+from typing import Mapping
 from src.agents.base_agent import BaseAgent
 
 class ContentWriterAgent(BaseAgent):
     """Agente para escribir contenido."""
+    inputs = ("prompt",)
+    outputs = ("draft",)
+
+    def __init__(self, name, llm_selector=None, model_name: str = "local", **kwargs):
+        """
+        Args:
+            name: Nombre del agente
+            llm_selector: `LLMSelector` con el que redactar; sin él se devuelve un borrador de prueba
+            model_name (str): Modelo del selector a usar
+            **kwargs: inputs, outputs, timeout y required (ver `BaseAgent`)
+        """
+        super().__init__(name, **kwargs)
+        self.llm_selector = llm_selector
+        self.model_name = model_name
+
     def process(self, prompt):
-        return f"Generando contenido basado en el prompt: {prompt}"
+        # En un grafo con varias entradas recibe el prompt y el material de otros agentes
+        if isinstance(prompt, Mapping):
+            prompt = self._with_context(prompt)
+        if self.llm_selector is None:
+            return f"Generando contenido basado en el prompt: {prompt}"
+        return self.llm_selector.generate_content(prompt, self.model_name)
+
+    @staticmethod
+    def _with_context(task: Mapping) -> str:
+        sections = [str(task["prompt"])]
+        for key, value in task.items():
+            if key != "prompt" and value:
+                sections.append(f"\n{key.replace('_', ' ').capitalize()}:\n{value}")
+        return "\n".join(sections)
@@ -0,0 +1,269 @@
+"""
+Verificación de afirmaciones del contenido generado contra el índice RAG.
+
+Todo se hace en lote: las afirmaciones se embeben con una sola llamada, la
+evidencia se recupera para todas a la vez y el soporte se puntúa con un único
+pase del modelo (NLI si está disponible, similitud de embeddings si no). Así
+la verificación cuesta lo mismo que una consulta RAG y no una llamada al LLM
+por afirmación.
+"""
+import logging
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.agents.base_agent import BaseAgent
+from src.content.validators import Violation
+from src.utils.helpers import is_available, lazy_import
+
+np = lazy_import("numpy")
+sentence_transformers = lazy_import("sentence_transformers")
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+|\n+")
+_HASHTAG = re.compile(r"#\w+")
+_NON_TEXT = re.compile(r"[^\w\s%.,;:()'\"¿¡-]")
+# Indicios de afirmación comprobable (cifras, estudios, efectos medibles)
+_FACT_CUES = re.compile(
+    r"\d|%|\b(según|estudio|estudios|investigación|demuestra|demostrado|reduce|aumenta|mejora|"
+    r"study|studies|research|shows|reduces|increases|improves|percent)\b",
+    re.IGNORECASE
+)
+
+
+def extract_claims(text: str, max_claims: int = 8, min_words: int = 6) -> List[str]:
+    """
+    Extrae las frases declarativas que merece la pena verificar.
+
+    Se descartan preguntas, frases cortas y hashtags/emojis; si hay más de
+    `max_claims`, se priorizan las que contienen cifras o referencias a estudios.
+
+    Args:
+        text (str): Contenido generado
+        max_claims (int): Número máximo de afirmaciones
+        min_words (int): Palabras mínimas de una afirmación
+
+    Returns:
+        List[str]: Afirmaciones en el orden en que aparecen
+    """
+    candidates = []
+    for position, sentence in enumerate(_SENTENCE_SPLIT.split(text)):
+        sentence = _NON_TEXT.sub("", _HASHTAG.sub("", sentence)).strip()
+        if sentence.endswith("?") or sentence.startswith("¿") or len(sentence.split()) < min_words:
+            continue
+        candidates.append((len(_FACT_CUES.findall(sentence)), position, sentence))
+    selected = sorted(candidates, key=lambda item: (-item[0], item[1]))[:max_claims]
+    return [sentence for _, _, sentence in sorted(selected, key=lambda item: item[1])]
+
+
+class SimilarityScorer:
+    """Soporte por similitud coseno con los mismos embeddings del índice (sin modelo extra)."""
+    support_threshold = 0.75
+    contradiction_threshold = None  # La similitud no detecta contradicciones
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def score(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        known_vectors: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[float, float]]:
+        """
+        Puntúa pares (afirmación, evidencia) en un único lote.
+
+        Args:
+            pairs (Sequence[Tuple[str, str]]): Pares a puntuar
+            known_vectors (Optional[Dict[str, Any]]): Embeddings ya calculados por texto
+
+        Returns:
+            List[Tuple[float, float]]: (soporte, contradicción) por par
+        """
+        if not pairs:
+            return []
+        vectors = dict(known_vectors or {})
+        pending = list(dict.fromkeys(text for pair in pairs for text in pair if text not in vectors))
+        if pending:
+            vectors.update(zip(pending, self.embeddings.embed_documents(pending)))
+
+        claims = np.asarray([vectors[claim] for claim, _ in pairs], dtype=np.float32)
+        evidence = np.asarray([vectors[text] for _, text in pairs], dtype=np.float32)
+        norms = np.linalg.norm(claims, axis=1) * np.linalg.norm(evidence, axis=1)
+        similarity = np.einsum("ij,ij->i", claims, evidence) / np.maximum(norms, 1e-12)
+        return [(float(value), 0.0) for value in np.clip(similarity, 0.0, 1.0)]
+
+
+class NLIScorer:
+    """
+    Soporte y contradicción con un modelo NLI local (cross-encoder) en lotes.
+
+    El modelo por defecto es multilingüe (XNLI): las afirmaciones llegan en
+    español o traducidas, y los modelos NLI solo en inglés fallan con ellas.
+    """
+    support_threshold = 0.6
+    contradiction_threshold = 0.6
+
+    def __init__(
+        self,
+        model_name: str = "MoritzLaurer/mDeBERTa-v3-base-xnli-multilingual-nli-2mil7",
+        labels: Optional[Tuple[str, ...]] = None,
+        batch_size: int = 32
+    ):
+        """
+        Args:
+            model_name (str): Modelo de clasificación NLI cargado como cross-encoder
+            labels (Optional[Tuple[str, ...]]): Orden de las etiquetas de salida; por defecto el `id2label` del modelo
+            batch_size (int): Pares por lote de inferencia
+        """
+        self.model = sentence_transformers.CrossEncoder(model_name)
+        if labels is None:
+            id2label = self.model.config.id2label
+            labels = tuple(id2label[index].lower() for index in range(len(id2label)))
+        self.entailment = labels.index("entailment")
+        self.contradiction = labels.index("contradiction")
+        self.batch_size = batch_size
+
+    def score(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        known_vectors: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[float, float]]:
+        """Puntúa pares (afirmación, evidencia): la evidencia es la premisa."""
+        if not pairs:
+            return []
+        probabilities = self.model.predict(
+            [(evidence, claim) for claim, evidence in pairs],
+            batch_size=self.batch_size,
+            apply_softmax=True
+        )
+        return [(float(row[self.entailment]), float(row[self.contradiction])) for row in probabilities]
+
+
+@dataclass(frozen=True, slots=True)
+class ClaimVerdict:
+    """Resultado de verificar una afirmación."""
+    claim: str
+    verdict: str  # supported, contradicted o unverified
+    support: float
+    contradiction: float
+    evidence: Optional[str] = None
+    source: Optional[str] = None
+
+
+class FactChecker:
+    """Verificador de afirmaciones contra la base de conocimiento de `DocumentProcessor`."""
+
+    def __init__(self, document_processor, scorer=None, evidence_per_claim: int = 3, max_claims: int = 8):
+        """
+        Args:
+            document_processor (DocumentProcessor): Índice RAG con la evidencia
+            scorer: `NLIScorer` o `SimilarityScorer`; por defecto NLI si sentence-transformers está instalado
+            evidence_per_claim (int): Fragmentos recuperados por afirmación
+            max_claims (int): Afirmaciones máximas por texto
+        """
+        self.document_processor = document_processor
+        if scorer is None:
+            scorer = (
+                NLIScorer() if is_available("sentence_transformers")
+                else SimilarityScorer(document_processor.embeddings)
+            )
+        self.scorer = scorer
+        self.evidence_per_claim = evidence_per_claim
+        self.max_claims = max_claims
+
+    def check(self, text: str) -> Dict[str, Any]:
+        """
+        Verifica las afirmaciones de un texto.
+
+        Args:
+            text (str): Contenido generado
+
+        Returns:
+            Dict[str, Any]: Veredictos por afirmación ("claims") y recuento por veredicto
+        """
+        claims = extract_claims(text, self.max_claims)
+        verdicts = self.verify(claims) if claims else []
+        counts = {"supported": 0, "contradicted": 0, "unverified": 0}
+        for verdict in verdicts:
+            counts[verdict.verdict] += 1
+        return {"claims": [asdict(verdict) for verdict in verdicts], **counts}
+
+    def verify(self, claims: List[str]) -> List[ClaimVerdict]:
+        """Recupera evidencia y puntúa todas las afirmaciones en un solo pase."""
+        claim_vectors = self.document_processor.embeddings.embed_documents(claims)
+        evidence = self.document_processor.query_knowledge_base_batch(
+            claims, k=self.evidence_per_claim, query_vectors=claim_vectors
+        )
+
+        pairs, owners = [], []
+        for index, (claim, documents) in enumerate(zip(claims, evidence)):
+            for document in documents:
+                pairs.append((claim, document["text"]))
+                owners.append((index, document))
+        scores = self.scorer.score(pairs, known_vectors=dict(zip(claims, claim_vectors)))
+
+        # Mejor evidencia por afirmación (mayor soporte; a igualdad, mayor contradicción)
+        best: Dict[int, Tuple[float, float, Dict[str, Any]]] = {}
+        for (index, document), (support, contradiction) in zip(owners, scores):
+            if index not in best or (support, contradiction) > best[index][:2]:
+                best[index] = (support, contradiction, document)
+
+        verdicts = []
+        for index, claim in enumerate(claims):
+            if index not in best:
+                verdicts.append(ClaimVerdict(claim, "unverified", 0.0, 0.0))
+                continue
+            support, contradiction, document = best[index]
+            verdicts.append(ClaimVerdict(
+                claim=claim,
+                verdict=self._verdict(support, contradiction),
+                support=round(support, 4),
+                contradiction=round(contradiction, 4),
+                evidence=document["text"],
+                source=(document.get("metadata") or {}).get("source"),
+            ))
+        return verdicts
+
+    def annotate(self, report: Dict[str, Any], text: str) -> Dict[str, Any]:
+        """
+        Añade los veredictos al reporte de validación.
+
+        Las afirmaciones contradichas se registran como violación de severidad
+        "warning": se informan pero no invalidan el contenido.
+        """
+        try:
+            result = self.check(text)
+        except Exception as e:
+            logger.warning(f"No se pudo verificar el contenido: {e}")
+            return report
+        report["fact_check"] = result
+        if result["contradicted"]:
+            report.setdefault("violations", []).append(asdict(Violation(
+                "fact_check",
+                f"{result['contradicted']} afirmación(es) contradicha(s) por la base de conocimiento",
+                actual=result["contradicted"],
+                limit=0,
+                severity="warning",
+            )))
+        return report
+
+    def _verdict(self, support: float, contradiction: float) -> str:
+        if support >= self.scorer.support_threshold:
+            return "supported"
+        threshold = self.scorer.contradiction_threshold
+        if threshold is not None and contradiction >= threshold:
+            return "contradicted"
+        return "unverified"
+
+
+class FactCheckerAgent(BaseAgent):
+    """Agente de verificación para el grafo: draft -> fact_check."""
+    inputs = ("draft",)
+    outputs = ("fact_check",)
+
+    def __init__(self, name, fact_checker: FactChecker, **kwargs):
+        super().__init__(name, **kwargs)
+        self.fact_checker = fact_checker
+
+    def process(self, draft):
+        return self.fact_checker.check(draft)
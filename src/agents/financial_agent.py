@@ -0,0 +1,340 @@
+"""
+Agente financiero: series de precios con caché local e indicadores vectorizados.
+
+- Los datos llegan de un proveedor intercambiable (`AlphaVantageProvider` con
+  `FINANCIAL_API_KEY`, o `CSVProvider` con ficheros locales para trabajar sin red).
+- `MarketDataCache` guarda cada ticker en formato columnar (Parquet si pyarrow
+  está instalado) y al refrescar solo pide al proveedor los días que faltan.
+- Los indicadores se calculan a la vez para todos los tickers sobre una tabla
+  de cierres (una columna por ticker), sin bucles por ticker.
+- Las gráficas se dibujan en un hilo aparte; el agente devuelve un `Future`.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+from src.agents.base_agent import BaseAgent
+from src.utils.helpers import is_available, lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+requests = lazy_import("requests")
+mpl_figure = lazy_import("matplotlib.figure")
+mpl_backend_agg = lazy_import("matplotlib.backends.backend_agg")
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+TRADING_DAYS = 252
+
+
+class MarketDataProvider:
+    """Interfaz de los proveedores de series diarias."""
+
+    def fetch(self, ticker: str, start: Optional[date] = None) -> "pd.DataFrame":
+        """
+        Devuelve las velas diarias desde `start` (todo el histórico si es None).
+
+        Returns:
+            pd.DataFrame: Índice de fechas "date" y columnas open, high, low, close, volume
+        """
+        raise NotImplementedError("Este método debe ser implementado por cada proveedor.")
+
+
+def _normalize(frame: "pd.DataFrame", start: Optional[date]) -> "pd.DataFrame":
+    frame = frame.rename(columns=str.lower)
+    if "date" in frame.columns:
+        frame = frame.set_index("date")
+    frame.index = pd.to_datetime(frame.index)
+    frame.index.name = "date"
+    frame = frame[list(PRICE_COLUMNS)].astype("float64").sort_index()
+    if start is not None:
+        frame = frame[frame.index >= pd.Timestamp(start)]
+    return frame
+
+
+class CSVProvider(MarketDataProvider):
+    """Proveedor sin red: lee `<TICKER>.parquet` o `<TICKER>.csv` de un directorio."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def fetch(self, ticker: str, start: Optional[date] = None) -> "pd.DataFrame":
+        parquet = self.directory / f"{ticker}.parquet"
+        if parquet.exists():
+            return _normalize(pd.read_parquet(parquet), start)
+        csv = self.directory / f"{ticker}.csv"
+        if not csv.exists():
+            raise ValueError(f"No hay datos locales para {ticker} en {self.directory}")
+        return _normalize(pd.read_csv(csv), start)
+
+
+class AlphaVantageProvider(MarketDataProvider):
+    """Series diarias de Alpha Vantage; en refrescos recientes pide solo los últimos 100 días."""
+    URL = "https://www.alphavantage.co/query"
+    COMPACT_DAYS = 100
+
+    def __init__(self, api_key: str, timeout: float = 15.0):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def fetch(self, ticker: str, start: Optional[date] = None) -> "pd.DataFrame":
+        # "compact" devuelve ~100 sesiones: suficiente si solo faltan unos días
+        compact = start is not None and (date.today() - start).days < self.COMPACT_DAYS
+        response = self.session.get(self.URL, params={
+            "function": "TIME_SERIES_DAILY",
+            "symbol": ticker,
+            "outputsize": "compact" if compact else "full",
+            "apikey": self.api_key,
+        }, timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+        series = payload.get("Time Series (Daily)")
+        if series is None:
+            raise RuntimeError(f"Respuesta sin datos para {ticker}: {payload.get('Note') or payload}")
+        frame = pd.DataFrame.from_dict(series, orient="index")
+        frame.columns = [column.split(". ", 1)[-1] for column in frame.columns]
+        return _normalize(frame, start)
+
+
+def get_provider(config) -> MarketDataProvider:
+    """Proveedor según la configuración: Alpha Vantage con clave, CSV local sin ella."""
+    if config.financial_provider == "alphavantage":
+        if not config.financial_api_key:
+            raise ValueError("El proveedor alphavantage requiere FINANCIAL_API_KEY")
+        return AlphaVantageProvider(config.financial_api_key)
+    return CSVProvider(config.financial_data_dir)
+
+
+class MarketDataCache:
+    """Caché local por ticker con refresco incremental."""
+
+    def __init__(
+        self,
+        directory: Path,
+        provider: MarketDataProvider,
+        refresh_interval: float = 900.0,
+        max_workers: int = 4
+    ):
+        """
+        Args:
+            directory (Path): Directorio de la caché
+            provider (MarketDataProvider): Origen de los datos
+            refresh_interval (float): Segundos durante los que un ticker se considera fresco
+            max_workers (int): Tickers que se refrescan en paralelo
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.provider = provider
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self.suffix = ".parquet" if is_available("pyarrow") else ".pkl"
+        self._frames: Dict[str, "pd.DataFrame"] = {}
+        self._checked: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def history(self, ticker: str) -> "pd.DataFrame":
+        """Histórico del ticker, refrescado si ha caducado."""
+        ticker = ticker.upper()
+        with self._lock_for(ticker):
+            frame = self._frames.get(ticker)
+            if frame is None:
+                frame = self._load(ticker)
+            if frame is None or time.time() - self._checked.get(ticker, 0.0) > self.refresh_interval:
+                frame = self._refresh(ticker, frame)
+            self._frames[ticker] = frame
+            return frame
+
+    def closes(self, tickers: Sequence[str]) -> "pd.DataFrame":
+        """Cierres alineados por fecha, una columna por ticker (refrescos en paralelo)."""
+        tickers = [ticker.upper() for ticker in tickers]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers)) or 1) as executor:
+            frames = list(executor.map(self.history, tickers))
+        return pd.concat({ticker: frame["close"] for ticker, frame in zip(tickers, frames)}, axis=1)
+
+    def _refresh(self, ticker: str, cached: Optional["pd.DataFrame"]) -> "pd.DataFrame":
+        start = None
+        if cached is not None and not cached.empty:
+            start = (cached.index[-1] + timedelta(days=1)).date()
+        try:
+            fresh = self.provider.fetch(ticker, start=start)
+        except Exception as e:
+            if cached is None:
+                raise
+            # Mejor datos de ayer que ningún dato; se reintenta en el siguiente intervalo, no en cada llamada
+            self._checked[ticker] = time.time()
+            logger.warning(f"No se pudo refrescar {ticker}, se usa la caché: {e}")
+            return cached
+        self._checked[ticker] = time.time()
+        if cached is not None and fresh.empty:
+            return cached
+        frame = fresh if cached is None else pd.concat([cached, fresh])
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        self._save(ticker, frame)
+        return frame
+
+    def _path(self, ticker: str) -> Path:
+        return self.directory / f"{ticker}{self.suffix}"
+
+    def _load(self, ticker: str) -> Optional["pd.DataFrame"]:
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+        self._checked[ticker] = path.stat().st_mtime
+        return pd.read_parquet(path) if self.suffix == ".parquet" else pd.read_pickle(path)
+
+    def _save(self, ticker: str, frame: "pd.DataFrame") -> None:
+        path = self._path(ticker)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        if self.suffix == ".parquet":
+            frame.to_parquet(tmp)
+        else:
+            frame.to_pickle(tmp)
+        os.replace(tmp, path)
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+
+def compute_indicators(
+    closes: "pd.DataFrame",
+    windows: Iterable[int] = (20, 50),
+    volatility_window: int = 20
+) -> "pd.DataFrame":
+    """
+    Indicadores del último día para todos los tickers a la vez.
+
+    Args:
+        closes (pd.DataFrame): Cierres con una columna por ticker
+        windows (Iterable[int]): Ventanas de las medias móviles
+        volatility_window (int): Sesiones para la volatilidad anualizada
+
+    Returns:
+        pd.DataFrame: Una fila por ticker con precio, rentabilidades, medias,
+            volatilidad y caída máxima
+    """
+    closes = closes.sort_index().ffill()
+    last = closes.iloc[-1]
+    log_returns = np.log(closes / closes.shift(1))
+    year_start = closes[closes.index >= pd.Timestamp(closes.index[-1].year, 1, 1)].iloc[0]
+
+    indicators = {
+        "close": last,
+        "return_1d": closes.pct_change(1, fill_method=None).iloc[-1],
+        "return_1w": closes.pct_change(5, fill_method=None).iloc[-1],
+        "return_1m": closes.pct_change(21, fill_method=None).iloc[-1],
+        "return_ytd": last / year_start - 1,
+        "volatility": log_returns.tail(volatility_window).std() * np.sqrt(TRADING_DAYS),
+        "max_drawdown": (closes / closes.cummax() - 1).min(),
+    }
+    for window in windows:
+        indicators[f"sma_{window}"] = closes.tail(window).mean()
+    return pd.DataFrame(indicators)
+
+
+def summarize(indicators: "pd.DataFrame") -> str:
+    """Resumen en texto para el prompt del redactor."""
+    lines = []
+    for ticker, row in indicators.iterrows():
+        lines.append(
+            f"{ticker}: cierre {row['close']:.2f} ({row['return_1d']:+.1%} diario, "
+            f"{row['return_1m']:+.1%} en un mes, {row['return_ytd']:+.1%} en el año), "
+            f"volatilidad anual {row['volatility']:.0%}"
+        )
+    return "\n".join(lines)
+
+
+class ChartRenderer:
+    """Dibuja gráficas en un hilo propio con la API orientada a objetos (sin pyplot)."""
+
+    def __init__(self, output_dir: Path, max_workers: int = 1):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="charts")
+
+    def submit(self, closes: "pd.DataFrame", title: str = "") -> "Future[str]":
+        """Encola la gráfica y devuelve un Future con la ruta del PNG."""
+        return self._executor.submit(self.render, closes.copy(), title)
+
+    def render(self, closes: "pd.DataFrame", title: str = "") -> str:
+        """Gráfica de rendimiento normalizado (base 100); el nombre depende de los datos."""
+        digest = hashlib.sha256(
+            pd.util.hash_pandas_object(closes, index=True).values.tobytes() + title.encode("utf-8")
+        ).hexdigest()
+        path = self.output_dir / f"{digest[:32]}.png"
+        if path.exists():
+            return str(path)
+
+        normalized = closes.ffill() / closes.bfill().iloc[0] * 100
+        figure = mpl_figure.Figure(figsize=(8, 4.5), dpi=100)
+        mpl_backend_agg.FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+        for ticker in normalized.columns:
+            axes.plot(normalized.index, normalized[ticker], label=ticker, linewidth=1.5)
+        axes.set_title(title)
+        axes.set_ylabel("Base 100")
+        axes.grid(alpha=0.3)
+        axes.legend()
+        figure.autofmt_xdate()
+        tmp = path.with_suffix(".tmp.png")
+        figure.savefig(tmp, format="png", bbox_inches="tight")
+        os.replace(tmp, path)
+        return str(path)
+
+
+class FinancialAgent(BaseAgent):
+    """Agente financiero para el grafo: tickers -> market_data."""
+    inputs = ("tickers",)
+    outputs = ("market_data",)
+
+    def __init__(
+        self,
+        name,
+        cache: MarketDataCache,
+        charts: Optional[ChartRenderer] = None,
+        lookback_days: int = 365,
+        **kwargs
+    ):
+        """
+        Args:
+            name: Nombre del agente
+            cache (MarketDataCache): Caché de series
+            charts (Optional[ChartRenderer]): Renderizador de gráficas (sin él no hay gráfica)
+            lookback_days (int): Días de histórico usados para indicadores y gráfica
+            **kwargs: inputs, outputs, timeout y required (ver `BaseAgent`)
+        """
+        super().__init__(name, **kwargs)
+        self.cache = cache
+        self.charts = charts
+        self.lookback_days = lookback_days
+
+    @classmethod
+    def from_config(cls, config, name: str = "financial", **kwargs) -> "FinancialAgent":
+        cache = MarketDataCache(config.data_dir / "market_cache", get_provider(config))
+        return cls(name, cache, ChartRenderer(config.temp_dir / "charts"), **kwargs)
+
+    def process(self, tickers):
+        """
+        Returns:
+            Dict[str, Any]: "summary" (texto), "indicators" (lista de dicts) y
+                "chart" (Future con la ruta del PNG, o None)
+        """
+        if isinstance(tickers, str):
+            tickers = [ticker.strip() for ticker in tickers.split(",") if ticker.strip()]
+        closes = self.cache.closes(tickers)
+        closes = closes[closes.index >= closes.index[-1] - timedelta(days=self.lookback_days)]
+        indicators = compute_indicators(closes)
+        chart = self.charts.submit(closes, title=", ".join(closes.columns)) if self.charts else None
+        return {
+            "summary": summarize(indicators),
+            "indicators": indicators.reset_index(names="ticker").to_dict(orient="records"),
+            "chart": chart,
+        }
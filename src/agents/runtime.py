@@ -0,0 +1,197 @@
+"""
+Ejecución de agentes como grafo de dependencias (DAG).
+
+Un agente depende de los que producen sus entradas. Cada agente se lanza en
+cuanto terminan sus dependencias, de modo que los pasos independientes (p. ej.
+la búsqueda en RAG del agente científico y la descarga de datos del agente
+financiero) se solapan y el tiempo total es el del camino crítico, no la suma.
+"""
+import asyncio
+import functools
+import logging
+import time
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+from src.agents.base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class AgentContext:
+    """Estado compartido de una petición: valores producidos, tiempos y errores por agente."""
+    values: Dict[str, Any]
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    executor: Optional[Executor] = None  # None: pool por defecto del event loop
+    timings: Dict[str, float] = field(default_factory=dict)  # ms por agente
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    async def run_in_executor(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta una función bloqueante en el pool de hilos sin bloquear el event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args))
+
+
+class AgentGraph:
+    """Grafo de agentes conectados por sus entradas y salidas."""
+
+    def __init__(self, agents: Sequence[BaseAgent]):
+        """
+        Construye y valida el grafo.
+
+        Args:
+            agents (Sequence[BaseAgent]): Agentes; el orden no importa
+
+        Raises:
+            ValueError: Si hay nombres o salidas repetidos o dependencias circulares
+        """
+        self.agents = list(agents)
+        names = [agent.name for agent in self.agents]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Nombres de agente repetidos: {names}")
+
+        self.producers: Dict[str, BaseAgent] = {}
+        for agent in self.agents:
+            for output in agent.outputs:
+                if output in self.producers:
+                    raise ValueError(
+                        f"La salida '{output}' la producen {self.producers[output].name} y {agent.name}"
+                    )
+                self.producers[output] = agent
+
+        self.dependencies: Dict[str, List[BaseAgent]] = {
+            agent.name: list({
+                self.producers[key].name: self.producers[key]
+                for key in agent.inputs if key in self.producers
+            }.values())
+            for agent in self.agents
+        }
+        self.order = self._topological_order()
+
+    @property
+    def required_inputs(self) -> List[str]:
+        """Entradas que no produce ningún agente y deben venir en la petición."""
+        return sorted({
+            key for agent in self.agents for key in agent.inputs if key not in self.producers
+        })
+
+    def _topological_order(self) -> List[BaseAgent]:
+        order: List[BaseAgent] = []
+        state: Dict[str, int] = {}  # 1: visitando, 2: terminado
+
+        def visit(agent: BaseAgent, path: List[str]) -> None:
+            if state.get(agent.name) == 2:
+                return
+            if state.get(agent.name) == 1:
+                raise ValueError(f"Dependencia circular entre agentes: {' -> '.join(path + [agent.name])}")
+            state[agent.name] = 1
+            for dependency in self.dependencies[agent.name]:
+                visit(dependency, path + [agent.name])
+            state[agent.name] = 2
+            order.append(agent)
+
+        for agent in self.agents:
+            visit(agent, [])
+        return order
+
+    async def run(
+        self,
+        inputs: Mapping[str, Any],
+        executor: Optional[Executor] = None,
+        request_id: Optional[str] = None
+    ) -> AgentContext:
+        """
+        Ejecuta el grafo con la máxima concurrencia que permiten las dependencias.
+
+        Si un agente obligatorio falla o agota su timeout, los que dependen de él
+        no se ejecutan. Si es opcional, sus salidas quedan a None y el resto sigue.
+        Los errores se registran en `context.errors`; no se propagan.
+
+        Args:
+            inputs (Mapping[str, Any]): Valores iniciales de la petición
+            executor (Optional[Executor]): Pool para los agentes síncronos
+            request_id (Optional[str]): Identificador para trazas (se genera si falta)
+
+        Returns:
+            AgentContext: Contexto con todos los valores producidos
+
+        Raises:
+            ValueError: Si faltan entradas que ningún agente produce
+        """
+        missing = [key for key in self.required_inputs if key not in inputs]
+        if missing:
+            raise ValueError(f"Faltan entradas para el grafo de agentes: {missing}")
+
+        context = AgentContext(values=dict(inputs), executor=executor)
+        if request_id:
+            context.request_id = request_id
+
+        tasks: Dict[str, "asyncio.Task[bool]"] = {}
+        for agent in self.order:
+            dependencies = [tasks[dependency.name] for dependency in self.dependencies[agent.name]]
+            tasks[agent.name] = asyncio.create_task(
+                self._run_agent(agent, dependencies, context), name=f"agent:{agent.name}"
+            )
+        await asyncio.gather(*tasks.values())
+        return context
+
+    def run_sync(self, inputs: Mapping[str, Any], executor: Optional[Executor] = None) -> AgentContext:
+        """
+        Versión síncrona de `run` (Streamlit, scripts); no usar dentro de un event loop.
+
+        Sin `executor` se usa un pool propio que se cierra sin esperar: un agente que
+        agotó su timeout sigue en su hilo, pero el llamador no se queda bloqueado
+        (`asyncio.run` sí esperaría al pool por defecto del loop).
+        """
+        pool = executor or ThreadPoolExecutor(max_workers=len(self.agents) or 1, thread_name_prefix="agent")
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.run(inputs, executor=pool))
+        finally:
+            if executor is None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _run_agent(
+        self,
+        agent: BaseAgent,
+        dependencies: List["asyncio.Task[bool]"],
+        context: AgentContext
+    ) -> bool:
+        """Espera a las dependencias y ejecuta el agente; devuelve si sus salidas son utilizables."""
+        if dependencies and not all(await asyncio.gather(*dependencies)):
+            context.errors[agent.name] = "No ejecutado: falló una dependencia obligatoria"
+            return self._skip(agent, context)
+
+        start = time.perf_counter()
+        try:
+            outputs = await asyncio.wait_for(agent.arun(context), timeout=agent.timeout)
+        except asyncio.TimeoutError:
+            # Un agente síncrono sigue en su hilo hasta terminar; solo se deja de esperar
+            context.errors[agent.name] = f"Timeout tras {agent.timeout} s"
+            logger.warning(f"[{context.request_id}] Agente {agent.name}: timeout tras {agent.timeout} s")
+            return self._skip(agent, context)
+        except Exception as e:
+            context.errors[agent.name] = str(e)
+            logger.error(f"[{context.request_id}] Agente {agent.name} falló: {e}")
+            return self._skip(agent, context)
+        finally:
+            context.timings[agent.name] = (time.perf_counter() - start) * 1000
+
+        context.values.update(outputs)
+        return True
+
+    @staticmethod
+    def _skip(agent: BaseAgent, context: AgentContext) -> bool:
+        if agent.required:
+            return False
+        for output in agent.outputs:
+            context.values.setdefault(output, None)
+        return True
@@ -0,0 +1,311 @@
+"""
+Agente científico con índice de temas precalculado.
+
+Un hilo de fondo ingiere periódicamente papers de arXiv para los temas
+seguidos y calcula, por tema, la lista de papers más cercanos y el centroide
+de sus embeddings. En la petición solo se consulta ese índice en memoria: por
+nombre de tema normalizado o, si no coincide, por similitud con los
+centroides. Solo un tema desconocido provoca una ingesta bajo demanda, y las
+peticiones simultáneas del mismo tema comparten una única descarga.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from src.agents.base_agent import BaseAgent
+from src.utils.helpers import SingleFlight, lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_topic(topic: str) -> str:
+    """Clave de tema: minúsculas y espacios simples."""
+    return re.sub(r"\s+", " ", topic.strip().lower())
+
+
+@dataclass(frozen=True, slots=True)
+class TopicEntry:
+    """Tema indexado: papers más cercanos y centroide de sus embeddings."""
+    topic: str
+    papers: Tuple[Dict[str, Any], ...]
+    centroid: Tuple[float, ...]
+    refreshed_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    entries: Mapping[str, TopicEntry]
+    keys: Tuple[str, ...]
+    centroids: Any  # np.ndarray (temas x dimensión), filas normalizadas; None si está vacío
+
+
+_EMPTY = _Snapshot(MappingProxyType({}), (), None)
+
+
+def _unit(vectors: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class ScientificIndex:
+    """Índice en memoria tema -> papers, con ingesta bajo demanda y persistencia en JSON."""
+
+    def __init__(
+        self,
+        document_processor,
+        index_path: Optional[Path] = None,
+        papers_per_topic: int = 5,
+        fetch_results: int = 10,
+        similarity_threshold: float = 0.6
+    ):
+        """
+        Args:
+            document_processor (DocumentProcessor): Origen de papers (arXiv), embeddings y almacén RAG
+            index_path (Optional[Path]): Fichero donde persistir el índice entre reinicios
+            papers_per_topic (int): Papers que se guardan por tema
+            fetch_results (int): Papers que se piden a arXiv antes de quedarse con los más cercanos
+            similarity_threshold (float): Similitud coseno mínima con un centroide para reutilizar su tema
+        """
+        self.document_processor = document_processor
+        self.index_path = Path(index_path) if index_path else None
+        self.papers_per_topic = papers_per_topic
+        self.fetch_results = fetch_results
+        self.similarity_threshold = similarity_threshold
+        self._snapshot = _EMPTY
+        self._write_lock = threading.Lock()
+        self._single_flight = SingleFlight()
+        if self.index_path and self.index_path.exists():
+            self.load()
+
+    @property
+    def topics(self) -> List[str]:
+        return list(self._snapshot.keys)
+
+    def entry(self, topic: str) -> Optional[TopicEntry]:
+        """Entrada exacta del tema, si existe (sin embeddings ni red)."""
+        return self._snapshot.entries.get(normalize_topic(topic))
+
+    def lookup(self, topic: str) -> Optional[TopicEntry]:
+        """
+        Busca el tema en memoria: primero por nombre, luego por el centroide más cercano.
+
+        Returns:
+            Optional[TopicEntry]: Entrada encontrada, o None si el tema es desconocido
+        """
+        entry = self.entry(topic)
+        if entry is not None:
+            return entry
+        snapshot = self._snapshot
+        if snapshot.centroids is None:
+            return None
+        query = _unit(np.asarray(self.document_processor.embeddings.embed_query(topic), dtype=np.float32))
+        similarities = snapshot.centroids @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            return snapshot.entries[snapshot.keys[best]]
+        return None
+
+    def get(self, topic: str) -> TopicEntry:
+        """Entrada del tema; si es desconocido se ingiere una sola vez aunque lo pidan varios hilos."""
+        entry = self.lookup(topic)
+        if entry is not None:
+            return entry
+        key = normalize_topic(topic)
+        return self._single_flight.do(key, self._ingest_if_missing, key)
+
+    def _ingest_if_missing(self, key: str) -> TopicEntry:
+        # Otro vuelo pudo completarla justo antes de entrar en este
+        return self.entry(key) or self.ingest(key)
+
+    def ingest(self, topic: str) -> TopicEntry:
+        """
+        Descarga papers del tema, se queda con los más cercanos y actualiza el índice.
+
+        Raises:
+            ValueError: Si arXiv no devuelve papers para el tema
+        """
+        key = normalize_topic(topic)
+        papers = self.document_processor.fetch_arxiv_papers(key, max_results=self.fetch_results)
+        if not papers:
+            raise ValueError(f"No se encontraron papers para el tema '{key}'")
+
+        embeddings = self.document_processor.embeddings
+        vectors = _unit(np.asarray(
+            embeddings.embed_documents([f"{paper['title']}. {paper['abstract']}" for paper in papers]),
+            dtype=np.float32
+        ))
+        query = _unit(np.asarray(embeddings.embed_query(key), dtype=np.float32))
+        similarities = vectors @ query
+        nearest = np.argsort(-similarities)[:self.papers_per_topic]
+        centroid = _unit(vectors[nearest].mean(axis=0))
+
+        # Al almacén vectorial para RAG y el verificador, solo los que no se guardaron en el refresco anterior
+        previous = self.entry(key)
+        known = {paper.get("url") for paper in previous.papers} if previous else set()
+        new_papers = [papers[i] for i in nearest if papers[i].get("url") not in known]
+        if new_papers:
+            self.document_processor.process_papers(new_papers)
+
+        entry = TopicEntry(
+            topic=key,
+            papers=tuple(
+                dict(self._serializable(papers[i]), score=round(float(similarities[i]), 4))
+                for i in nearest
+            ),
+            centroid=tuple(float(value) for value in centroid),
+            refreshed_at=time.time(),
+        )
+        self._publish({key: entry})
+        return entry
+
+    def stale_topics(self, max_age: float) -> List[str]:
+        """Temas cuyo último refresco es anterior a `max_age` segundos, los más antiguos primero."""
+        now = time.time()
+        entries = sorted(self._snapshot.entries.values(), key=lambda entry: entry.refreshed_at)
+        return [entry.topic for entry in entries if now - entry.refreshed_at > max_age]
+
+    def save(self) -> None:
+        """Persiste el índice (escritura atómica)."""
+        if self.index_path is None:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = [
+            {"topic": e.topic, "papers": list(e.papers), "centroid": list(e.centroid), "refreshed_at": e.refreshed_at}
+            for e in self._snapshot.entries.values()
+        ]
+        tmp = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def load(self) -> None:
+        """Carga el índice persistido."""
+        payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        self._publish({
+            item["topic"]: TopicEntry(
+                topic=item["topic"],
+                papers=tuple(item["papers"]),
+                centroid=tuple(item["centroid"]),
+                refreshed_at=item["refreshed_at"],
+            )
+            for item in payload
+        })
+
+    def _publish(self, updates: Mapping[str, TopicEntry]) -> None:
+        """Sustituye la instantánea completa: los lectores nunca ven un índice a medias."""
+        with self._write_lock:
+            entries = dict(self._snapshot.entries)
+            entries.update(updates)
+            keys = tuple(entries)
+            centroids = (
+                np.asarray([entries[key].centroid for key in keys], dtype=np.float32) if keys else None
+            )
+            self._snapshot = _Snapshot(MappingProxyType(entries), keys, centroids)
+
+    @staticmethod
+    def _serializable(paper: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            key: value.isoformat() if hasattr(value, "isoformat") else value
+            for key, value in paper.items()
+        }
+
+
+class BackgroundRefresher:
+    """Hilo que mantiene al día los temas seguidos (y los aprendidos bajo demanda)."""
+
+    def __init__(
+        self,
+        index: ScientificIndex,
+        topics: Sequence[str] = (),
+        interval: float = 6 * 3600,
+        pause: float = 3.0
+    ):
+        """
+        Args:
+            index (ScientificIndex): Índice a mantener
+            topics (Sequence[str]): Temas seguidos desde el arranque
+            interval (float): Segundos entre refrescos de un mismo tema
+            pause (float): Pausa entre descargas (arXiv pide no encadenar peticiones)
+        """
+        self.index = index
+        self.topics = [normalize_topic(topic) for topic in topics]
+        self.interval = interval
+        self.pause = pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Ingiere los temas seguidos que faltan y refresca los caducados; devuelve cuántos."""
+        pending = [topic for topic in self.topics if self.index.entry(topic) is None]
+        pending += [topic for topic in self.index.stale_topics(self.interval) if topic not in pending]
+        refreshed = 0
+        for topic in pending:
+            if self._stop.is_set():
+                break
+            try:
+                self.index.ingest(topic)
+                refreshed += 1
+            except Exception as e:
+                logger.warning(f"No se pudo refrescar el tema '{topic}': {e}")
+            self._stop.wait(self.pause)
+        if refreshed:
+            self.index.save()
+        return refreshed
+
+    def start(self) -> "BackgroundRefresher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="scientific-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            # Se revisa con más frecuencia que `interval` para recoger temas nuevos
+            self._stop.wait(min(self.interval, 300))
+
+
+class ScientificAgent(BaseAgent):
+    """Agente científico para el grafo: topic -> research."""
+    inputs = ("topic",)
+    outputs = ("research",)
+
+    def __init__(self, name, index: ScientificIndex, refresher: Optional[BackgroundRefresher] = None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.index = index
+        self.refresher = refresher
+
+    @classmethod
+    def from_config(cls, config, document_processor=None, name: str = "scientific", **kwargs) -> "ScientificAgent":
+        """Crea el índice persistido en `data_dir` y arranca el refresco de los temas configurados."""
+        if document_processor is None:
+            from src.rag.document_processor import DocumentProcessor
+            document_processor = DocumentProcessor(config)
+        index = ScientificIndex(document_processor, config.data_dir / "scientific_index.json")
+        refresher = BackgroundRefresher(
+            index, config.scientific_topics, interval=config.scientific_refresh_interval
+        ).start()
+        return cls(name, index, refresher, **kwargs)
+
+    def process(self, topic):
+        """Resumen de los papers más cercanos al tema, listo para el prompt del redactor."""
+        entry = self.index.get(topic)
+        lines = []
+        for paper in entry.papers:
+            abstract = " ".join(paper.get("abstract", "").split())
+            first_sentence = abstract.split(". ")[0]
+            lines.append(f"- {paper['title']} ({paper['url']}): {first_sentence}")
+        return "\n".join(lines)
@@ -1,20 +1,146 @@
 from fastapi import Request, Response
 import logging
+import time
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.utils.helpers import is_available, lazy_import
 
-# Configuración básica de logging
-logging.basicConfig(level=logging.INFO)
+brotli = lazy_import("brotli")
+
+# La configuración (cola, JSON, rotación) la hace Config al arrancar; aquí solo se obtiene el logger
 logger = logging.getLogger(__name__)
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        # Log de la solicitud entrante
-        logger.info(f"Solicitud recibida: {request.method} {request.url}")
-        
         # Ejecutar el siguiente middleware o endpoint
+        start = time.perf_counter()
         response = await call_next(request)
-        
-        # Log de la respuesta
-        logger.info(f"Respuesta: {response.status_code}")
-        
+        elapsed = time.perf_counter() - start
+
+        # Tiempo de proceso en el servidor: permite separar la espera en cola de la latencia total
+        response.headers["X-Process-Time"] = f"{elapsed:.6f}"
+
+        # Un registro estructurado por petición (solo se encola; la escritura va en otro hilo)
+        logger.info(
+            "Solicitud atendida",
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": round(elapsed * 1000, 3),
+            }
+        )
+
         return response
+
+
+# Tipos que merece la pena comprimir (las imágenes ya van comprimidas)
+_COMPRESSIBLE = ("application/json", "application/problem+json", "text/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Elige brotli o gzip según Accept-Encoding (con sus pesos q) y lo instalado."""
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    offered = [coding for coding in ("br", "gzip") if coding != "br" or is_available("brotli")]
+    best = max(offered, key=lambda coding: weights.get(coding, wildcard), default=None)
+    return best if best is not None and weights.get(best, wildcard) > 0 else None
+
+
+def _compressor(encoding: str, gzip_level: int, brotli_quality: int):
+    """Compresor incremental con interfaz común: (process, flush, finish)."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime con brotli o gzip las respuestas JSON y de texto.
+
+    Las respuestas pequeñas, las parciales (206), las ya codificadas y las de
+    HEAD pasan sin tocar. Las respuestas en streaming se comprimen por trozos
+    con vaciado en cada uno para no retrasar al cliente.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start: Optional[Message] = None
+        buffered = b""  # Cuerpo retenido hasta saber si llega al tamaño mínimo
+        compress = None  # (process, flush, finish) una vez decidida la compresión
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, buffered, compress, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    message["status"] in (204, 206, 304)
+                    or "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(_COMPRESSIBLE)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message  # Se decide con los primeros trozos del cuerpo
+                return
+            if passthrough or message["type"] != "http.response.body":
+                return await send(message)
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if start is not None:
+                # Los middlewares de Starlette pueden partir incluso cuerpos pequeños en varios mensajes
+                buffered += body
+                if more_body and len(buffered) < self.minimum_size:
+                    return
+                body, buffered = buffered, b""
+                headers = MutableHeaders(raw=start["headers"])
+                if len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    return await send({"type": "http.response.body", "body": body})
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = encoding
+                compress = _compressor(encoding, self.gzip_level, self.brotli_quality)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = compress[0](body) + compress[2]()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    start = None
+                    return await send({"type": "http.response.body", "body": body})
+                await send(start)
+                start = None
+
+            process, flush, finish = compress
+            chunk = process(body) + (flush() if more_body else finish())
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
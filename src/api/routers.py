@@ -1,8 +1,20 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import mimetypes
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
 from src.content.generator import ContentGenerator
 from src.utils.config import Config
-from typing import Dict
+from typing import Dict, List, Optional
+
+# Nombre de las imágenes servidas: sha256 del contenido + extensión (ver ImageOptimizer.save)
+MEDIA_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})\.(?:webp|jpe?g|png|gif)$")
+# El nombre cambia si cambia el contenido: clientes y CDN pueden guardarlas indefinidamente
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 # Inicializamos el router
 router = APIRouter()
@@ -12,41 +24,135 @@ class ContentRequest(BaseModel):
     platform: str
     language: str
     audience: str
-    company_info: str = None
+    company_info: Optional[str] = None
+    variants: int = Field(1, ge=1, le=5)  # Número de alternativas a generar en una sola llamada
 
 class ContentResponse(BaseModel):
-    content: Dict[str, str]
-    image_url: str = None
+    content: Dict[str, Optional[str]]
+    image_url: Optional[str] = None  # URL en /media, accesible desde otros hosts
+    images: Optional[Dict[str, str]] = None  # URL de cada versión optimizada por nombre
     platform: str
     language: str
+    variants: Optional[List[str]] = None  # Textos alternativos ordenados de mejor a peor
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Configuración compartida del proceso."""
+    return Config()
+
+@lru_cache(maxsize=1)
+def _build_content_generator() -> ContentGenerator:
+    # Cargar la configuración
+    config = get_config()
+    config.validate()  # Validar configuración
+    return ContentGenerator(config=config)
+
+def get_content_generator() -> ContentGenerator:
+    """
+    Dependencia que devuelve el generador compartido del proceso.
+
+    Los modelos se cargan una sola vez en lugar de en cada petición; los tests y
+    benchmarks pueden sustituirlo con `app.dependency_overrides`.
+    """
+    try:
+        return _build_content_generator()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al inicializar el generador: {str(e)}")
 
 @router.post("/generate-content", response_model=ContentResponse)
-async def generate_content(request: ContentRequest):
+async def generate_content(
+    request: ContentRequest,
+    http_request: Request,
+    generator: ContentGenerator = Depends(get_content_generator)
+):
     """Genera contenido para una plataforma específica"""
     
     try:
-        # Cargar la configuración
-        config = Config()
-        config.validate()  # Validar configuración
-        
-        # Inicializar el generador de contenido
-        generator = ContentGenerator(config=config)
-        
         # Generar el contenido
-        result = generator.generate(
+        # La generación es bloqueante: se ejecuta en el threadpool para no detener el event loop
+        result = await run_in_threadpool(
+            generator.generate,
             platform=request.platform.lower(),
             topic=request.topic,
             audience=request.audience,
             language=request.language,
-            company_info=request.company_info
+            company_info=request.company_info,
+            variants=request.variants
         )
         
+        content = dict(result["content"])
+        if content.get("image"):
+            content["image"] = _media_url(http_request, content["image"])
+        images = {name: _media_url(http_request, path) for name, path in (result.get("images") or {}).items()}
         return ContentResponse(
-            content=result["content"],
-            image_url=result.get("image_url"),
+            content=content,
+            image_url=_media_url(http_request, result.get("image_url")),
+            images=images or None,
             platform=result["platform"],
-            language=result["language"]
+            language=result["language"],
+            variants=[variant["content"]["text"] for variant in result.get("variants", [])] or None
         )
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar contenido: {str(e)}")
+
+@router.get("/semantic-cache/stats")
+async def semantic_cache_stats(generator: ContentGenerator = Depends(get_content_generator)):
+    """Métricas de la caché semántica (aciertos, similitud y calidad de lo reutilizado)"""
+    if generator.semantic_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **generator.semantic_cache.stats()}
+
+@dataclass(frozen=True, slots=True)
+class MediaSettings:
+    """Dónde están las imágenes y, opcionalmente, el prefijo interno de nginx."""
+    directory: Path
+    accel_redirect: Optional[str] = None
+
+def get_media_settings() -> MediaSettings:
+    """Dependencia con la configuración de /media (sustituible en tests)."""
+    config = get_config()
+    return MediaSettings(config.media_dir, config.media_accel_redirect)
+
+def _media_url(request: Request, path: Optional[str]) -> Optional[str]:
+    """Convierte la ruta local de una imagen generada en su URL pública en /media."""
+    if not path:
+        return None
+    name = Path(path).name
+    if not MEDIA_NAME.match(name):
+        return path  # No es una imagen con nombre por hash: se devuelve tal cual
+    return str(request.url_for("get_media", filename=name))
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110), que es la que aplica a GET/HEAD."""
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+@router.api_route("/media/{filename}", methods=["GET", "HEAD"], name="get_media")
+async def get_media(
+    filename: str,
+    request: Request,
+    settings: MediaSettings = Depends(get_media_settings)
+):
+    """
+    Sirve una imagen generada por su hash de contenido.
+
+    El ETag fuerte es el propio hash, así que las peticiones condicionales se
+    resuelven sin leer el fichero. FileResponse atiende Range/If-Range y usa
+    `http.response.pathsend` (envío sin copia) si el servidor lo soporta; con
+    MEDIA_ACCEL_REDIRECT el envío se delega a nginx.
+    """
+    match = MEDIA_NAME.match(filename)
+    path = settings.directory / filename
+    if match is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+
+    headers = {"ETag": f'"{match["digest"]}"', "Cache-Control": MEDIA_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if settings.accel_redirect:
+        headers["X-Accel-Redirect"] = f"{settings.accel_redirect.rstrip('/')}/{filename}"
+        return Response(headers=headers, media_type=mimetypes.guess_type(filename)[0])
+    return FileResponse(path, headers=headers)
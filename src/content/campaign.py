@@ -0,0 +1,411 @@
+"""
+Generación masiva de campañas a partir de un calendario en CSV.
+
+Uso:
+    python -m src.content.campaign calendario.csv salida/ [--workers 4] [--window 200] [--model local]
+
+El CSV se lee en streaming (columnas topic, platform, language, audience y,
+opcionalmente, company_info y variants). Cada resultado se añade a
+`salida/results.jsonl` en cuanto termina y las imágenes se guardan por hash de
+contenido en `salida/images/`. El propio JSONL es el punto de control: al
+relanzar el comando se omiten las filas ya completadas y se reintentan las
+fallidas.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+from src.utils.helpers import SingleFlight, default_file_mode
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("topic", "platform", "language", "audience")
+RESULTS_FILE = "results.jsonl"
+IMAGES_DIR = "images"
+
+
+@dataclass(frozen=True, slots=True)
+class CampaignRow:
+    """Fila del calendario (index es la posición de la fila de datos, desde 1)."""
+    index: int
+    topic: str
+    platform: str
+    language: str
+    audience: str
+    company_info: Optional[str] = None
+    variants: int = 1
+    error: Optional[str] = None  # Motivo por el que la fila no se puede generar
+
+    @property
+    def fingerprint(self) -> str:
+        """Huella del contenido: si la fila cambia entre ejecuciones se vuelve a generar."""
+        payload = json.dumps(
+            [self.topic, self.platform, self.language, self.audience, self.company_info, self.variants],
+            ensure_ascii=False
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def key(self) -> Tuple[int, str]:
+        return self.index, self.fingerprint
+
+
+@dataclass(slots=True)
+class CampaignSummary:
+    """Recuento de una ejecución."""
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    shared_images: int = 0  # Filas que reutilizaron la imagen de otra del mismo grupo
+    elapsed: float = 0.0
+
+
+def read_rows(path: Path) -> Iterator[CampaignRow]:
+    """
+    Lee el calendario fila a fila sin cargar el fichero completo.
+
+    Las filas inválidas no detienen la lectura: se devuelven con `error` para
+    que queden registradas como fallidas.
+
+    Raises:
+        ValueError: Si falta alguna columna obligatoria en la cabecera
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"Faltan columnas en {path}: {', '.join(missing)}")
+        for index, raw in enumerate(reader, start=1):
+            values = {key: (value or "").strip() for key, value in raw.items() if key}
+            errors = []
+            empty = [column for column in REQUIRED_COLUMNS if not values[column]]
+            if empty:
+                errors.append(f"Fila {index} incompleta: {', '.join(empty)}")
+            try:
+                variants = int(values.get("variants") or 1)
+            except ValueError:
+                variants = 1
+                errors.append(f"Fila {index}: variants no es un entero ({values['variants']!r})")
+            yield CampaignRow(
+                index=index,
+                topic=values["topic"],
+                platform=values["platform"].lower(),
+                language=values["language"].lower(),
+                audience=values["audience"],
+                company_info=values.get("company_info") or None,
+                variants=variants,
+                error="; ".join(errors) or None,
+            )
+
+
+def load_checkpoint(results_path: Path) -> Set[Tuple[int, str]]:
+    """
+    Devuelve las filas ya completadas con éxito según el JSONL de resultados.
+
+    Si la ejecución anterior se cortó a mitad de una línea, se trunca el
+    fichero hasta el último salto de línea para poder seguir añadiendo.
+    """
+    done: Set[Tuple[int, str]] = set()
+    if not results_path.exists():
+        return done
+    with open(results_path, "rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid_end += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok":
+                done.add((record["row"], record["fingerprint"]))
+        if valid_end < f.seek(0, os.SEEK_END):
+            logger.warning("Línea incompleta al final de los resultados; se descarta", extra={"path": str(results_path)})
+            f.truncate(valid_end)
+    return done
+
+
+class CampaignRunner:
+    """
+    Ejecuta un calendario contra `ContentGenerator` con un pool de hilos acotado.
+
+    Las filas se leen por ventanas; dentro de cada ventana se agrupan por tema y
+    estilo de imagen para que la imagen base se genere una sola vez y se
+    reutilice en todas las filas del grupo (p. ej. la misma publicación en
+    varios idiomas).
+    """
+
+    def __init__(
+        self,
+        generator,
+        output_dir: Path,
+        workers: int = 4,
+        window: int = 200,
+        model_name: str = "local",
+        fsync_every: int = 50
+    ):
+        """
+        Args:
+            generator: ContentGenerator ya inicializado (compartido por los hilos)
+            output_dir (Path): Directorio con results.jsonl e images/
+            workers (int): Generaciones simultáneas
+            window (int): Filas leídas por adelantado para agrupar trabajo común
+            model_name (str): Modelo a usar en todas las filas
+            fsync_every (int): Registros entre sincronizaciones a disco
+        """
+        self.generator = generator
+        self.output_dir = Path(output_dir)
+        self.images_dir = self.output_dir / IMAGES_DIR
+        self.results_path = self.output_dir / RESULTS_FILE
+        self.workers = max(1, workers)
+        self.window = max(1, window)
+        self.model_name = model_name
+        self.fsync_every = fsync_every
+        self._flight = SingleFlight()
+        self._images: Dict[Hashable, Any] = {}
+        self._pending: Dict[Hashable, int] = {}  # Filas del grupo aún sin terminar
+        self._lock = threading.Lock()
+
+    def run(self, rows: Iterable[CampaignRow]) -> CampaignSummary:
+        """Procesa las filas pendientes y devuelve el recuento de la ejecución."""
+        started = time.perf_counter()
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        done = load_checkpoint(self.results_path)
+        summary = CampaignSummary()
+        rows = iter(rows)
+        max_in_flight = self.workers * 2
+        in_flight: Dict[Future, Tuple[CampaignRow, Hashable]] = {}
+        written = 0
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="campaign")
+        try:
+            with open(self.results_path, "a", encoding="utf-8") as out:
+                try:
+                    while True:
+                        batch = list(islice(rows, self.window))
+                        if not batch:
+                            break
+                        summary.total += len(batch)
+                        pending = [row for row in batch if row.key not in done]
+                        summary.skipped += len(batch) - len(pending)
+
+                        for row, group in self._group(pending):
+                            if row.error is not None:
+                                self._write_failure(out, summary, row, row.error)
+                                continue
+                            while len(in_flight) >= max_in_flight:
+                                written += self._drain(in_flight, out, summary, FIRST_COMPLETED)
+                            in_flight[executor.submit(self._process, row, group)] = (row, group)
+                            if written >= self.fsync_every:
+                                self._sync(out)
+                                written = 0
+                except BaseException:
+                    # Las que aún no empezaron se descartan; se rehacen al reanudar
+                    for future in in_flight:
+                        future.cancel()
+                    raise
+                finally:
+                    # Lo ya en marcha se escribe siempre, aunque la lectura haya fallado
+                    while in_flight:
+                        self._drain(in_flight, out, summary, FIRST_COMPLETED)
+                    self._sync(out)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._images.clear()
+            self._pending.clear()
+
+        summary.elapsed = time.perf_counter() - started
+        return summary
+
+    def _group(self, rows: List[CampaignRow]) -> List[Tuple[CampaignRow, Hashable]]:
+        """Ordena la ventana por grupo (tema + estilo de imagen) y cuenta sus filas."""
+        keyed = []
+        for row in rows:
+            if row.error is not None:
+                keyed.append((row, None))
+                continue
+            try:
+                template = self.generator.templates.get(row.platform)
+            except ValueError as e:
+                keyed.append((replace(row, error=str(e)), None))
+                continue
+            style = template.image_style if template.requires_image else None
+            group = (row.topic.casefold(), style) if style else None
+            if group is not None:
+                with self._lock:
+                    self._pending[group] = self._pending.get(group, 0) + 1
+            keyed.append((row, group))
+        keyed.sort(key=lambda item: (item[1] is None, str(item[1])))
+        return keyed
+
+    def _process(self, row: CampaignRow, group: Hashable) -> Dict[str, Any]:
+        started = time.perf_counter()
+        base_image, shared = (None, False) if group is None else self._base_image(row.topic, group)
+        result = self.generator.generate(
+            platform=row.platform,
+            topic=row.topic,
+            audience=row.audience,
+            language=row.language,
+            company_info=row.company_info,
+            model_name=self.model_name,
+            variants=row.variants,
+            base_image=base_image,
+        )
+        images = {name: self._store_image(path) for name, path in (result.get("images") or {}).items()}
+        return {
+            "text": result["content"]["text"],
+            "variants": [variant["content"]["text"] for variant in result.get("variants", [])] or None,
+            "image": next(iter(images.values()), None),
+            "images": images or None,
+            "shared_image": shared,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def _base_image(self, topic: str, group: Hashable) -> Tuple[Any, bool]:
+        """Imagen base del grupo: la genera el primer hilo que la pide y el resto la reutiliza."""
+        with self._lock:
+            if group in self._images:
+                return self._images[group], True
+
+        rendered = []
+
+        def render():
+            with self._lock:
+                if group in self._images:  # Otro hilo la terminó entre la consulta y este punto
+                    return self._images[group]
+            _, style = group
+            image = self.generator.image_generator.generate_image(prompt=f"{topic} {style}")
+            with self._lock:
+                self._images[group] = image  # Antes de soltar a los que esperan
+            rendered.append(True)
+            return image
+
+        image = self._flight.do(group, render)
+        return image, not rendered
+
+    def _store_image(self, path: str) -> str:
+        """Copia una imagen al directorio de la campaña (el nombre ya es su hash)."""
+        source = Path(path)
+        target = self.images_dir / source.name
+        if not target.exists():
+            try:
+                os.link(source, target)
+            except FileExistsError:
+                pass  # Otra fila del grupo la guardó a la vez: mismo contenido
+            except OSError:
+                # Otro sistema de ficheros: copia a un temporal único y reemplazo atómico
+                fd, tmp = tempfile.mkstemp(dir=self.images_dir, prefix=f".{target.name}.", suffix=".tmp")
+                os.close(fd)
+                try:
+                    os.chmod(tmp, default_file_mode())  # mkstemp crea con 0o600
+                    shutil.copyfile(source, tmp)
+                    os.replace(tmp, target)
+                finally:
+                    if os.path.exists(tmp):
+                        os.unlink(tmp)
+        return f"{IMAGES_DIR}/{target.name}"
+
+    def _drain(self, in_flight, out, summary: CampaignSummary, return_when) -> int:
+        """Escribe los resultados terminados y libera las imágenes de los grupos completos."""
+        finished, _ = wait(in_flight, return_when=return_when)
+        for future in finished:
+            row, group = in_flight.pop(future)
+            if group is not None:
+                self._release(group)
+            if future.cancelled():
+                continue  # Sin registro: la fila queda pendiente para la próxima ejecución
+            try:
+                result = future.result()
+            except Exception as e:
+                self._write_failure(out, summary, row, str(e))
+                continue
+            self._write(out, {**self._record(row), "status": "ok", **result})
+            summary.succeeded += 1
+            summary.shared_images += bool(result["shared_image"])
+        return len(finished)
+
+    def _write_failure(self, out, summary: CampaignSummary, row: CampaignRow, error: str) -> None:
+        self._write(out, {**self._record(row), "status": "error", "error": error})
+        summary.failed += 1
+        logger.warning("Fila fallida", extra={"row": row.index, "error": error})
+
+    @staticmethod
+    def _record(row: CampaignRow) -> Dict[str, Any]:
+        return {
+            "row": row.index,
+            "fingerprint": row.fingerprint,
+            "topic": row.topic,
+            "platform": row.platform,
+            "language": row.language,
+            "audience": row.audience,
+        }
+
+    @staticmethod
+    def _write(out, record: Dict[str, Any]) -> None:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def _release(self, group: Hashable) -> None:
+        with self._lock:
+            self._pending[group] -= 1
+            if self._pending[group] <= 0:
+                del self._pending[group]
+                self._images.pop(group, None)
+
+    @staticmethod
+    def _sync(out) -> None:
+        out.flush()
+        os.fsync(out.fileno())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("calendar", type=Path, help="CSV con topic, platform, language, audience")
+    parser.add_argument("output", type=Path, help="Directorio de resultados (se reanuda si ya existe)")
+    parser.add_argument("--workers", type=int, default=4, help="Generaciones simultáneas")
+    parser.add_argument("--window", type=int, default=200, help="Filas leídas por adelantado para agrupar")
+    parser.add_argument("--model", default="local", help="Modelo a usar")
+    parser.add_argument("--env-file", default=".env")
+    args = parser.parse_args(argv)
+
+    from src.content.generator import ContentGenerator
+    from src.utils.config import Config
+
+    config = Config(env_file=args.env_file)
+    config.validate()
+    runner = CampaignRunner(
+        ContentGenerator(config=config),
+        args.output,
+        workers=args.workers,
+        window=args.window,
+        model_name=args.model,
+    )
+    try:
+        summary = runner.run(read_rows(args.calendar))
+    except KeyboardInterrupt:
+        print(f"Interrumpido: relanza el mismo comando para continuar ({runner.results_path})", file=sys.stderr)
+        return 130
+
+    print(
+        f"{summary.succeeded} generadas, {summary.failed} fallidas, {summary.skipped} ya completadas "
+        f"({summary.shared_images} con imagen compartida) en {summary.elapsed:.1f}s -> {runner.results_path}"
+    )
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
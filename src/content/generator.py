@@ -1,22 +1,72 @@
+import time
 from typing import Dict, Any, Optional
 from src.llms.llm_selector import LLMSelector
-from src.image.generator import ImageGenerator
-from src.content.templates import get_template
+from src.llms.length_control import estimate_tokens, limits_for_length
+from src.image.generator import ImageGenerator, PIL_Image
+from src.image.optimizer import ImageOptimizer
+from src.content.templates import ContentTemplate, get_registry
 from src.translation.translator import Translator
 #from src.monitoring.langsmith_tracker import LangSmithTracker
+from src.monitoring.history import GenerationRecord, HistoryStore, get_history_store
+from src.monitoring.structured_logging import log_artifacts
 from src.utils.config import Config
-from src.content.validators import ContentValidator
+from src.content.validators import ContentValidator, score_content
+from src.content.semantic_cache import SemanticCache
+from src.agents.fact_checker import FactChecker
+from src.rag.document_processor import DocumentProcessor, default_embeddings
 import logging
 
 
 class ContentGenerator:
     """Generador principal de contenido."""
     
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        llm_selector: Optional[LLMSelector] = None,
+        image_generator: Optional[ImageGenerator] = None,
+        translator: Optional[Translator] = None,
+        image_optimizer: Optional[ImageOptimizer] = None,
+        history: Optional[HistoryStore] = None,
+        fact_checker: Optional[FactChecker] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
+        """
+        Inicializa el generador.
+
+        Args:
+            config (Config): Configuración de la aplicación
+            llm_selector (Optional[LLMSelector]): Selector de LLM ya creado (se crea uno si es None)
+            image_generator (Optional[ImageGenerator]): Generador de imágenes a reutilizar
+            translator (Optional[Translator]): Traductor a reutilizar
+            image_optimizer (Optional[ImageOptimizer]): Optimizador de imágenes a reutilizar
+            history (Optional[HistoryStore]): Historial donde registrar cada generación
+            fact_checker (Optional[FactChecker]): Verificador de afirmaciones contra el índice RAG
+            semantic_cache (Optional[SemanticCache]): Caché de borradores para peticiones casi duplicadas
+        """
         self.config = config
-        self.llm_selector = LLMSelector(config)
-        self.image_generator = ImageGenerator(config)
-        self.translator = Translator(config)
+        self.llm_selector = llm_selector or LLMSelector(config)
+        self.image_generator = image_generator or ImageGenerator(config)
+        self.translator = translator or Translator(config)
+        self.image_optimizer = image_optimizer or ImageOptimizer()
+        self.templates = get_registry(config.data_dir / "templates")
+        if history is None and config.history_enabled:
+            history = get_history_store(config.history_db)
+        self.history = history
+        if fact_checker is None and config.fact_check_enabled:
+            fact_checker = FactChecker(DocumentProcessor(config))
+        self.fact_checker = fact_checker
+        if semantic_cache is None and config.semantic_cache_enabled:
+            # Mismo modelo de embeddings que el RAG: no se carga otro
+            embeddings = fact_checker.document_processor.embeddings if fact_checker else default_embeddings()
+            semantic_cache = SemanticCache(
+                embeddings,
+                threshold=config.semantic_cache_threshold,
+                thresholds=config.semantic_cache_thresholds,
+                capacity=config.semantic_cache_size,
+                ttl=config.semantic_cache_ttl
+            )
+        self.semantic_cache = semantic_cache
         #self.tracker = LangSmithTracker(config)
         self.logger = logging.getLogger(__name__)
     
@@ -27,15 +77,28 @@ class ContentGenerator:
         audience: str,
         language: str = "es",
         company_info: Optional[str] = None,
-        model_name: str = "local"
+        model_name: str = "local",
+        variants: int = 1,
+        base_image: Optional["PIL_Image.Image"] = None
     ) -> Dict[str, Any]:
-        """Genera contenido para una plataforma específica."""
-        
+        """
+        Genera contenido para una plataforma específica.
+
+        Con `variants > 1` se piden N muestras al backend en una sola llamada, se
+        reutiliza una única imagen, se traducen todas las variantes en lote y se
+        ordenan por validez y puntuación. El resultado principal es la mejor
+        variante y la lista completa se devuelve en "variants".
+
+        `base_image` permite compartir una imagen ya generada entre varias
+        publicaciones del mismo tema (solo se optimiza para la plataforma).
+        """
+        started = time.perf_counter()
+        stats: Dict[str, Any] = {"platform": platform, "language": language, "model": model_name, "variants": variants}
         try:
-            self.logger.info(f"Iniciando generación de contenido para {platform} en idioma {language}.")
+            self.logger.info("Iniciando generación de contenido", extra={"platform": platform, "language": language})
             
             # Obtener el template adecuado
-            template = get_template(platform)
+            template = self.templates.get(platform)
             
             # Crear el prompt
             prompt = self._create_prompt(
@@ -44,56 +107,174 @@ class ContentGenerator:
                 audience,
                 company_info
             )
-            self.logger.debug(f"Prompt generado: {prompt}")
+            self.logger.debug("Prompt generado", extra=log_artifacts(prompt=prompt))
             
             # Generar el contenido base
-            content = self.llm_selector.generate_content(prompt, model_name)
-            self.logger.debug(f"Contenido generado: {content}")
+            limits = limits_for_length(template.max_length)
+            stage = time.perf_counter()
+            cache_partition = (model_name, company_info)
+            cache_hit = None
+            if self.semantic_cache is not None:
+                cache_hit = self.semantic_cache.lookup(
+                    platform, topic, audience, partition=cache_partition, min_texts=variants
+                )
+            if cache_hit is not None:
+                # Petición casi idéntica a una reciente: se reutiliza el borrador sin llamar al LLM
+                texts = list(cache_hit.texts[:variants])
+                stats["cache_hit"] = True
+                self.logger.info(
+                    "Borrador reutilizado de la caché semántica",
+                    extra={"similarity": round(cache_hit.similarity, 4), "cached_topic": cache_hit.topic}
+                )
+            elif variants > 1:
+                texts = self.llm_selector.generate_variants(prompt, variants, model_name, limits=limits)
+            else:
+                texts = [self.llm_selector.generate_content(
+                    prompt,
+                    model_name,
+                    limits=limits,
+                    stream_truncate=self.config.stream_truncate
+                )]
+            stats["llm_ms"] = (time.perf_counter() - stage) * 1000
+            if cache_hit is None:
+                stats["prompt_tokens"] = estimate_tokens(prompt)
+                stats["completion_tokens"] = sum(estimate_tokens(text) for text in texts)
+            drafts = texts
+            self.logger.debug("Contenido generado", extra=log_artifacts(content=texts))
 
-            # Traducir si es necesario
+            # Traducir si es necesario (todas las variantes en una sola petición)
             if language != "es":
-                self.logger.info(f"Traduciendo contenido al idioma {language}.")
-                content = self.translator.translate(content, target_lang=language)
-                self.logger.debug(f"Contenido traducido: {content}")
+                self.logger.info("Traduciendo contenido", extra={"language": language})
+                stage = time.perf_counter()
+                texts = self.translator.translate_batch(texts, target_lang=language)
+                stats["translate_ms"] = (time.perf_counter() - stage) * 1000
+                self.logger.debug("Contenido traducido", extra=log_artifacts(translation=texts))
             
-            # Generar imagen si el template lo requiere
+            # Generar imagen si el template lo requiere (una sola para todas las variantes)
             image = None
+            images = {}
             if template.requires_image:
                 self.logger.info("Generando imagen asociada.")
-                image = self.image_generator.generate(
-                    prompt=f"{topic} {template.image_style}"
-                )
-                self.logger.debug(f"Imagen generada: {image}")
+                stage = time.perf_counter()
+                pil_image = base_image
+                if pil_image is None:
+                    pil_image = self.image_generator.generate_image(
+                        prompt=f"{topic} {template.image_style}"
+                    )
+                # Versiones optimizadas por plataforma, codificadas en memoria; la primera es la principal
+                renditions = self.image_optimizer.optimize(pil_image, platform)
+                images = self.image_optimizer.save(renditions, self.config.media_dir)
+                image = next(iter(images.values()))
+                stats["image_ms"] = (time.perf_counter() - stage) * 1000
+                self.logger.debug("Imagen generada", extra={"images": images})
             
-            # Formatear el contenido final
-            formatted_content = template.format_content(
-                content=content,
-                image=image
-            )
-        
-            # Validar el contenido generado
+            # Validar, reparar y puntuar cada variante
+            stage = time.perf_counter()
             validator = ContentValidator(self.config)
-            validation_report = validator.validate_content(
-                content=formatted_content["text"],
-                template=template.__dict__,
-                image_metadata={"style": template.image_style} if template.requires_image else None
-            )
-            self.logger.debug(f"Reporte de validación: {validation_report}")
-            
-            if not validation_report["overall_valid"]:
-                raise ValueError(f"Contenido inválido: {validation_report}")
+            candidates = [
+                self._finalize(text, template, image, validator, topic, model_name)
+                for text in texts
+            ]
+            candidates.sort(key=lambda candidate: candidate["score"], reverse=True)
+            best = candidates[0]
+            if self.fact_checker is not None:
+                # Solo la variante elegida: un pase en lote por publicación
+                self.fact_checker.annotate(best["validation"], best["content"]["text"])
+            stats["validate_ms"] = (time.perf_counter() - stage) * 1000
+            stats["valid"] = best["validation"]["overall_valid"]
+            stats["repaired"] = best["validation"].get("repaired", False)
+            stats["score"] = best["score"]
+
+            if self.semantic_cache is not None:
+                if cache_hit is not None:
+                    self.semantic_cache.record_outcome(stats["valid"] and not stats["repaired"])
+                elif stats["valid"]:
+                    # Se guardan los borradores sin traducir: sirven para cualquier idioma
+                    self.semantic_cache.store(platform, topic, audience, drafts, partition=cache_partition)
+
+            if not best["validation"]["overall_valid"]:
+                raise ValueError(f"Contenido inválido: {best['validation']['violations']}")
             
             self.logger.info("Contenido generado exitosamente.")
-            return {
-                "content": formatted_content,
+            result = {
+                "content": best["content"],
                 "image_url": image,
+                "images": images,
                 "platform": platform,
-                "language": language
+                "language": language,
+                "validation": best["validation"]
             }
+            if variants > 1:
+                result["variants"] = [
+                    candidate for candidate in candidates
+                    if candidate["validation"]["overall_valid"]
+                ]
+            self._record(started, stats)
+            return result
                 
         except Exception as e:
             self.logger.error(f"Error en la generación de contenido: {str(e)}")
+            stats["valid"] = False
+            self._record(started, stats, error=type(e).__name__)
             raise Exception(f"Error en la generación de contenido: {str(e)}")
+
+    def _record(self, started: float, stats: Dict[str, Any], error: Optional[str] = None) -> None:
+        """Encola la generación en el historial (no bloquea ni propaga errores)."""
+        if self.history is None:
+            return
+        try:
+            self.history.record(GenerationRecord(
+                created_at=time.time(),
+                total_ms=(time.perf_counter() - started) * 1000,
+                error=error,
+                **stats
+            ))
+        except Exception as e:
+            self.logger.warning(f"No se pudo registrar la generación en el historial: {e}")
+
+    def _finalize(
+        self,
+        text: str,
+        template: ContentTemplate,
+        image: Optional[str],
+        validator: ContentValidator,
+        topic: str,
+        model_name: str
+    ) -> Dict[str, Any]:
+        """Formatea, valida y, si hace falta, repara un texto generado."""
+        image_metadata = {"style": template.image_style} if template.requires_image else None
+        formatted_content = template.format_content(content=text, image=image)
+        validation_report = validator.validate_content(
+            content=formatted_content["text"],
+            template=template,
+            image_metadata=image_metadata
+        )
+        self.logger.debug("Reporte de validación", extra=log_artifacts(validation=validation_report))
+
+        if not validation_report["overall_valid"]:
+            # Reparación dirigida en lugar de descartar la generación completa
+            self.logger.info("Contenido inválido, aplicando reparación dirigida.")
+            repaired = validator.repair_content(
+                formatted_content["text"],
+                validation_report,
+                template,
+                shorten=lambda content, limit: self._shorten(content, limit, model_name),
+                topic=topic
+            )
+            formatted_content = template.format_content(content=repaired, image=image)
+            validation_report = validator.validate_content(
+                content=repaired,
+                template=template,
+                image_metadata=image_metadata
+            )
+            validation_report["repaired"] = True
+            self.logger.debug("Reporte de validación tras reparación", extra=log_artifacts(validation=validation_report))
+
+        return {
+            "content": formatted_content,
+            "validation": validation_report,
+            "score": score_content(validation_report, template)
+        }
     
     def _create_prompt(
         self,
@@ -102,18 +283,14 @@ class ContentGenerator:
         audience: str,
         company_info: Optional[str]
     ) -> str:
-        """Crea el prompt para el modelo."""
-        base_prompt = f"""
-        Genera contenido para {template.platform} sobre el tema: {topic}.
-        Audiencia objetivo: {audience}.
-        
-        Requisitos:
-        - Tono: {template.tone}
-        - Longitud máxima: {template.max_length} caracteres
-        - Estilo: {template.style}
-        """
-        
-        if company_info:
-            base_prompt += f"\nInformación de la empresa/marca: {company_info}"
-        
-        return base_prompt + f"\n{template.additional_instructions}"
+        """Crea el prompt para el modelo (prefijo fijo por plataforma + datos de la petición)."""
+        return template.build_prompt(topic, audience, company_info)
+
+    def _shorten(self, content: str, max_length: int, model_name: str = "local") -> str:
+        """Pide al modelo una versión más corta del contenido (una sola llamada breve)."""
+        prompt = (
+            f"Acorta el siguiente texto a menos de {max_length} caracteres, "
+            "manteniendo el idioma, el tono y los hashtags más relevantes. "
+            f"Devuelve solo el texto acortado.\n\n{content}"
+        )
+        return self.llm_selector.generate_content(prompt, model_name, limits=limits_for_length(max_length))
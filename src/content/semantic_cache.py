@@ -0,0 +1,214 @@
+"""
+Caché semántica de borradores generados.
+
+Las peticiones casi duplicadas ("IA en salud" / "inteligencia artificial en la
+salud") para la misma plataforma y audiencia reutilizan el borrador del LLM en
+lugar de generar otro. La clave es el embedding de tema + audiencia; la
+búsqueda es un producto matricial contra un índice pequeño en memoria,
+particionado por plataforma, modelo e información de empresa.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Tuple
+from src.utils.helpers import lazy_import
+
+np = lazy_import("numpy")
+
+# Límites de los tramos del histograma de similitud de los aciertos
+_HISTOGRAM_EDGES = (0.80, 0.85, 0.90, 0.95, 0.98, 1.01)
+
+
+@dataclass(frozen=True, slots=True)
+class CacheHit:
+    """Borradores reutilizados y cómo de parecida era la petición original."""
+    texts: Tuple[str, ...]
+    similarity: float
+    topic: str
+    audience: str
+    age: float  # Segundos desde que se guardó
+
+
+@dataclass(slots=True)
+class _Entry:
+    partition: Hashable
+    topic: str
+    audience: str
+    vector: Any  # np.ndarray normalizado
+    texts: Tuple[str, ...]
+    created_at: float
+
+
+class SemanticCache:
+    """Índice vectorial en memoria con umbral por plataforma y expulsión LRU/TTL."""
+
+    def __init__(
+        self,
+        embeddings,
+        threshold: float = 0.92,
+        thresholds: Optional[Mapping[str, float]] = None,
+        capacity: int = 1000,
+        ttl: float = 24 * 3600
+    ):
+        """
+        Args:
+            embeddings: Modelo de embeddings con `embed_query` (el mismo que usa el RAG)
+            threshold (float): Similitud coseno mínima por defecto para reutilizar un borrador
+            thresholds (Optional[Mapping[str, float]]): Umbral por plataforma
+            capacity (int): Entradas máximas (se expulsa la usada hace más tiempo)
+            ttl (float): Segundos de validez de una entrada
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.thresholds = dict(thresholds or {})
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()  # Orden LRU
+        self._partitions: Dict[Hashable, Tuple[List[int], Any]] = {}  # ids y matriz de vectores
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._embed = lru_cache(maxsize=256)(self._embed_uncached)
+        self._metrics = {
+            "lookups": 0, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+            "similarity_sum": 0.0, "reuse_outcomes": 0, "reuse_valid": 0,
+        }
+        self._histogram = [0] * (len(_HISTOGRAM_EDGES) - 1)
+
+    def threshold_for(self, platform: str) -> float:
+        return self.thresholds.get(platform, self.threshold)
+
+    def lookup(
+        self,
+        platform: str,
+        topic: str,
+        audience: str,
+        partition: Hashable = None,
+        min_texts: int = 1
+    ) -> Optional[CacheHit]:
+        """
+        Busca un borrador de una petición suficientemente parecida.
+
+        Args:
+            platform (str): Plataforma
+            topic (str): Tema pedido
+            audience (str): Audiencia
+            partition (Hashable): Resto de la clave exacta (modelo, información de empresa...)
+            min_texts (int): Borradores necesarios (variantes pedidas)
+
+        Returns:
+            Optional[CacheHit]: El vecino más parecido por encima del umbral, o None
+        """
+        query = self._embed(self._key_text(topic, audience))
+        key = (platform, partition)
+        now = time.time()
+        with self._lock:
+            self._metrics["lookups"] += 1
+            self._expire(now)
+            ids, matrix = self._partitions.get(key, ([], None))
+            if matrix is not None:
+                similarities = matrix @ query
+                for index in np.argsort(-similarities):
+                    similarity = float(similarities[index])
+                    if similarity < self.threshold_for(platform):
+                        break
+                    entry = self._entries[ids[index]]
+                    if len(entry.texts) >= min_texts:
+                        self._entries.move_to_end(ids[index])
+                        self._record_hit(similarity)
+                        return CacheHit(entry.texts, similarity, entry.topic, entry.audience, now - entry.created_at)
+            self._metrics["misses"] += 1
+            return None
+
+    def store(
+        self,
+        platform: str,
+        topic: str,
+        audience: str,
+        texts: List[str],
+        partition: Hashable = None
+    ) -> None:
+        """Guarda los borradores de una generación (expulsando la entrada LRU si está llena)."""
+        vector = self._embed(self._key_text(topic, audience))
+        key = (platform, partition)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(key, topic, audience, vector, tuple(texts), time.time())
+            changed = {key}
+            while len(self._entries) > self.capacity:
+                _, evicted = self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+                changed.add(evicted.partition)
+            self._rebuild(changed)
+
+    def record_outcome(self, valid: bool) -> None:
+        """Registra si un borrador reutilizado pasó la validación sin reparaciones."""
+        with self._lock:
+            self._metrics["reuse_outcomes"] += 1
+            self._metrics["reuse_valid"] += bool(valid)
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de uso y de calidad de los aciertos."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            histogram = list(self._histogram)
+            size = len(self._entries)
+        hits = metrics.pop("hits")
+        similarity_sum = metrics.pop("similarity_sum")
+        reuse_outcomes = metrics.pop("reuse_outcomes")
+        reuse_valid = metrics.pop("reuse_valid")
+        return {
+            **metrics,
+            "hits": hits,
+            "size": size,
+            "hit_rate": hits / metrics["lookups"] if metrics["lookups"] else 0.0,
+            "mean_hit_similarity": similarity_sum / hits if hits else None,
+            "similarity_histogram": {
+                f"{low:.2f}-{min(high, 1.0):.2f}": count
+                for low, high, count in zip(_HISTOGRAM_EDGES, _HISTOGRAM_EDGES[1:], histogram)
+            },
+            "reuse_valid_rate": reuse_valid / reuse_outcomes if reuse_outcomes else None,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+
+    @staticmethod
+    def _key_text(topic: str, audience: str) -> str:
+        return f"{topic.strip()}. Audiencia: {audience.strip()}"
+
+    def _embed_uncached(self, text: str) -> "np.ndarray":
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _record_hit(self, similarity: float) -> None:
+        self._metrics["hits"] += 1
+        self._metrics["similarity_sum"] += similarity
+        for bucket, high in enumerate(_HISTOGRAM_EDGES[1:]):
+            if similarity < high:
+                self._histogram[bucket] += 1
+                break
+
+    def _expire(self, now: float) -> None:
+        expired = [entry_id for entry_id, entry in self._entries.items() if now - entry.created_at > self.ttl]
+        if not expired:
+            return
+        changed = set()
+        for entry_id in expired:
+            changed.add(self._entries.pop(entry_id).partition)
+        self._metrics["expirations"] += len(expired)
+        self._rebuild(changed)
+
+    def _rebuild(self, partitions) -> None:
+        """Reconstruye la matriz de las particiones modificadas (el índice es pequeño)."""
+        for partition in partitions:
+            ids = [entry_id for entry_id, entry in self._entries.items() if entry.partition == partition]
+            if ids:
+                matrix = np.stack([self._entries[entry_id].vector for entry_id in ids])
+                self._partitions[partition] = (ids, matrix)
+            else:
+                self._partitions.pop(partition, None)
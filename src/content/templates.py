@@ -1,7 +1,27 @@
-from dataclasses import dataclass
-from typing import Optional, Any, Dict
+import json
+import logging
+import os
+import textwrap
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional, Any, Dict, Mapping, Tuple, Union
+from src.utils.helpers import lazy_import
 
-@dataclass
+yaml = lazy_import("yaml")
+
+logger = logging.getLogger(__name__)
+
+# Parte variable del prompt: va siempre al final para que el prefijo
+# (instrucciones de la plataforma) sea idéntico byte a byte entre peticiones
+# y el caché de prefijo/KV del servidor LLM pueda reutilizarse.
+_PROMPT_VARIABLE_PART = "Tema: {topic}\nAudiencia objetivo: {audience}\n"
+_PROMPT_COMPANY_PART = "Información de la empresa/marca: {company_info}\n"
+
+
+@dataclass(frozen=True, slots=True)
 class ContentTemplate:
     """Template base para la generación de contenido."""
     platform: str
@@ -11,6 +31,39 @@ class ContentTemplate:
     requires_image: bool = False
     image_style: str = ""
     additional_instructions: str = ""
+    prompt_prefix: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Normalizar instrucciones y precompilar la parte fija del prompt una sola vez
+        instructions = textwrap.dedent(self.additional_instructions).strip()
+        object.__setattr__(self, "additional_instructions", instructions)
+        object.__setattr__(self, "prompt_prefix", (
+            f"Genera contenido para {self.platform}.\n"
+            "\n"
+            "Requisitos:\n"
+            f"- Tono: {self.tone}\n"
+            f"- Longitud máxima: {self.max_length} caracteres\n"
+            f"- Estilo: {self.style}\n"
+            + (f"{instructions}\n" if instructions else "")
+            + "\n"
+        ))
+
+    def build_prompt(self, topic: str, audience: str, company_info: Optional[str] = None) -> str:
+        """
+        Construye el prompt completo rellenando solo la parte variable.
+
+        Args:
+            topic (str): Tema del contenido
+            audience (str): Audiencia objetivo
+            company_info (Optional[str]): Información de la empresa/marca
+
+        Returns:
+            str: Prompt con el prefijo fijo de la plataforma seguido de los datos de la petición
+        """
+        prompt = self.prompt_prefix + _PROMPT_VARIABLE_PART.format(topic=topic, audience=audience)
+        if company_info:
+            prompt += _PROMPT_COMPANY_PART.format(company_info=company_info)
+        return prompt
 
     def format_content(self, content: str, image: Optional[str] = None) -> Dict[str, Any]:
         """Formatea el contenido según las especificaciones de la plataforma."""
@@ -20,9 +73,15 @@ class ContentTemplate:
         }
         return formatted
 
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ContentTemplate":
+        """Crea un template a partir de un diccionario, ignorando claves desconocidas."""
+        allowed = {f.name for f in fields(cls) if f.init}
+        return cls(**{key: value for key, value in data.items() if key in allowed})
+
 class Templates:
     """Colección de templates para diferentes plataformas."""
-    
+
     @staticmethod
     def instagram() -> ContentTemplate:
         return ContentTemplate(
@@ -104,29 +163,138 @@ class Templates:
             """
         )
 
-def get_template(platform: str) -> ContentTemplate:
+
+_BUILTIN_FACTORIES = {
+    "instagram": Templates.instagram,
+    "linkedin": Templates.linkedin,
+    "twitter": Templates.twitter,
+    "facebook": Templates.facebook,
+    "blog": Templates.blog
+}
+
+
+class TemplateRegistry:
+    """
+    Registro inmutable de templates construido una sola vez.
+
+    Contiene los templates integrados y, opcionalmente, templates adicionales
+    definidos en ficheros YAML/JSON de `template_dir` (un template por fichero,
+    la clave es el nombre del fichero sin extensión). Los cambios en ese
+    directorio se detectan por mtime y recargan el registro sin reiniciar.
+    """
+
+    _EXTENSIONS = (".json", ".yaml", ".yml")
+
+    def __init__(self, template_dir: Optional[Path] = None, reload_interval: float = 2.0):
+        """
+        Inicializa el registro.
+
+        Args:
+            template_dir (Optional[Path]): Directorio con templates adicionales
+            reload_interval (float): Segundos mínimos entre comprobaciones de cambios
+        """
+        self.template_dir = Path(template_dir) if template_dir else None
+        self.reload_interval = reload_interval
+        self._builtins = {name: factory() for name, factory in _BUILTIN_FACTORIES.items()}
+        self._lock = threading.Lock()
+        self._signature: Tuple[Tuple[str, int], ...] = ()
+        self._last_check = 0.0
+        self._templates: Mapping[str, ContentTemplate] = MappingProxyType(dict(self._builtins))
+        self._reload_if_changed(force=True)
+
+    def get(self, platform: str) -> ContentTemplate:
+        """
+        Obtiene el template de una plataforma.
+
+        Raises:
+            ValueError: Si la plataforma no está soportada
+        """
+        self._reload_if_changed()
+        template = self._templates.get(platform.lower())
+        if template is None:
+            raise ValueError(f"Plataforma no soportada: {platform}")
+        return template
+
+    @property
+    def templates(self) -> Mapping[str, ContentTemplate]:
+        """Vista de solo lectura de todos los templates disponibles."""
+        self._reload_if_changed()
+        return self._templates
+
+    def _scan(self) -> Tuple[Tuple[str, int], ...]:
+        """Devuelve (ruta, mtime) de los ficheros de templates del directorio."""
+        if self.template_dir is None or not self.template_dir.is_dir():
+            return ()
+        entries = []
+        with os.scandir(self.template_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(self._EXTENSIONS):
+                    entries.append((entry.path, entry.stat().st_mtime_ns))
+        return tuple(sorted(entries))
+
+    def _reload_if_changed(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_check < self.reload_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            signature = self._scan()
+            if not force and signature == self._signature:
+                return
+            templates = dict(self._builtins)
+            for path, _ in signature:
+                try:
+                    templates[Path(path).stem.lower()] = ContentTemplate.from_dict(self._load_file(Path(path)))
+                except Exception as e:
+                    logger.error(f"Error cargando template {path}: {str(e)}")
+            self._signature = signature
+            # Sustitución atómica: los lectores ven el registro anterior o el nuevo completo
+            self._templates = MappingProxyType(templates)
+
+    @staticmethod
+    def _load_file(path: Path) -> Dict[str, Any]:
+        with open(path, encoding="utf-8") as f:
+            if path.suffix.lower() == ".json":
+                return json.load(f)
+            return yaml.safe_load(f)
+
+
+_registries: Dict[Optional[Path], TemplateRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(template_dir: Optional[Union[str, Path]] = None) -> TemplateRegistry:
+    """
+    Devuelve el registro compartido para un directorio de templates (se crea una sola vez).
+
+    Args:
+        template_dir (Optional[Union[str, Path]]): Directorio con templates adicionales
+
+    Returns:
+        TemplateRegistry: Registro en caché para ese directorio
+    """
+    key = Path(template_dir).resolve() if template_dir else None
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(key)
+            if registry is None:
+                registry = _registries[key] = TemplateRegistry(key)
+    return registry
+
+
+def get_template(platform: str, template_dir: Optional[Union[str, Path]] = None) -> ContentTemplate:
     """
     Obtiene el template correspondiente a la plataforma especificada.
-    
+
     Args:
-        platform (str): Nombre de la plataforma (instagram, linkedin, twitter, facebook)
-        
+        platform (str): Nombre de la plataforma (instagram, linkedin, twitter, facebook, blog)
+        template_dir (Optional[Union[str, Path]]): Directorio con templates adicionales
+
     Returns:
         ContentTemplate: Template configurado para la plataforma
-        
+
     Raises:
         ValueError: Si la plataforma no está soportada
     """
-    templates = {
-        "instagram": Templates.instagram,
-        "linkedin": Templates.linkedin,
-        "twitter": Templates.twitter,
-        "facebook": Templates.facebook,
-        "blog": Templates.blog
-    }
-    
-    template_func = templates.get(platform.lower())
-    if template_func is None:
-        raise ValueError(f"Plataforma no soportada: {platform}")
-        
-    return template_func()
\ No newline at end of file
+    return get_registry(template_dir).get(platform)
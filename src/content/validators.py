@@ -1,13 +1,157 @@
-from typing import Dict, Any, Optional
-from src.utils.config import Config
+import re
+import unicodedata
+from dataclasses import dataclass, asdict
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Mapping, Optional, Tuple, Union, TYPE_CHECKING
+from src.content.templates import ContentTemplate
+from src.utils.helpers import truncate_at_sentence
+
+if TYPE_CHECKING:  # Solo para anotaciones: evita cargar dotenv/logging al importar
+    from src.utils.config import Config
+
+
+@dataclass(frozen=True, slots=True)
+class PlatformRules:
+    """Reglas declarativas de validación de una plataforma."""
+    max_length: Optional[int] = None  # None: usar template.max_length
+    count_graphemes: bool = False  # Medir la longitud en grafemas visibles en vez de code points
+    min_hashtags: int = 0
+    max_hashtags: Optional[int] = None
+    requires_emoji: bool = False
+    meta_description: Optional[Tuple[int, int]] = None  # Rango (mín, máx) de la meta descripción
+
+
+PLATFORM_RULES: Mapping[str, PlatformRules] = MappingProxyType({
+    "twitter": PlatformRules(max_length=280, count_graphemes=True, max_hashtags=3),
+    "instagram": PlatformRules(max_length=2200, count_graphemes=True, min_hashtags=1,
+                               max_hashtags=30, requires_emoji=True),
+    "linkedin": PlatformRules(max_length=3000),
+    "facebook": PlatformRules(max_length=63206),
+    "blog": PlatformRules(meta_description=(150, 160)),
+})
+
+_META_PREFIXES = ("meta descripción", "meta descripcion", "meta description", "meta-descripción")
+
+_EMOJI_RANGES = (
+    (0x1F300, 0x1FAFF),  # Símbolos, pictogramas, emoticonos, transporte...
+    (0x2600, 0x27BF),  # Símbolos misceláneos y dingbats
+    (0x1F000, 0x1F2FF),  # Fichas, cartas y alfanuméricos encerrados
+    (0x2B00, 0x2BFF),  # Flechas y estrellas
+)
+
+@dataclass(frozen=True, slots=True)
+class Violation:
+    """Incumplimiento concreto de una regla de validación."""
+    rule: str
+    message: str
+    actual: Any = None
+    limit: Any = None
+    severity: str = "error"
+
+
+@dataclass(slots=True)
+class ContentStats:
+    """Métricas del contenido calculadas en una sola pasada."""
+    chars: int = 0
+    graphemes: int = 0
+    hashtags: int = 0
+    has_emoji: bool = False
+    has_text: bool = False
+    meta_description_length: Optional[int] = None
+
+
+def _is_emoji(code: int) -> bool:
+    for start, end in _EMOJI_RANGES:
+        if start <= code <= end:
+            return True
+    return False
+
+
+def _is_grapheme_extender(ch: str, code: int) -> bool:
+    """Aproximación de los code points que no inician un grafema nuevo."""
+    if code < 0x300:
+        return False
+    return (
+        0xFE00 <= code <= 0xFE0F  # Selectores de variación
+        or 0x1F3FB <= code <= 0x1F3FF  # Modificadores de tono de piel
+        or 0xE0020 <= code <= 0xE007F  # Etiquetas de banderas
+        or code == 0x200D
+        or unicodedata.combining(ch) != 0
+    )
+
+
+def _is_hashtag_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _meta_description_length(line: str) -> Optional[int]:
+    """Longitud de la meta descripción si la línea la contiene."""
+    stripped = line.lstrip("*#->_ \t").lower()
+    if not stripped.startswith(_META_PREFIXES):
+        return None
+    _, _, description = line.partition(":")
+    return len(description.strip(" *_\t\"'"))
+
+
+def scan_content(content: str) -> ContentStats:
+    """
+    Recorre el contenido una única vez y calcula todas las métricas que usan las reglas.
+
+    Args:
+        content (str): Contenido a analizar
+
+    Returns:
+        ContentStats: Longitud en caracteres y grafemas, hashtags, emojis y meta descripción
+    """
+    stats = ContentStats(chars=len(content))
+    line_start = 0
+    prev = ""
+    after_zwj = False
+    pending_hash = False
+
+    for i, ch in enumerate(content):
+        code = ord(ch)
+
+        # Grafemas: un ZWJ une el siguiente code point al grafema actual
+        if after_zwj:
+            after_zwj = False
+        elif not _is_grapheme_extender(ch, code):
+            stats.graphemes += 1
+        if code == 0x200D:
+            after_zwj = True
+
+        if not stats.has_text and not ch.isspace():
+            stats.has_text = True
+        if code >= 0x2600 and not stats.has_emoji and _is_emoji(code):
+            stats.has_emoji = True
+
+        # Hashtags: '#' al inicio o tras un espacio, seguido de carácter de palabra
+        if pending_hash:
+            pending_hash = False
+            if _is_hashtag_char(ch):
+                stats.hashtags += 1
+        if ch == "#" and (not prev or prev.isspace()):
+            pending_hash = True
+
+        # Meta descripción: solo se inspeccionan las líneas que empiezan por "meta"
+        if ch == "\n":
+            if stats.meta_description_length is None and i > line_start:
+                stats.meta_description_length = _meta_description_length(content[line_start:i])
+            line_start = i + 1
+        prev = ch
+
+    if stats.meta_description_length is None and line_start < len(content):
+        stats.meta_description_length = _meta_description_length(content[line_start:])
+    return stats
+
 
 class ContentValidator:
     """Validador de contenido generado."""
-    
-    def __init__(self, config: Config):
+
+    def __init__(self, config: "Config"):
         """
         Inicializa el validador.
-        
+
         Args:
             config (Config): Configuración de la aplicación
         """
@@ -16,38 +160,143 @@ class ContentValidator:
     def validate_content(
         self,
         content: str,
-        template: Dict[str, Any],
+        template: Union[ContentTemplate, Mapping[str, Any]],
         image_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Valida el contenido generado contra los requisitos del template.
-        
+
         Args:
             content (str): Contenido a validar
-            template (Dict[str, Any]): Template usado para la generación
+            template (Union[ContentTemplate, Mapping[str, Any]]): Template usado para la generación
             image_metadata (Optional[Dict[str, Any]]): Metadatos de la imagen si existe
-            
+
         Returns:
-            Dict[str, Any]: Reporte de validación
+            Dict[str, Any]: Reporte de validación con los indicadores booleanos,
+                las violaciones estructuradas ("violations") y las métricas ("stats")
         """
+        if isinstance(template, Mapping):
+            template = ContentTemplate.from_dict(template)
+
+        stats = scan_content(content)
+        violations = self.evaluate_rules(stats, template)
+        errors = {v.rule for v in violations if v.severity == "error"}
+
         validation_results = {
-            "length_valid": self._validate_length(content, template["max_length"]),
-            "content_present": bool(content.strip()),
-            "image_valid": self._validate_image(image_metadata, template["requires_image"]),
-            "platform_specific": self._validate_platform_specific(content, template["platform"]),
+            "length_valid": "max_length" not in errors,
+            "content_present": stats.has_text,
+            "image_valid": self._validate_image(image_metadata, template.requires_image),
+            "platform_specific": not (errors - {"max_length", "content_present"}),
         }
-        
+
         # Determinar validez general
-        validation_results["overall_valid"] = all(
-            result for key, result in validation_results.items()
-            if key != "details"
-        )
-        
+        validation_results["overall_valid"] = all(validation_results.values())
+        validation_results["violations"] = [asdict(v) for v in violations]
+        validation_results["stats"] = asdict(stats)
+
         return validation_results
 
-    def _validate_length(self, content: str, max_length: int) -> bool:
-        """Valida la longitud del contenido."""
-        return len(content) <= max_length
+    def evaluate_rules(self, stats: ContentStats, template: ContentTemplate) -> List[Violation]:
+        """
+        Evalúa las reglas de la plataforma sobre las métricas ya calculadas.
+
+        Args:
+            stats (ContentStats): Métricas obtenidas con `scan_content`
+            template (ContentTemplate): Template usado para la generación
+
+        Returns:
+            List[Violation]: Violaciones encontradas (vacía si el contenido es válido)
+        """
+        rules = self.rules_for(template)
+        violations = []
+
+        limit = self._max_length(template, rules)
+        length = stats.graphemes if rules.count_graphemes else stats.chars
+        if length > limit:
+            violations.append(Violation("max_length", f"El contenido supera {limit} caracteres", length, limit))
+
+        if stats.hashtags < rules.min_hashtags:
+            violations.append(Violation(
+                "min_hashtags", f"Se requieren al menos {rules.min_hashtags} hashtags",
+                stats.hashtags, rules.min_hashtags
+            ))
+        if rules.max_hashtags is not None and stats.hashtags > rules.max_hashtags:
+            violations.append(Violation(
+                "max_hashtags", f"Se permiten como máximo {rules.max_hashtags} hashtags",
+                stats.hashtags, rules.max_hashtags
+            ))
+
+        if rules.requires_emoji and not stats.has_emoji:
+            violations.append(Violation("requires_emoji", "El contenido no incluye emojis", severity="warning"))
+
+        if rules.meta_description is not None:
+            low, high = rules.meta_description
+            actual = stats.meta_description_length
+            if actual is None or not low <= actual <= high:
+                violations.append(Violation(
+                    "meta_description", f"La meta descripción debe tener entre {low} y {high} caracteres",
+                    actual, rules.meta_description, severity="warning"
+                ))
+
+        if not stats.has_text:
+            violations.append(Violation("content_present", "El contenido está vacío"))
+        return violations
+
+    def rules_for(self, template: ContentTemplate) -> PlatformRules:
+        """Obtiene las reglas declaradas para la plataforma del template."""
+        return PLATFORM_RULES.get(template.platform.lower(), PlatformRules())
+
+    def repair_content(
+        self,
+        content: str,
+        report: Dict[str, Any],
+        template: ContentTemplate,
+        shorten: Optional[Callable[[str, int], str]] = None,
+        topic: Optional[str] = None
+    ) -> str:
+        """
+        Aplica reparaciones baratas y dirigidas según las violaciones del reporte.
+
+        Recorta hashtags sobrantes, añade un hashtag a partir del tema si falta y
+        ajusta la longitud. Si el recorte en frontera de frase perdería mucho texto
+        y se proporciona `shorten`, se intenta antes una única llamada de acortado.
+
+        Args:
+            content (str): Contenido inválido
+            report (Dict[str, Any]): Reporte devuelto por `validate_content`
+            template (ContentTemplate): Template usado para la generación
+            shorten (Optional[Callable[[str, int], str]]): Función (texto, límite) -> texto acortado
+            topic (Optional[str]): Tema, para generar un hashtag si falta
+
+        Returns:
+            str: Contenido reparado (puede seguir siendo inválido)
+        """
+        rules = self.rules_for(template)
+        errors = {v["rule"] for v in report.get("violations", []) if v["severity"] == "error"}
+        limit = self._max_length(template, rules)
+
+        if "max_hashtags" in errors:
+            content = _trim_hashtags(content, rules.max_hashtags)
+
+        suffix = ""
+        if "min_hashtags" in errors and topic and _hashtag_from(topic):
+            suffix = "\n\n" + _hashtag_from(topic)
+            limit -= len(suffix)
+
+        if len(content) > limit:
+            truncated = truncate_at_sentence(content, limit)
+            if shorten is not None and len(truncated) < 0.75 * limit:
+                shortened = (shorten(content, limit) or "").strip()
+                if shortened and len(shortened) <= limit:
+                    truncated = shortened
+            content = truncated
+
+        return content + suffix
+
+    def _max_length(self, template: ContentTemplate, rules: PlatformRules) -> int:
+        if rules.max_length is None:
+            return template.max_length
+        return min(template.max_length, rules.max_length)
 
     def _validate_image(
         self,
@@ -59,42 +308,54 @@ class ContentValidator:
             return image_metadata is not None
         return True
 
-    def _validate_platform_specific(self, content: str, platform: str) -> bool:
-        """
-        Valida requisitos específicos de cada plataforma.
-        
-        Args:
-            content (str): Contenido a validar
-            platform (str): Plataforma para la que se generó el contenido
-            
-        Returns:
-            bool: True si cumple los requisitos específicos de la plataforma
-        """
-        platform = platform.lower()
-        
-        if platform == "twitter":
-            # Validar longitud de tweets
-            return len(content) <= 280
-            
-        elif platform == "instagram":
-            # Validar uso de hashtags y longitud
-            has_hashtags = "#" in content
-            return has_hashtags and len(content) <= 2200
-            
-        elif platform == "linkedin":
-            # Validar longitud y formato profesional
-            return len(content) <= 3000
-            
-        elif platform == "facebook":
-            # Validar longitud y contenido
-            return len(content) <= 63206
-            
-        return True  # Plataforma no especificada
-
     def _count_hashtags(self, content: str) -> int:
         """Cuenta el número de hashtags en el contenido."""
-        return content.count("#")
+        return scan_content(content).hashtags
 
     def _has_minimum_length(self, content: str, min_length: int = 50) -> bool:
         """Verifica si el contenido tiene una longitud mínima."""
-        return len(content.strip()) >= min_length
\ No newline at end of file
+        return len(content.strip()) >= min_length
+
+
+def score_content(report: Dict[str, Any], template: ContentTemplate) -> float:
+    """
+    Puntuación barata para ordenar variantes a partir de su reporte de validación.
+
+    Prima el contenido válido, penaliza avisos y reparaciones y favorece los textos
+    que aprovechan la longitud disponible sin acercarse demasiado al límite.
+
+    Args:
+        report (Dict[str, Any]): Reporte devuelto por `validate_content`
+        template (ContentTemplate): Template usado para la generación
+
+    Returns:
+        float: Puntuación (mayor es mejor)
+    """
+    score = 100.0 if report["overall_valid"] else 0.0
+    score -= 10.0 * sum(1 for v in report["violations"] if v["severity"] == "warning")
+    if report.get("repaired"):
+        score -= 5.0
+    fill = report["stats"]["chars"] / max(template.max_length, 1)
+    score += 10.0 * min(fill, 0.8) / 0.8
+    return score
+
+
+def _trim_hashtags(content: str, max_hashtags: int) -> str:
+    """Elimina los hashtags a partir del número máximo permitido."""
+    kept = 0
+    result = []
+    for token in re.split(r"(\s+)", content):
+        if len(token) > 1 and token[0] == "#" and _is_hashtag_char(token[1]):
+            kept += 1
+            if kept > max_hashtags:
+                continue
+        result.append(token)
+    trimmed = re.sub(r"[ \t]{2,}", " ", "".join(result))
+    return re.sub(r"[ \t]+\n", "\n", trimmed).rstrip()
+
+
+def _hashtag_from(topic: str) -> str:
+    """Construye un hashtag en CamelCase a partir del tema."""
+    words = ["".join(ch for ch in word if _is_hashtag_char(ch)) for word in topic.split()]
+    tag = "".join(word[:1].upper() + word[1:] for word in words if word)
+    return f"#{tag}" if tag else ""
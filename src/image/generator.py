@@ -1,9 +1,13 @@
 import os
-from diffusers import StableDiffusionPipeline, EulerDiscreteScheduler
-import torch
-from PIL import Image
-import numpy as np
 import tempfile
+import threading
+from src.utils.helpers import lazy_import
+
+# Dependencias pesadas: se cargan en el primer uso, no al importar el módulo
+diffusers = lazy_import("diffusers")
+torch = lazy_import("torch")
+np = lazy_import("numpy")
+PIL_Image = lazy_import("PIL.Image")
 
 
 class ImageGenerator:
@@ -20,11 +24,11 @@ class ImageGenerator:
         model_id = "stabilityai/stable-diffusion-2"
 
         # Usar el Euler scheduler
-        scheduler = EulerDiscreteScheduler.from_pretrained(model_id, subfolder="scheduler")
+        scheduler = diffusers.EulerDiscreteScheduler.from_pretrained(model_id, subfolder="scheduler")
         
         try:
             # Cargar el pipeline de Stable Diffusion con el scheduler
-            self.pipeline = StableDiffusionPipeline.from_pretrained(
+            self.pipeline = diffusers.StableDiffusionPipeline.from_pretrained(
                 model_id,
                 scheduler=scheduler,
                 use_auth_token=self.token,
@@ -33,6 +37,9 @@ class ImageGenerator:
             self.pipeline = self.pipeline.to("cuda" if torch.cuda.is_available() else "cpu")
         except Exception as e:
             raise RuntimeError(f"Error al cargar el modelo de Hugging Face: {str(e)}")
+
+        # El pipeline no es seguro entre hilos y la instancia se comparte (API y Streamlit)
+        self._lock = threading.Lock()
     
     def generate(self, prompt: str) -> str:
         """
@@ -44,30 +51,42 @@ class ImageGenerator:
         Returns:
             Ruta al archivo de imagen generado.
         """
+        pil_image = self.generate_image(prompt)
+        
+        # Guardar la imagen en un archivo temporal
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as temp_file:
+            pil_image.save(temp_file.name, format="PNG")
+            return temp_file.name
+
+    def generate_image(self, prompt: str) -> "PIL_Image.Image":
+        """
+        Genera una imagen basada en un prompt y la devuelve en memoria.
+        
+        Args:
+            prompt: Texto descriptivo para generar la imagen.
+        
+        Returns:
+            Imagen PIL, sin pasar por disco (para el optimizador de imágenes).
+        """
         if not prompt:
             raise ValueError("El prompt no puede estar vacío.")
         
         try:
             # Generar la imagen usando el modelo de Stable Diffusion
-            image = self.pipeline(prompt=prompt).images[0]
+            with self._lock:
+                image = self.pipeline(prompt=prompt).images[0]
         except Exception as e:
             raise RuntimeError(f"Error al generar la imagen con el prompt '{prompt}': {str(e)}")
 
         # Verificar si la imagen es del tipo correcto (PIL.Image)
-        if isinstance(image, Image.Image):
-            pil_image = image
-        else:
-            # Si no es PIL.Image.Image, convertir el tipo
-            if isinstance(image, torch.Tensor):
-                # Si es un tensor, convertirlo a PIL.Image
-                image = image.squeeze().permute(1, 2, 0).cpu().numpy()
-            if isinstance(image, np.ndarray):
-                # Si es un ndarray, convertirlo a PIL.Image
-                pil_image = Image.fromarray(image)
-            else:
-                raise RuntimeError(f"El objeto generado no es una imagen válida: {type(image)}")
+        if isinstance(image, PIL_Image.Image):
+            return image
         
-        # Guardar la imagen en un archivo temporal
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as temp_file:
-            pil_image.save(temp_file.name, format="PNG")
-            return temp_file.name
+        # Si no es PIL.Image.Image, convertir el tipo
+        if isinstance(image, torch.Tensor):
+            # Si es un tensor, convertirlo a PIL.Image
+            image = image.squeeze().permute(1, 2, 0).cpu().numpy()
+        if isinstance(image, np.ndarray):
+            # Si es un ndarray, convertirlo a PIL.Image
+            return PIL_Image.fromarray(image)
+        raise RuntimeError(f"El objeto generado no es una imagen válida: {type(image)}")
@@ -0,0 +1,229 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple, Union
+from src.utils.helpers import default_file_mode, lazy_import
+
+PIL_Image = lazy_import("PIL.Image")
+PIL_features = lazy_import("PIL.features")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Rendition:
+    """Especificación de una versión optimizada de la imagen."""
+    name: str
+    width: int
+    height: int
+    max_bytes: int  # Tamaño objetivo; la calidad se ajusta para no superarlo
+    format: str = "WEBP"  # WEBP o JPEG
+    min_quality: int = 45
+    max_quality: int = 85
+
+
+@dataclass(frozen=True, slots=True)
+class OptimizedImage:
+    """Imagen codificada en memoria lista para servir o guardar."""
+    name: str
+    format: str
+    width: int
+    height: int
+    quality: int
+    data: bytes
+
+    @property
+    def content_type(self) -> str:
+        return f"image/{self.format.lower()}"
+
+    @property
+    def extension(self) -> str:
+        return ".jpg" if self.format == "JPEG" else f".{self.format.lower()}"
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+
+_THUMBNAIL = Rendition("thumbnail", 400, 400, max_bytes=25_000, max_quality=75)
+_LINK_PREVIEW = Rendition("link_preview", 1200, 630, max_bytes=120_000)
+
+# Versiones por plataforma; la primera es la principal (la que se muestra/publica)
+PLATFORM_RENDITIONS: Mapping[str, Tuple[Rendition, ...]] = MappingProxyType({
+    "instagram": (Rendition("feed", 1080, 1080, max_bytes=200_000), _THUMBNAIL),
+    "facebook": (Rendition("feed", 1200, 630, max_bytes=150_000), _THUMBNAIL),
+    "blog": (
+        Rendition("hero", 1600, 900, max_bytes=250_000),
+        _LINK_PREVIEW,
+        Rendition("thumbnail", 400, 225, max_bytes=25_000, max_quality=75),
+    ),
+    "linkedin": (Rendition("feed", 1200, 627, max_bytes=150_000), _THUMBNAIL),
+    "twitter": (Rendition("card", 1200, 675, max_bytes=150_000), _THUMBNAIL),
+})
+
+_DEFAULT_RENDITIONS = (_LINK_PREVIEW, _THUMBNAIL)
+
+# Pool compartido: Pillow libera el GIL al codificar, así que las versiones se codifican en paralelo
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="image-opt")
+    return _executor
+
+
+class ImageOptimizer:
+    """Genera versiones por plataforma (recorte, redimensionado y codificación) en memoria."""
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Inicializa el optimizador.
+
+        Args:
+            executor (Optional[ThreadPoolExecutor]): Pool para codificar; por defecto uno compartido
+        """
+        self._executor = executor
+        self._webp_supported: Optional[bool] = None
+
+    def renditions_for(self, platform: str) -> Tuple[Rendition, ...]:
+        """Versiones que se generan para la plataforma."""
+        return PLATFORM_RENDITIONS.get(platform.lower(), _DEFAULT_RENDITIONS)
+
+    def optimize(
+        self,
+        image: Union["PIL_Image.Image", bytes],
+        platform: str
+    ) -> Dict[str, OptimizedImage]:
+        """
+        Produce todas las versiones de la plataforma en paralelo.
+
+        Args:
+            image (Union[PIL.Image.Image, bytes]): Imagen en memoria o bytes codificados
+            platform (str): Plataforma destino
+
+        Returns:
+            Dict[str, OptimizedImage]: Versiones por nombre, con la principal en primer lugar
+        """
+        if isinstance(image, (bytes, bytearray)):
+            image = PIL_Image.open(io.BytesIO(image))
+        image = image.convert("RGB")
+        image.load()
+
+        executor = self._executor or _get_executor()
+        futures = [
+            (rendition.name, executor.submit(self.render, image, rendition))
+            for rendition in self.renditions_for(platform)
+        ]
+        return {name: future.result() for name, future in futures}
+
+    def render(self, image: "PIL_Image.Image", rendition: Rendition) -> OptimizedImage:
+        """Recorta al aspecto de la versión, redimensiona y codifica con calidad ajustada al tamaño."""
+        resized = self._fit(image, rendition.width, rendition.height)
+        image_format = rendition.format
+        if image_format == "WEBP" and not self._supports_webp():
+            image_format = "JPEG"
+
+        # Caso habitual: la calidad máxima ya cabe y basta una codificación
+        best: Optional[Tuple[int, bytes]] = None
+        data = self._encode(resized, image_format, rendition.max_quality)
+        if len(data) <= rendition.max_bytes:
+            best = (rendition.max_quality, data)
+
+        # Si no, búsqueda binaria de la mayor calidad que cabe en max_bytes
+        low, high = rendition.min_quality, rendition.max_quality - 1
+        if best is not None:
+            low = high + 1
+        while low <= high:
+            quality = (low + high) // 2
+            data = self._encode(resized, image_format, quality)
+            if len(data) <= rendition.max_bytes:
+                best = (quality, data)
+                low = quality + 1
+            else:
+                high = quality - 1
+        if best is None:
+            best = (rendition.min_quality, self._encode(resized, image_format, rendition.min_quality))
+
+        quality, data = best
+        return OptimizedImage(
+            name=rendition.name,
+            format=image_format,
+            width=resized.width,
+            height=resized.height,
+            quality=quality,
+            data=data,
+        )
+
+    def save(self, renditions: Mapping[str, OptimizedImage], directory: Path) -> Dict[str, str]:
+        """
+        Guarda las versiones con nombre por hash de contenido (idempotente).
+
+        Args:
+            renditions (Mapping[str, OptimizedImage]): Versiones a guardar
+            directory (Path): Directorio destino
+
+        Returns:
+            Dict[str, str]: Ruta de cada versión por nombre
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = {}
+        for name, rendition in renditions.items():
+            path = directory / f"{rendition.sha256}{rendition.extension}"
+            if not path.exists():
+                # Temporal único: varios hilos pueden guardar a la vez la misma versión
+                fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{path.name}.", suffix=".tmp")
+                try:
+                    os.fchmod(fd, default_file_mode())  # mkstemp crea con 0o600
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(rendition.data)
+                    os.replace(tmp, path)  # Mismo contenido: si otro llegó antes, se sobrescribe igual
+                except BaseException:
+                    if os.path.exists(tmp):
+                        os.unlink(tmp)
+                    if not path.exists():
+                        raise
+            paths[name] = str(path)
+        return paths
+
+    @staticmethod
+    def _fit(image: "PIL_Image.Image", width: int, height: int) -> "PIL_Image.Image":
+        """Recorte centrado al aspecto destino y reducción (nunca amplía)."""
+        target_ratio = width / height
+        ratio = image.width / image.height
+        if ratio > target_ratio:
+            new_width = round(image.height * target_ratio)
+            left = (image.width - new_width) // 2
+            image = image.crop((left, 0, left + new_width, image.height))
+        elif ratio < target_ratio:
+            new_height = round(image.width / target_ratio)
+            top = (image.height - new_height) // 2
+            image = image.crop((0, top, image.width, top + new_height))
+        if image.width > width:
+            # reducing_gap reduce primero por bloques y abarata el remuestreo de imágenes grandes
+            image = image.resize((width, height), PIL_Image.LANCZOS, reducing_gap=2.0)
+        return image
+
+    @staticmethod
+    def _encode(image: "PIL_Image.Image", image_format: str, quality: int) -> bytes:
+        buffer = io.BytesIO()
+        if image_format == "JPEG":
+            image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        else:
+            image.save(buffer, format=image_format, quality=quality, method=4)
+        return buffer.getvalue()
+
+    def _supports_webp(self) -> bool:
+        if self._webp_supported is None:
+            self._webp_supported = bool(PIL_features.check("webp"))
+            if not self._webp_supported:
+                logger.warning("Pillow sin soporte WebP: se usará JPEG")
+        return self._webp_supported
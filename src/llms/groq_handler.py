@@ -0,0 +1,321 @@
+"""
+Backend para servidores con API de chat compatible con OpenAI (`/v1/chat/completions`).
+
+Cubre Groq, vLLM, el servidor de llama.cpp y LM Studio con el mismo cliente:
+sesión HTTP con pool de conexiones, streaming SSE, reintentos con backoff
+exponencial con jitter y respeto de las cabeceras de rate limit del proveedor.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from src.utils.helpers import lazy_import
+
+requests = lazy_import("requests")
+requests_adapters = lazy_import("requests.adapters")
+
+logger = logging.getLogger(__name__)
+
+# Estados que merecen reintento: rate limit y errores transitorios del servidor
+RETRY_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+# La API de OpenAI (y Groq) admite como máximo 4 secuencias de parada
+MAX_STOP_SEQUENCES = 4
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderProfile:
+    """Valores por defecto de un proveedor compatible con OpenAI."""
+    base_url: str
+    default_model: str
+    api_key_required: bool = False
+    supports_n: bool = False  # Si acepta `n` > 1 (varias muestras en una petición)
+    pool_size: int = 8
+
+
+PROVIDERS: Mapping[str, ProviderProfile] = MappingProxyType({
+    "groq": ProviderProfile("https://api.groq.com/openai/v1", "llama-3.1-8b-instant", api_key_required=True),
+    "vllm": ProviderProfile("http://localhost:8000/v1", "meta-llama/Llama-3.2-3B-Instruct", supports_n=True, pool_size=32),
+    "llamacpp": ProviderProfile("http://localhost:8080/v1", "llama3.2"),
+    "lmstudio": ProviderProfile("http://localhost:1234/v1", "llama-3.2-3b-instruct"),
+    "openai_compatible": ProviderProfile("http://localhost:8000/v1", "llama3.2"),
+})
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Convierte a segundos las duraciones de las cabeceras de rate limit.
+
+    Admite segundos sin unidad (`Retry-After: 2`) y el formato de Groq/OpenAI
+    (`1m3.5s`, `120ms`).
+
+    Args:
+        value (Optional[str]): Valor de la cabecera
+
+    Returns:
+        Optional[float]: Segundos, o None si no se puede interpretar
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+class RateLimiter:
+    """Pausa las peticiones cuando el proveedor indica que se ha agotado la cuota."""
+
+    def __init__(self, max_wait: float = 60.0):
+        """
+        Args:
+            max_wait (float): Espera máxima aceptada por una cabecera (evita bloqueos largos)
+        """
+        self.max_wait = max_wait
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Espera hasta que se pueda volver a enviar (no bloquea si no hay límite activo)."""
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, status: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Registra las cabeceras de una respuesta.
+
+        Args:
+            status (int): Código HTTP
+            headers (Mapping[str, str]): Cabeceras de la respuesta
+
+        Returns:
+            Optional[float]: Segundos de pausa impuestos por el proveedor, si los hay
+        """
+        delay = None
+        if status == 429:
+            delay = (
+                parse_duration(headers.get("retry-after"))
+                or parse_duration(headers.get("x-ratelimit-reset-requests"))
+                or parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            )
+        elif headers.get("x-ratelimit-remaining-requests") == "0":
+            delay = parse_duration(headers.get("x-ratelimit-reset-requests"))
+        elif headers.get("x-ratelimit-remaining-tokens") == "0":
+            delay = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+
+        if delay is not None:
+            delay = min(delay, self.max_wait)
+            with self._lock:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        return delay
+
+
+class OpenAICompatibleLLM:
+    """Cliente de chat para servidores compatibles con OpenAI, con la interfaz invoke/stream."""
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: Optional[str] = None,
+        temperature: float = 0.7,
+        timeout: Tuple[float, float] = (5.0, 60.0),
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        pool_size: int = 8,
+        supports_n: bool = False
+    ):
+        """
+        Inicializa el cliente.
+
+        Args:
+            base_url (str): URL base de la API (terminada en /v1)
+            model (str): Modelo a usar
+            api_key (Optional[str]): Clave de la API (Bearer), si el servidor la exige
+            temperature (float): Temperatura de muestreo
+            timeout (Tuple[float, float]): Timeouts de conexión y de lectura en segundos
+            max_retries (int): Reintentos ante errores de red, 429 y 5xx
+            backoff_base (float): Espera base del backoff exponencial
+            backoff_cap (float): Espera máxima entre reintentos
+            pool_size (int): Conexiones persistentes por host
+            supports_n (bool): Si el servidor acepta `n` > 1
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.temperature = temperature
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.pool_size = pool_size
+        self.supports_n = supports_n
+        self.rate_limiter = RateLimiter()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> "OpenAICompatibleLLM":
+        """
+        Crea el cliente para `config.llm_provider` con los valores del perfil del proveedor.
+
+        Raises:
+            ValueError: Si el proveedor no es compatible o falta la clave obligatoria
+        """
+        profile = PROVIDERS.get(config.llm_provider)
+        if profile is None:
+            raise ValueError(f"Proveedor compatible con OpenAI desconocido: {config.llm_provider}")
+        if profile.api_key_required and not config.llm_api_key:
+            raise ValueError(f"El proveedor {config.llm_provider} requiere LLM_API_KEY")
+        return cls(
+            base_url=config.llm_base_url or profile.base_url,
+            model=config.llm_model or profile.default_model,
+            api_key=config.llm_api_key,
+            timeout=(config.llm_connect_timeout, config.llm_read_timeout),
+            max_retries=config.llm_max_retries,
+            pool_size=profile.pool_size,
+            supports_n=profile.supports_n,
+        )
+
+    @property
+    def session(self):
+        """Sesión HTTP compartida entre hilos (keep-alive y pool de conexiones)."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = requests_adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    if self.api_key:
+                        session.headers["Authorization"] = f"Bearer {self.api_key}"
+                    self._session = session
+        return self._session
+
+    def invoke(self, prompt: str, max_tokens: Optional[int] = None, stop: Optional[Sequence[str]] = None) -> str:
+        """Genera una respuesta completa."""
+        return self.generate(prompt, n=1, max_tokens=max_tokens, stop=stop)[0]
+
+    def generate(
+        self,
+        prompt: str,
+        n: int = 1,
+        max_tokens: Optional[int] = None,
+        stop: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        """
+        Genera `n` muestras en una sola petición.
+
+        Raises:
+            ValueError: Si se piden varias muestras y el proveedor no admite `n`
+        """
+        if n > 1 and not self.supports_n:
+            raise ValueError(f"El servidor {self.base_url} no admite n > 1")
+        payload = self._payload(prompt, max_tokens, stop, stream=False)
+        if n > 1:
+            payload["n"] = n
+        response = self._post(payload, stream=False)
+        with response:
+            choices = sorted(response.json()["choices"], key=lambda choice: choice.get("index", 0))
+        return [choice["message"]["content"] or "" for choice in choices]
+
+    def stream(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stop: Optional[Sequence[str]] = None
+    ) -> Iterator[str]:
+        """
+        Genera en streaming (SSE) y emite los fragmentos de texto.
+
+        Cerrar el generador antes de terminar cierra la conexión, y el servidor
+        deja de generar (lo aprovecha `truncate_stream`).
+        """
+        response = self._post(self._payload(prompt, max_tokens, stop, stream=True), stream=True)
+        with response:
+            # SSE es siempre UTF-8; `decode_unicode` usaría ISO-8859-1 (text/* sin charset)
+            for raw in response.iter_lines():
+                line = raw.decode("utf-8")
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                choices = json.loads(data).get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+                if content:
+                    yield content
+
+    def _payload(
+        self,
+        prompt: str,
+        max_tokens: Optional[int],
+        stop: Optional[Sequence[str]],
+        stream: bool
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "stream": stream,
+        }
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        if stop:
+            payload["stop"] = list(stop)[:MAX_STOP_SEQUENCES]
+        return payload
+
+    def _post(self, payload: Dict[str, Any], stream: bool):
+        """POST con reintentos; en streaming solo se reintenta antes de recibir la respuesta."""
+        url = f"{self.base_url}/chat/completions"
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise RuntimeError(f"No se pudo conectar con {url}: {e}")
+                logger.warning(f"Error de red con {url} ({e}); reintento {attempt + 1}/{self.max_retries}")
+                time.sleep(self._backoff(attempt))
+                continue
+
+            provider_delay = self.rate_limiter.update(response.status_code, response.headers)
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                response.close()
+                logger.warning(
+                    f"{url} respondió {response.status_code}; reintento {attempt + 1}/{self.max_retries}"
+                )
+                # Con Retry-After, la espera la impone el rate limiter en la siguiente vuelta
+                if provider_delay is None:
+                    time.sleep(self._backoff(attempt))
+                continue
+            if response.status_code >= 400:
+                detail = response.text[:200]
+                response.close()
+                raise RuntimeError(f"Error {response.status_code} de {url}: {detail}")
+            return response
+        raise RuntimeError(f"Sin respuesta válida de {url}")
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo (evita reintentos sincronizados)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def close(self) -> None:
+        """Cierra las conexiones del pool."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,137 @@
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+from src.utils.helpers import lazy_import, is_available, truncate_at_sentence
+
+tiktoken = lazy_import("tiktoken")
+
+# Secuencias en las que el modelo suele pasar del contenido a comentarios propios
+DEFAULT_STOP: Tuple[str, ...] = ("\n\n---", "\n\nNota:", "\n\nNote:", "\n\n\n")
+
+# Texto representativo para calibrar la relación caracteres/token con un tokenizer real
+_CALIBRATION_TEXT = (
+    "La inteligencia artificial está transformando la salud: diagnósticos más rápidos, "
+    "tratamientos personalizados y hospitales más eficientes. ¿Estamos preparados? "
+    "Descubre cómo la #IA ayuda a médicos y pacientes cada día. 🚀 #Salud #Innovación"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class GenerationLimits:
+    """Límites que se pasan al backend para que la salida quepa en la plataforma."""
+    max_tokens: int
+    max_chars: int
+    stop: Tuple[str, ...] = DEFAULT_STOP
+
+
+class TokenEstimator:
+    """
+    Estima cuántos tokens ocupan N caracteres.
+
+    Si `tiktoken` está instalado se calibra una vez con un tokenizer BPE real
+    (similar al de Llama 3 / GPT-4); si no, usa una relación fija razonable
+    para texto en español.
+    """
+
+    FALLBACK_CHARS_PER_TOKEN = 3.5
+
+    def __init__(self, chars_per_token: Optional[float] = None, encoding: str = "cl100k_base"):
+        """
+        Inicializa el estimador.
+
+        Args:
+            chars_per_token (Optional[float]): Relación fija; si es None se calibra
+            encoding (str): Codificación de tiktoken usada para calibrar
+        """
+        self.encoding = encoding
+        self._chars_per_token = chars_per_token
+        self._lock = threading.Lock()
+
+    @property
+    def chars_per_token(self) -> float:
+        if self._chars_per_token is None:
+            with self._lock:
+                if self._chars_per_token is None:
+                    self._chars_per_token = self._calibrate()
+        return self._chars_per_token
+
+    def _calibrate(self) -> float:
+        if not is_available("tiktoken"):
+            return self.FALLBACK_CHARS_PER_TOKEN
+        try:
+            tokens = tiktoken.get_encoding(self.encoding).encode(_CALIBRATION_TEXT)
+            return len(_CALIBRATION_TEXT) / max(len(tokens), 1)
+        except Exception:
+            # Sin acceso a los ficheros de la codificación: usar la relación fija
+            return self.FALLBACK_CHARS_PER_TOKEN
+
+    def tokens_for_chars(self, chars: int) -> int:
+        """Número de tokens estimado para `chars` caracteres."""
+        return math.ceil(chars / self.chars_per_token)
+
+
+_default_estimator = TokenEstimator()
+
+
+def estimate_tokens(text: str) -> int:
+    """Tokens estimados de un texto (para métricas; no sustituye al tokenizer del modelo)."""
+    return _default_estimator.tokens_for_chars(len(text))
+
+
+@lru_cache(maxsize=64)
+def limits_for_length(
+    max_length: int,
+    headroom: float = 1.15,
+    max_tokens_cap: int = 4096,
+    stop: Tuple[str, ...] = DEFAULT_STOP
+) -> GenerationLimits:
+    """
+    Traduce el límite de caracteres de un template a límites de generación.
+
+    Args:
+        max_length (int): Longitud máxima en caracteres de la plataforma
+        headroom (float): Margen sobre la estimación para que el texto termine de forma natural
+        max_tokens_cap (int): Tope absoluto de tokens (plataformas con límites muy altos)
+        stop (Tuple[str, ...]): Secuencias de parada
+
+    Returns:
+        GenerationLimits: max_tokens (num_predict), max_chars y secuencias de parada
+    """
+    max_tokens = math.ceil(_default_estimator.tokens_for_chars(max_length) * headroom)
+    return GenerationLimits(
+        max_tokens=min(max_tokens, max_tokens_cap),
+        max_chars=max_length,
+        stop=stop
+    )
+
+
+def truncate_stream(chunks: Iterable[str], max_chars: int) -> str:
+    """
+    Consume un stream de texto y lo corta en frontera de frase al alcanzar el límite.
+
+    Al salir del bucle antes de agotar el stream, el generador subyacente se
+    cierra y el backend deja de generar tokens que se descartarían.
+
+    Args:
+        chunks (Iterable[str]): Fragmentos de texto según los emite el modelo
+        max_chars (int): Número máximo de caracteres
+
+    Returns:
+        str: Texto completo o recortado en la última frase que cabe
+    """
+    parts = []
+    length = 0
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            parts.append(chunk)
+            length += len(chunk)
+            if length > max_chars:
+                break
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+    return truncate_at_sentence("".join(parts), max_chars)
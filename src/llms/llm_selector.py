@@ -1,15 +1,14 @@
-from typing import Dict, Any
-#from langchain.llms import Ollama
-from langchain_community.llms import Ollama
-from langchain.chat_models import ChatOpenAI  # Ajuste: usar ChatOpenAI para modelos de OpenAI
-from langchain.schema import HumanMessage
-import sys
-from pathlib import Path
-
-# Añadir el directorio raíz del proyecto al PATH
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from src.utils.config import Config
+from src.llms.groq_handler import PROVIDERS, OpenAICompatibleLLM
+from src.llms.length_control import GenerationLimits, truncate_stream
+from src.utils.helpers import lazy_import, truncate_at_sentence
+
+# Backends de LangChain: se cargan al configurar el modelo, no al importar
+lc_llms = lazy_import("langchain_community.llms")
+lc_chat_models = lazy_import("langchain.chat_models")  # ChatOpenAI para modelos de OpenAI
+lc_schema = lazy_import("langchain.schema")
 
 class LLMSelector:
     """Selector y gestor de modelos de lenguaje."""
@@ -26,17 +25,20 @@ class LLMSelector:
     
     def _setup_model(self):
         """Configura el modelo según la configuración en .env/config.py."""
-        # Revisamos si el proveedor es Ollama o OpenAI
+        # Revisamos si el proveedor es Ollama, OpenAI o un servidor compatible con OpenAI
         if self.config.llm_provider == "ollama":
             return self._setup_ollama()
         elif self.config.llm_provider == "openai":
             return self._setup_openai()
+        elif self.config.llm_provider in PROVIDERS:
+            # Groq, vLLM, llama.cpp, LM Studio...: cliente HTTP propio con pool y reintentos
+            return OpenAICompatibleLLM.from_config(self.config)
         else:
             raise ValueError(f"Proveedor de LLM no soportado: {self.config.llm_provider}")
     
     def _setup_ollama(self):
         """Configura el modelo local de Ollama."""
-        return Ollama(
+        return lc_llms.Ollama(
             base_url=self.config.ollama_host,
             model="llama3.2",  # Puedes cambiar a otro modelo si lo prefieres
             temperature=0.7
@@ -44,7 +46,7 @@ class LLMSelector:
     
     def _setup_openai(self):
         """Configura el modelo de OpenAI mediante su API."""
-        return ChatOpenAI(  # Ajuste: Usar ChatOpenAI de LangChain
+        return lc_chat_models.ChatOpenAI(  # Ajuste: Usar ChatOpenAI de LangChain
             openai_api_key=self.config.openai_api_key,  # Usamos la API Key de OpenAI desde el config
             model="gpt-4",  # Puedes elegir entre gpt-3.5, gpt-4, etc.
             temperature=0.7
@@ -56,20 +58,103 @@ class LLMSelector:
             raise ValueError(f"Modelo no disponible: {model_name}")
         return self.models[model_name]
     
-    def generate_content(self, prompt: str, model_name: str = "local") -> str:
-        """Genera contenido usando el modelo especificado."""
+    def generate_content(
+        self,
+        prompt: str,
+        model_name: str = "local",
+        limits: Optional[GenerationLimits] = None,
+        stream_truncate: bool = False
+    ) -> str:
+        """
+        Genera contenido usando el modelo especificado.
+
+        Args:
+            prompt (str): Prompt completo
+            model_name (str): Modelo a usar
+            limits (Optional[GenerationLimits]): Límite de tokens y secuencias de parada
+            stream_truncate (bool): Si es True, genera en streaming y corta en frontera
+                de frase en cuanto se supera `limits.max_chars`
+
+        Returns:
+            str: Texto generado
+        """
         model = self.get_model(model_name)
         
         try:
             # Generar el contenido dependiendo del modelo seleccionado
-            if isinstance(model, Ollama):
-                response = model.invoke(prompt)  # Ollama utiliza directamente `invoke` con el prompt
-            elif isinstance(model, ChatOpenAI):
-                response = model([HumanMessage(content=prompt)])  # OpenAI espera una lista de mensajes
-                return response[0].content  # Extraemos el contenido de la respuesta
+            if isinstance(model, OpenAICompatibleLLM):
+                # Primero: no obliga a cargar LangChain solo para comprobar el tipo
+                llm_input = prompt
+                kwargs = {"stop": limits.stop, "max_tokens": limits.max_tokens} if limits else {}
+            elif isinstance(model, lc_llms.Ollama):
+                # Ollama utiliza directamente el prompt; num_predict limita los tokens generados
+                llm_input = prompt
+                kwargs = {"stop": list(limits.stop), "num_predict": limits.max_tokens} if limits else {}
+            elif isinstance(model, lc_chat_models.ChatOpenAI):
+                llm_input = [lc_schema.HumanMessage(content=prompt)]  # OpenAI espera una lista de mensajes
+                kwargs = {"stop": list(limits.stop), "max_tokens": limits.max_tokens} if limits else {}
             else:
                 raise ValueError("Modelo no soportado para generación de contenido")
-            
-            return response
+
+            if limits and stream_truncate:
+                return truncate_stream(
+                    (self._chunk_text(chunk) for chunk in model.stream(llm_input, **kwargs)),
+                    limits.max_chars
+                )
+
+            return self._chunk_text(model.invoke(llm_input, **kwargs))
+        except Exception as e:
+            raise Exception(f"Error generando contenido: {str(e)}")
+
+    def generate_variants(
+        self,
+        prompt: str,
+        n: int,
+        model_name: str = "local",
+        limits: Optional[GenerationLimits] = None
+    ) -> List[str]:
+        """
+        Genera N variantes del mismo prompt con una sola llamada lógica.
+
+        Con modelos de chat tipo OpenAI se usa el parámetro `n` (una petición, N
+        muestras), igual que con los servidores compatibles que lo admiten (vLLM).
+        Con Ollama y Groq, que no admiten `n`, se lanzan las N peticiones en
+        paralelo con el mismo prompt para que el servidor las atienda con sus
+        slots paralelos y reutilice el caché del prefijo común.
+
+        Args:
+            prompt (str): Prompt completo
+            n (int): Número de variantes
+            model_name (str): Modelo a usar
+            limits (Optional[GenerationLimits]): Límite de tokens y secuencias de parada
+
+        Returns:
+            List[str]: Textos generados
+        """
+        model = self.get_model(model_name)
+
+        try:
+            if isinstance(model, OpenAICompatibleLLM) and model.supports_n:
+                kwargs = {"stop": limits.stop, "max_tokens": limits.max_tokens} if limits else {}
+                texts = model.generate(prompt, n=n, **kwargs)
+            elif not isinstance(model, OpenAICompatibleLLM) and isinstance(model, lc_chat_models.ChatOpenAI):
+                kwargs = {"stop": list(limits.stop), "max_tokens": limits.max_tokens} if limits else {}
+                result = model.generate([[lc_schema.HumanMessage(content=prompt)]], n=n, **kwargs)
+                texts = [generation.text for generation in result.generations[0]]
+            else:
+                with ThreadPoolExecutor(max_workers=n) as executor:
+                    texts = list(executor.map(
+                        lambda _: self.generate_content(prompt, model_name, limits=limits),
+                        range(n)
+                    ))
         except Exception as e:
-            raise Exception(f"Error generando contenido: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error generando variantes: {str(e)}")
+
+        if limits:
+            texts = [truncate_at_sentence(text, limits.max_chars) for text in texts]
+        return texts
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Extrae el texto de la respuesta (str para LLMs, mensaje para modelos de chat)."""
+        return chunk if isinstance(chunk, str) else chunk.content
@@ -0,0 +1,326 @@
+"""
+Historial persistente de generaciones en SQLite.
+
+Cada resultado de `ContentGenerator.generate` se encola y un hilo de fondo lo
+escribe por lotes, así que la petición nunca espera al disco. En la misma
+transacción se actualizan agregados por hora (`rollups`), que es lo que leen
+los dashboards: su tamaño depende de horas × plataformas × modelos y no del
+número de generaciones.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, astuple, fields
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class GenerationRecord:
+    """Una generación registrada (sin el texto, solo metadatos y tiempos)."""
+    created_at: float
+    platform: str
+    language: str
+    model: str
+    variants: int = 1
+    llm_ms: float = 0.0
+    translate_ms: float = 0.0
+    image_ms: float = 0.0
+    validate_ms: float = 0.0
+    total_ms: float = 0.0
+    valid: bool = True
+    repaired: bool = False
+    score: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_hit: bool = False
+    error: Optional[str] = None
+
+
+_COLUMNS = tuple(field.name for field in fields(GenerationRecord))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    platform TEXT NOT NULL,
+    language TEXT NOT NULL,
+    model TEXT NOT NULL,
+    variants INTEGER NOT NULL,
+    llm_ms REAL NOT NULL,
+    translate_ms REAL NOT NULL,
+    image_ms REAL NOT NULL,
+    validate_ms REAL NOT NULL,
+    total_ms REAL NOT NULL,
+    valid INTEGER NOT NULL,
+    repaired INTEGER NOT NULL,
+    score REAL NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cache_hit INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_generations_created_at ON generations (created_at);
+CREATE INDEX IF NOT EXISTS idx_generations_platform ON generations (platform, created_at);
+CREATE INDEX IF NOT EXISTS idx_generations_model ON generations (model, created_at);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    bucket INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    model TEXT NOT NULL,
+    language TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    valid_count INTEGER NOT NULL,
+    repaired_count INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    cache_hits INTEGER NOT NULL,
+    total_ms_sum REAL NOT NULL,
+    llm_ms_sum REAL NOT NULL,
+    prompt_tokens_sum INTEGER NOT NULL,
+    completion_tokens_sum INTEGER NOT NULL,
+    PRIMARY KEY (bucket, platform, model, language)
+) WITHOUT ROWID;
+"""
+
+_INSERT = (
+    f"INSERT INTO generations ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _COLUMNS)})"
+)
+
+# Un lote se agrega en Python y se aplica con un UPSERT por grupo
+_UPSERT_ROLLUP = """
+INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (bucket, platform, model, language) DO UPDATE SET
+    count = count + excluded.count,
+    valid_count = valid_count + excluded.valid_count,
+    repaired_count = repaired_count + excluded.repaired_count,
+    error_count = error_count + excluded.error_count,
+    cache_hits = cache_hits + excluded.cache_hits,
+    total_ms_sum = total_ms_sum + excluded.total_ms_sum,
+    llm_ms_sum = llm_ms_sum + excluded.llm_ms_sum,
+    prompt_tokens_sum = prompt_tokens_sum + excluded.prompt_tokens_sum,
+    completion_tokens_sum = completion_tokens_sum + excluded.completion_tokens_sum
+"""
+
+BUCKET_SECONDS = 3600
+_GROUP_COLUMNS = {
+    "hour": "bucket",
+    "day": "(bucket / 86400) * 86400",
+    "platform": "platform",
+    "model": "model",
+    "language": "language",
+}
+_STOP = object()
+
+
+class HistoryStore:
+    """Almacén del historial con escritura asíncrona por lotes y agregados por hora."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10_000
+    ):
+        """
+        Inicializa el almacén y arranca el hilo escritor.
+
+        Args:
+            db_path (Path): Fichero SQLite
+            batch_size (int): Registros máximos por transacción
+            flush_interval (float): Espera máxima en segundos antes de escribir un lote incompleto
+            max_queue (int): Registros pendientes máximos; por encima se descartan
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+
+        with closing(self._connect()) as connection:
+            connection.executescript(_SCHEMA)
+
+        self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, record: GenerationRecord) -> None:
+        """Encola un registro sin bloquear; si la cola está llena se descarta."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Espera a que se escriba todo lo encolado hasta ahora.
+
+        Returns:
+            bool: False si no terminó dentro de `timeout`
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Escribe lo pendiente y detiene el hilo escritor."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def rollups(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        group_by: Sequence[str] = ("platform",)
+    ) -> List[Dict[str, Any]]:
+        """
+        Agregados del periodo leídos de la tabla `rollups` (sin recorrer `generations`).
+
+        Args:
+            since (Optional[float]): Inicio (epoch); se redondea a la hora
+            until (Optional[float]): Fin (epoch), excluido
+            group_by (Sequence[str]): Dimensiones: hour, day, platform, model, language
+
+        Returns:
+            List[Dict[str, Any]]: Una fila por grupo con totales, tasas y medias
+
+        Raises:
+            ValueError: Si se pide una dimensión desconocida
+        """
+        unknown = set(group_by) - set(_GROUP_COLUMNS)
+        if unknown:
+            raise ValueError(f"Dimensiones no soportadas: {sorted(unknown)}")
+
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("bucket >= ?")
+            params.append(int(since) // BUCKET_SECONDS * BUCKET_SECONDS)
+        if until is not None:
+            conditions.append("bucket < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = [f"{_GROUP_COLUMNS[name]} AS {name}" for name in group_by] + [
+            "SUM(count)", "SUM(valid_count)", "SUM(repaired_count)", "SUM(error_count)", "SUM(cache_hits)",
+            "SUM(total_ms_sum)", "SUM(llm_ms_sum)", "SUM(prompt_tokens_sum)", "SUM(completion_tokens_sum)",
+        ]
+        sql = f"SELECT {', '.join(columns)} FROM rollups {where}"
+        if group_by:
+            sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+
+        rows = []
+        with closing(self._connect()) as connection:
+            for row in connection.execute(sql, params):
+                values = dict(zip(group_by, row))
+                count, valid, repaired, errors, hits, total_ms, llm_ms, prompt, completion = row[len(group_by):]
+                if not count:
+                    continue
+                values.update(
+                    count=count,
+                    valid_rate=valid / count,
+                    repaired_rate=repaired / count,
+                    errors=errors,
+                    cache_hit_rate=hits / count,
+                    avg_total_ms=total_ms / count,
+                    avg_llm_ms=llm_ms / count,
+                    prompt_tokens=prompt,
+                    completion_tokens=completion,
+                )
+                rows.append(values)
+        return rows
+
+    def recent(self, limit: int = 50, platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Últimas generaciones (usa los índices por fecha y plataforma)."""
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM generations"
+        params: List[Any] = []
+        if platform is not None:
+            sql += " WHERE platform = ?"
+            params.append(platform)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as connection:
+            return [dict(zip(_COLUMNS, row)) for row in connection.execute(sql, params)]
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        # WAL: las lecturas del dashboard no bloquean al escritor
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _run(self) -> None:
+        connection = self._connect()
+        try:
+            while True:
+                batch, markers, stop = self._next_batch()
+                if batch:
+                    try:
+                        self._write(connection, batch)
+                    except sqlite3.Error as e:
+                        logger.error(f"No se pudo guardar el historial ({len(batch)} registros): {e}")
+                for marker in markers:
+                    marker.set()
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        """Espera al primer elemento y recoge lo que llegue hasta llenar el lote o agotar el intervalo."""
+        batch: List[GenerationRecord] = []
+        markers: List[threading.Event] = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            if item is _STOP:
+                return batch, markers, True
+            if isinstance(item, threading.Event):
+                # flush(): escribir ya lo acumulado
+                markers.append(item)
+                return batch, markers, False
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, markers, False
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return batch, markers, False
+
+    @staticmethod
+    def _write(connection: sqlite3.Connection, batch: List[GenerationRecord]) -> None:
+        groups: Dict[tuple, List[float]] = {}
+        for record in batch:
+            key = (
+                int(record.created_at) // BUCKET_SECONDS * BUCKET_SECONDS,
+                record.platform,
+                record.model,
+                record.language,
+            )
+            totals = groups.setdefault(key, [0] * 9)
+            totals[0] += 1
+            totals[1] += record.valid
+            totals[2] += record.repaired
+            totals[3] += record.error is not None
+            totals[4] += record.cache_hit
+            totals[5] += record.total_ms
+            totals[6] += record.llm_ms
+            totals[7] += record.prompt_tokens
+            totals[8] += record.completion_tokens
+
+        with connection:
+            connection.executemany(_INSERT, [astuple(record) for record in batch])
+            connection.executemany(_UPSERT_ROLLUP, [key + tuple(totals) for key, totals in groups.items()])
+
+
+@lru_cache(maxsize=None)
+def get_history_store(db_path: Path) -> HistoryStore:
+    """Almacén compartido por fichero (un único hilo escritor por base de datos)."""
+    return HistoryStore(db_path)
@@ -0,0 +1,265 @@
+"""
+Logging asíncrono y estructurado.
+
+Los hilos de la aplicación solo encolan el registro (`QueueHandler`); un
+`QueueListener` en su propio hilo formatea a JSON, escribe en fichero con
+rotación y guarda los payloads grandes (prompts, textos generados) como
+artefactos comprimidos, referenciados desde la línea de log por su hash.
+
+Uso:
+    logger.debug("Prompt generado", extra=log_artifacts(prompt=prompt))
+"""
+import atexit
+import copy
+import gzip
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+# Atributos propios de LogRecord: el resto son campos añadidos con `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+_ARTIFACTS = "artifacts"
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+def log_artifacts(**payloads: Any) -> Dict[str, Any]:
+    """
+    `extra` para adjuntar payloads grandes a un registro sin incluirlos en la línea.
+
+    El payload solo se serializa, comprime y guarda en el hilo del listener, y
+    solo si el registro supera el nivel y el muestreo.
+    """
+    return {_ARTIFACTS: payloads}
+
+
+class ArtifactStore:
+    """Almacén de artefactos de log comprimidos con gzip y direccionados por contenido."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def put(self, payload: Any) -> str:
+        """
+        Guarda el payload (idempotente) y devuelve su referencia.
+
+        Returns:
+            str: Ruta relativa al almacén ("ab/abcdef....json.gz")
+        """
+        text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False, default=str)
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        reference = f"{digest[:2]}/{digest}.json.gz"
+        path = self.directory / reference
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return reference
+
+    def get(self, reference: str) -> str:
+        """Contenido de un artefacto a partir de su referencia."""
+        with gzip.open(self.directory / reference, "rb") as f:
+            return f.read().decode("utf-8")
+
+    def prune(self, max_age_days: float) -> int:
+        """Borra los artefactos más antiguos que `max_age_days`; devuelve cuántos."""
+        limit = time.time() - max_age_days * 86400
+        removed = 0
+        for path in self.directory.glob("*/*.json.gz"):
+            if path.stat().st_mtime < limit:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro con los campos `extra` y referencias a artefactos."""
+
+    def __init__(self, artifact_store: Optional[ArtifactStore] = None):
+        super().__init__()
+        self.artifact_store = artifact_store
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key != _ARTIFACTS and not key.startswith("_"):
+                entry[key] = value
+        references = artifact_references(record, self.artifact_store)
+        if references:
+            entry[_ARTIFACTS] = references
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def artifact_references(record: logging.LogRecord, store: Optional[ArtifactStore]) -> Dict[str, str]:
+    """Guarda los artefactos del registro una sola vez aunque lo formateen varios handlers."""
+    payloads = getattr(record, _ARTIFACTS, None)
+    if not payloads:
+        return {}
+    references = getattr(record, "_artifact_refs", None)
+    if references is None:
+        if store is None:
+            references = {name: f"<{len(str(value))} chars>" for name, value in payloads.items()}
+        else:
+            references = {name: store.put(value) for name, value in payloads.items()}
+        record._artifact_refs = references
+    return references
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    `QueueHandler` que conserva la traza de la excepción aparte del mensaje.
+
+    El `prepare` estándar la añade a `msg` y borra `exc_info`/`exc_text`, con lo que
+    el JSON perdería la clave "exception". Aquí se formatea en `exc_text` (el
+    traceback no debe cruzar la cola) y `msg` queda solo con el mensaje.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Deja pasar solo una fracción de los registros por debajo de WARNING en los loggers indicados.
+
+    La regla aplicable es la del prefijo más largo ("src.content" cubre
+    "src.content.generator"). WARNING y superiores no se muestrean nunca.
+    """
+
+    def __init__(self, rates: Mapping[str, float], seed: Optional[int] = None):
+        super().__init__()
+        self.rates = dict(rates)
+        self._prefixes = sorted(self.rates, key=len, reverse=True)
+        self._random = random.Random(seed)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        for prefix in self._prefixes:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return self._random.random() < self.rates[prefix]
+        return True
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """Interpreta "src.content.generator=0.1,src.api=0.5"."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[StructuredQueueHandler] = None
+
+
+def setup_logging(
+    log_dir: Path,
+    level: str = "INFO",
+    console_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    rotate_when: Optional[str] = None,
+    sampling: Optional[Mapping[str, float]] = None,
+    artifact_max_age_days: Optional[float] = 7
+) -> ArtifactStore:
+    """
+    Configura el logging raíz con cola y listener en segundo plano (reemplaza una configuración previa).
+
+    Args:
+        log_dir (Path): Directorio de logs; app.log (JSON) y artifacts/
+        level (str): Nivel raíz
+        console_format (str): Formato legible para la consola
+        max_bytes (int): Tamaño de rotación de app.log (si no hay `rotate_when`)
+        backup_count (int): Ficheros rotados que se conservan
+        rotate_when (Optional[str]): Rotación por tiempo ("midnight", "H"...) en lugar de por tamaño
+        sampling (Optional[Mapping[str, float]]): Fracción de registros DEBUG/INFO que se conservan por logger
+        artifact_max_age_days (Optional[float]): Antigüedad máxima de los artefactos (None: sin límite)
+
+    Returns:
+        ArtifactStore: Almacén de artefactos configurado
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    store = ArtifactStore(log_dir / "artifacts")
+    if artifact_max_age_days is not None:
+        store.prune(artifact_max_age_days)
+
+    if rotate_when:
+        file_handler: logging.Handler = logging.handlers.TimedRotatingFileHandler(
+            log_dir / "app.log", when=rotate_when, backupCount=backup_count, encoding="utf-8"
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_dir / "app.log", maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    file_handler.setFormatter(JsonFormatter(store))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(console_format))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = StructuredQueueHandler(log_queue)
+    if sampling:
+        # El muestreo se aplica antes de encolar: lo descartado no cuesta nada
+        _queue_handler.addFilter(SamplingFilter(sampling))
+    _listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    for handler in list(root.handlers):
+        # Sustituye la configuración por defecto (basicConfig) en lugar de duplicar salidas
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    _listener.start()
+    return store
+
+
+def shutdown_logging() -> None:
+    """Vacía la cola y detiene el listener (se llama también al salir del proceso)."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -1,31 +1,72 @@
-import arxiv
-from typing import List, Dict, Any
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores import Chroma
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union
+from src.rag.vector_store import SnapshotStore, write_snapshot
 from src.utils.config import Config
+from src.utils.helpers import lazy_import
 import logging
 
+arxiv = lazy_import("arxiv")
+lc_text_splitter = lazy_import("langchain.text_splitter")
+lc_embeddings = lazy_import("langchain.embeddings")
+lc_vectorstores = lazy_import("langchain.vectorstores")
+
+@lru_cache(maxsize=1)
+def default_embeddings() -> Any:
+    """Modelo de embeddings compartido por el RAG, el verificador y la caché semántica."""
+    return lc_embeddings.HuggingFaceEmbeddings()
+
+
 class DocumentProcessor:
     """Procesador de documentos científicos para RAG."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, embeddings: Optional[Any] = None, use_snapshot: bool = True):
+        """
+        Args:
+            config (Config): Configuración de la aplicación
+            embeddings (Optional[Any]): Modelo de embeddings ya cargado (o un sustituto en benchmarks)
+            use_snapshot (bool): Abrir `config.rag_snapshot` en lugar de Chroma si existe
+        """
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.embeddings = HuggingFaceEmbeddings()
-        self.vector_store = self._initialize_vector_store()
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.embeddings = embeddings or default_embeddings()
+        snapshot = config.rag_snapshot if use_snapshot else None
+        self.vector_store = self._initialize_vector_store(snapshot)
+        self._chroma_store = None  # Chroma para escrituras cuando las consultas van al snapshot
+        self.text_splitter = lc_text_splitter.RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200
         )
     
-    def _initialize_vector_store(self) -> Chroma:
-        """Inicializa la base de datos vectorial."""
-        return Chroma(
+    def _initialize_vector_store(self, snapshot: Optional[Path] = None):
+        """Inicializa la base de datos vectorial (el snapshot si existe, si no Chroma)."""
+        if snapshot is not None and Path(snapshot).exists():
+            self.logger.info("Usando snapshot de la base de conocimiento", extra={"path": str(snapshot)})
+            return SnapshotStore(snapshot, embedding_function=self.embeddings, rescore=self.config.rag_rescore)
+        return lc_vectorstores.Chroma(
             persist_directory=self.config.chroma_persist_directory,
             embedding_function=self.embeddings
         )
     
+    def _writable_store(self):
+        """
+        Almacén donde se escribe: Chroma, aunque las consultas vayan al snapshot.
+
+        El snapshot es de solo lectura; los papers nuevos se guardan en Chroma y
+        entran en el snapshot al volver a exportarlo.
+        """
+        if not isinstance(self.vector_store, SnapshotStore):
+            return self.vector_store
+        if self._chroma_store is None:
+            self.logger.warning(
+                "La base de conocimiento es un snapshot de solo lectura: los cambios se hacen en Chroma "
+                "y no se verán en las consultas hasta volver a exportar el snapshot",
+                extra={"path": str(self.vector_store.path)}
+            )
+            self._chroma_store = self._initialize_vector_store(None)
+        return self._chroma_store
+
     def fetch_arxiv_papers(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """Obtiene papers relevantes de arXiv."""
         try:
@@ -53,7 +94,14 @@ class DocumentProcessor:
             return []
     
     def process_papers(self, papers: List[Dict[str, Any]]) -> None:
-        """Procesa y almacena papers en la base de datos vectorial."""
+        """Procesa y almacena papers en la base de datos vectorial (en Chroma si se consulta un snapshot)."""
+        if not papers:
+            return
+        try:
+            store = self._writable_store()
+        except Exception as e:
+            self.logger.error(f"Error opening vector store for writing: {str(e)}")
+            return
         for paper in papers:
             try:
                 # Crear documento combinado
@@ -67,10 +115,12 @@ class DocumentProcessor:
                 # Dividir en chunks
                 chunks = self.text_splitter.split_text(text)
                 
-                # Almacenar en la base de datos vectorial
-                self.vector_store.add_texts(
+                # Almacenar en la base de datos vectorial; ids estables (URL + nº de fragmento)
+                # para que volver a procesar un paper lo sustituya en lugar de duplicarlo
+                store.add_texts(
                     texts=chunks,
-                    metadatas=[{"source": paper['url']} for _ in chunks]
+                    metadatas=[{"source": paper['url']} for _ in chunks],
+                    ids=[f"{paper['url']}#{index}" for index in range(len(chunks))]
                 )
                 
             except Exception as e:
@@ -92,18 +142,132 @@ class DocumentProcessor:
             self.logger.error(f"Error querying knowledge base: {str(e)}")
             return []
     
+    def query_knowledge_base_batch(
+        self,
+        queries: List[str],
+        k: int = 3,
+        query_vectors: Optional[List[List[float]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Consulta varias preguntas a la vez: embeddings y búsqueda en una sola llamada cada uno.
+
+        Args:
+            queries (List[str]): Consultas
+            k (int): Resultados por consulta
+            query_vectors (Optional[List[List[float]]]): Embeddings ya calculados de las consultas
+
+        Returns:
+            List[List[Dict[str, Any]]]: Resultados de cada consulta, en el mismo orden
+        """
+        if not queries:
+            return []
+        try:
+            if query_vectors is None:
+                query_vectors = self.embeddings.embed_documents(list(queries))
+            if isinstance(self.vector_store, SnapshotStore):
+                # Todas las consultas en una sola pasada sobre el índice cuantizado
+                return [
+                    [{"text": result.page_content, "metadata": result.metadata} for result in results]
+                    for results in self.vector_store.similarity_search_by_vectors(query_vectors, k=k)
+                ]
+            # Una sola consulta a la colección de Chroma para todas las preguntas
+            results = self.vector_store._collection.query(
+                query_embeddings=[[float(value) for value in vector] for vector in query_vectors],
+                n_results=k,
+                include=["documents", "metadatas"]
+            )
+            return [
+                [{"text": text, "metadata": metadata or {}} for text, metadata in zip(texts, metadatas)]
+                for texts, metadatas in zip(results["documents"], results["metadatas"])
+            ]
+        except Exception as e:
+            self.logger.error(f"Error querying knowledge base: {str(e)}")
+            return [[] for _ in queries]
+    
     def persist_vector_store(self) -> None:
         """Persiste el estado actual de la base de datos vectorial en disco."""
+        store = self._chroma_store if isinstance(self.vector_store, SnapshotStore) else self.vector_store
+        if store is None:
+            return  # El snapshot ya está en disco y es de solo lectura
         try:
-            self.vector_store.persist()
+            store.persist()
             self.logger.info("Vector store persisted successfully.")
         except Exception as e:
             self.logger.error(f"Error persisting vector store: {str(e)}")
     
-    def load_vector_store(self) -> None:
-        """Carga el estado persistido de la base de datos vectorial desde disco."""
+    def load_vector_store(self, snapshot_path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Vuelve a abrir la base de datos vectorial desde disco.
+
+        Chroma carga lo persistido al abrirse, así que basta con reinicializarla;
+        con `snapshot_path` se cambia a ese snapshot.
+        """
         try:
-            self.vector_store.load()
+            previous = self.vector_store
+            self.vector_store = self._initialize_vector_store(snapshot_path or self.config.rag_snapshot)
+            if isinstance(previous, SnapshotStore):
+                previous.close()
             self.logger.info("Vector store loaded successfully.")
         except Exception as e:
-            self.logger.error(f"Error loading vector store: {str(e)}")
\ No newline at end of file
+            self.logger.error(f"Error loading vector store: {str(e)}")
+
+    def export_snapshot(self, path: Union[str, Path], rescore: bool = True, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Exporta la colección de Chroma a un snapshot cuantizado.
+
+        Solo se leen los fragmentos vivos y se omiten los duplicados, así que el
+        snapshot sale ya compactado. Con un snapshot abierto se exporta Chroma igualmente.
+
+        Args:
+            path (Union[str, Path]): Fichero de destino
+            rescore (bool): Incluir los vectores en float16 para re-puntuar
+            batch_size (int): Fragmentos leídos de Chroma por página
+
+        Returns:
+            Dict[str, Any]: Cabecera del snapshot con el recuento y los duplicados omitidos
+        """
+        store = self._writable_store()
+
+        def pages():
+            offset = 0
+            while True:
+                page = store.get(
+                    include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+                )
+                if not page["ids"]:
+                    return
+                yield page["embeddings"], page["documents"], page["metadatas"], page["ids"]
+                offset += len(page["ids"])
+
+        header = write_snapshot(path, pages(), rescore=rescore)
+        self.logger.info("Snapshot exportado", extra={"path": str(path), "count": header["count"]})
+        return header
+
+    def compact_vector_store(self, batch_size: int = 1000) -> int:
+        """
+        Elimina de Chroma los fragmentos duplicados (mismo texto y metadatos).
+
+        Con un snapshot abierto se compacta Chroma, el origen de la próxima exportación.
+
+        Returns:
+            int: Fragmentos eliminados
+        """
+        store = self._writable_store()
+        seen = set()
+        duplicates = []
+        offset = 0
+        while True:
+            page = store.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            for chunk_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                key = json.dumps([text, metadata or {}], sort_keys=True, ensure_ascii=False)
+                if key in seen:
+                    duplicates.append(chunk_id)
+                else:
+                    seen.add(key)
+            offset += len(page["ids"])
+        if duplicates:
+            store.delete(ids=duplicates)
+        self.logger.info("Vector store compactado", extra={"removed": len(duplicates)})
+        return len(duplicates)
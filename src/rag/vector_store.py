@@ -0,0 +1,416 @@
+"""
+Snapshots compactos de la base de conocimiento.
+
+Un snapshot es un único fichero con los embeddings cuantizados a int8 (una
+escala por vector), opcionalmente los vectores en float16 para re-puntuar los
+mejores candidatos, y los textos con sus metadatos. Se abre con memoria
+mapeada: los procesos arrancan sin abrir Chroma y comparten las páginas del
+sistema operativo en lugar de tener cada uno su copia en float32.
+
+Uso:
+    python -m src.rag.vector_store export kb.snap [--no-rescore]
+    python -m src.rag.vector_store compact kb.snap kb.compact.snap
+    python -m src.rag.vector_store info kb.snap
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from src.utils.helpers import lazy_import
+
+np = lazy_import("numpy")
+
+MAGIC = b"RAGSNAP1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_HEADER_SIZE = struct.Struct("<Q")
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotDocument:
+    """Resultado de búsqueda con la misma interfaz que los documentos de LangChain."""
+    page_content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def quantize(vectors: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Normaliza y cuantiza vectores a int8 simétrico con una escala por fila.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Códigos int8 (n, d) y escalas float32 (n,)
+    """
+    vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class SnapshotWriter:
+    """
+    Escribe un snapshot en streaming: las secciones van a ficheros temporales y
+    al cerrar se ensamblan en el destino con un reemplazo atómico.
+    """
+
+    def __init__(self, path: Union[str, Path], rescore: bool = True, dedupe: bool = True):
+        """
+        Args:
+            path (Union[str, Path]): Fichero de destino
+            rescore (bool): Guardar también los vectores en float16 para re-puntuar
+            dedupe (bool): Omitir fragmentos repetidos (mismo texto y metadatos)
+        """
+        self.path = Path(path)
+        self.rescore = rescore
+        self.dedupe = dedupe
+        self.count = 0
+        self.duplicates = 0
+        self.dim: Optional[int] = None
+        self._seen = set()
+        self._scales: List["np.ndarray"] = []
+        self._offsets = [0]
+        self._tmp = tempfile.TemporaryDirectory(dir=self.path.parent if self.path.parent.exists() else None)
+        tmp = Path(self._tmp.name)
+        self._codes = open(tmp / "codes", "wb")
+        self._vectors = open(tmp / "vectors", "wb") if rescore else None
+        self._documents = open(tmp / "documents", "wb")
+
+    def add(
+        self,
+        vectors: Sequence[Sequence[float]],
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        ids: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        Añade un lote de fragmentos.
+
+        Returns:
+            int: Fragmentos añadidos (sin contar los duplicados)
+
+        Raises:
+            ValueError: Si la dimensión no coincide con la de lotes anteriores
+        """
+        if not len(texts):
+            return 0
+        vectors = np.asarray(vectors, dtype=np.float32)
+        metadatas = list(metadatas or [None] * len(texts))
+        ids = list(ids or [None] * len(texts))
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Dimensión {vectors.shape[1]} distinta de la del snapshot ({self.dim})")
+
+        keep = []
+        for row, (text, metadata) in enumerate(zip(texts, metadatas)):
+            if self.dedupe:
+                digest = hashlib.sha1(
+                    json.dumps([text, metadata or {}], sort_keys=True, ensure_ascii=False).encode("utf-8")
+                ).digest()
+                if digest in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._seen.add(digest)
+            keep.append(row)
+        if not keep:
+            return 0
+
+        vectors = vectors[keep]
+        codes, scales = quantize(vectors)
+        self._codes.write(codes.tobytes())
+        self._scales.append(scales)
+        if self._vectors is not None:
+            self._vectors.write(_normalize(vectors).astype(np.float16).tobytes())
+        for row in keep:
+            line = json.dumps([texts[row], metadatas[row] or {}, ids[row]], ensure_ascii=False).encode("utf-8")
+            self._documents.write(line)
+            self._offsets.append(self._offsets[-1] + len(line))
+        self.count += len(keep)
+        return len(keep)
+
+    def close(self) -> Dict[str, Any]:
+        """Ensambla el fichero final y devuelve su cabecera."""
+        try:
+            for f in (self._codes, self._vectors, self._documents):
+                if f is not None:
+                    f.close()
+            dim = self.dim or 0
+            scales = np.concatenate(self._scales) if self._scales else np.zeros(0, dtype=np.float32)
+            offsets = np.asarray(self._offsets, dtype=np.uint64)
+            tmp = Path(self._tmp.name)
+            sections = [
+                ("codes", tmp / "codes", self.count * dim),
+                ("scales", scales.tobytes(), scales.nbytes),
+                ("vectors", tmp / "vectors", self.count * dim * 2 if self.rescore else 0),
+                ("offsets", offsets.tobytes(), offsets.nbytes),
+                ("documents", tmp / "documents", int(offsets[-1])),
+            ]
+            header = {"version": FORMAT_VERSION, "count": self.count, "dim": dim, "rescore": self.rescore}
+            # La cabecera ocupa un tamaño fijo reservado para poder calcular los desplazamientos
+            reserved = _align(len(MAGIC) + _HEADER_SIZE.size + 512 + 48 * len(sections))
+            position = reserved
+            for name, _, size in sections:
+                header[name] = position
+                position = _align(position + size)
+            encoded = json.dumps(header).encode("utf-8")
+
+            partial = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(partial, "wb") as out:
+                out.write(MAGIC + _HEADER_SIZE.pack(len(encoded)) + encoded)
+                for name, source, size in sections:
+                    out.write(b"\0" * (header[name] - out.tell()))
+                    if isinstance(source, bytes):
+                        out.write(source)
+                    elif size:
+                        with open(source, "rb") as f:
+                            shutil.copyfileobj(f, out, 1 << 20)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(partial, self.path)
+            return header
+        finally:
+            self._tmp.cleanup()
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def abort(self) -> None:
+        """Descarta lo escrito sin tocar el destino."""
+        for f in (self._codes, self._vectors, self._documents):
+            if f is not None:
+                f.close()
+        self._tmp.cleanup()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SnapshotStore:
+    """
+    Índice de solo lectura sobre un snapshot mapeado en memoria.
+
+    La búsqueda puntúa los códigos int8 por bloques y, si el snapshot guarda
+    los vectores en float16, re-puntúa los `k * rescore_factor` mejores con
+    precisión completa. Expone `similarity_search` y
+    `similarity_search_by_vector` como el vector store de LangChain.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        embedding_function: Optional[Any] = None,
+        rescore: bool = True,
+        rescore_factor: int = 4,
+        block_size: int = 65536
+    ):
+        """
+        Args:
+            path (Union[str, Path]): Fichero del snapshot
+            embedding_function: Modelo con `embed_query` (solo para `similarity_search`)
+            rescore (bool): Re-puntuar los candidatos con los vectores float16 si existen
+            rescore_factor (int): Candidatos por resultado que se re-puntúan
+            block_size (int): Filas puntuadas por bloque (acota la memoria temporal)
+
+        Raises:
+            ValueError: Si el fichero no es un snapshot válido
+        """
+        self.path = Path(path)
+        self.embedding_function = embedding_function
+        self.rescore_factor = max(1, rescore_factor)
+        self.block_size = block_size
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} no es un snapshot de la base de conocimiento")
+            (length,) = _HEADER_SIZE.unpack(f.read(_HEADER_SIZE.size))
+            self.header = json.loads(f.read(length))
+            if self.header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Versión de snapshot no soportada: {self.header.get('version')}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        self.rescore = rescore and self.header["rescore"]
+        if self.count:
+            n, d = self.count, self.dim
+            self.codes = np.frombuffer(self._mmap, dtype=np.int8, count=n * d, offset=self.header["codes"]).reshape(n, d)
+            self.scales = np.frombuffer(self._mmap, dtype=np.float32, count=n, offset=self.header["scales"])
+            self.offsets = np.frombuffer(self._mmap, dtype=np.uint64, count=n + 1, offset=self.header["offsets"])
+            self.vectors = None
+            if self.header["rescore"]:
+                self.vectors = np.frombuffer(
+                    self._mmap, dtype=np.float16, count=n * d, offset=self.header["vectors"]
+                ).reshape(n, d)
+
+    @property
+    def count(self) -> int:
+        return self.header["count"]
+
+    @property
+    def dim(self) -> int:
+        return self.header["dim"]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def search(self, vectors: Sequence[Sequence[float]], k: int = 3) -> List[List[Tuple[int, float]]]:
+        """
+        Busca los `k` fragmentos más parecidos (coseno) a cada vector de consulta.
+
+        Returns:
+            List[List[Tuple[int, float]]]: (índice, similitud) por consulta, de mayor a menor
+        """
+        queries = _normalize(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        if not self.count or k <= 0:
+            return [[] for _ in queries]
+        k = min(k, self.count)
+        candidates = min(self.count, k * self.rescore_factor if self.rescore else k)
+
+        # Top-`candidates` acumulado por consulta: la memoria temporal es O(consultas × (bloque + candidatos))
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, self.count, self.block_size):
+            end = min(start + self.block_size, self.count)
+            block = (self.codes[start:end].astype(np.float32) @ queries.T) * self.scales[start:end, None]
+            ids = np.concatenate([best_ids, np.broadcast_to(np.arange(start, end), (len(queries), end - start))], axis=1)
+            scores = np.concatenate([best_scores, block.T], axis=1)
+            if scores.shape[1] > candidates:
+                keep = np.argpartition(-scores, candidates - 1, axis=1)[:, :candidates]
+                ids = np.take_along_axis(ids, keep, axis=1)
+                scores = np.take_along_axis(scores, keep, axis=1)
+            best_ids, best_scores = ids, scores
+
+        results = []
+        for query, top, row_scores in zip(queries, best_ids, best_scores):
+            if self.rescore:
+                top = np.sort(top)
+                row_scores = self.vectors[top].astype(np.float32) @ query
+            order = np.argsort(-row_scores)[:k]
+            results.append([(int(top[i]), float(row_scores[i])) for i in order])
+        return results
+
+    def document(self, index: int) -> SnapshotDocument:
+        text, metadata, _ = self._entry(index)
+        return SnapshotDocument(text, metadata)
+
+    def similarity_search_by_vector(self, embedding: Sequence[float], k: int = 4, **kwargs) -> List[SnapshotDocument]:
+        return [self.document(index) for index, _ in self.search([embedding], k)[0]]
+
+    def similarity_search_by_vectors(self, embeddings: Sequence[Sequence[float]], k: int = 4) -> List[List[SnapshotDocument]]:
+        """Varias consultas en una sola pasada sobre el índice."""
+        return [[self.document(index) for index, _ in hits] for hits in self.search(embeddings, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[SnapshotDocument]:
+        if self.embedding_function is None:
+            raise ValueError("El snapshot se abrió sin modelo de embeddings")
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k)
+
+    def add_texts(self, *args, **kwargs):
+        raise RuntimeError("El snapshot es de solo lectura: ingiere en Chroma y vuelve a exportar")
+
+    def iter_batches(self, batch_size: int = 4096) -> Iterator[Tuple["np.ndarray", List[str], List[Dict[str, Any]], List[Optional[str]]]]:
+        """Recorre el snapshot por lotes (vectores en float32, textos, metadatos e ids)."""
+        for start in range(0, self.count, batch_size):
+            end = min(start + batch_size, self.count)
+            if self.vectors is not None:
+                vectors = self.vectors[start:end].astype(np.float32)
+            else:
+                vectors = self.codes[start:end].astype(np.float32) * self.scales[start:end, None]
+            entries = [self._entry(index) for index in range(start, end)]
+            yield vectors, [e[0] for e in entries], [e[1] for e in entries], [e[2] for e in entries]
+
+    def close(self) -> None:
+        # Las vistas de numpy mantienen el mapa abierto hasta que se liberan
+        self.codes = self.scales = self.offsets = self.vectors = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+
+    def _entry(self, index: int) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        base = self.header["documents"]
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return tuple(json.loads(self._mmap[base + start:base + end]))
+
+
+def write_snapshot(
+    path: Union[str, Path],
+    batches: Iterator[Tuple[Sequence[Sequence[float]], Sequence[str], Sequence[Dict[str, Any]], Sequence[Optional[str]]]],
+    rescore: bool = True,
+    dedupe: bool = True
+) -> Dict[str, Any]:
+    """
+    Escribe un snapshot a partir de lotes (vectores, textos, metadatos, ids).
+
+    Returns:
+        Dict[str, Any]: Cabecera con el recuento y los duplicados omitidos
+    """
+    writer = SnapshotWriter(path, rescore=rescore, dedupe=dedupe)
+    try:
+        for vectors, texts, metadatas, ids in batches:
+            writer.add(vectors, texts, metadatas, ids)
+    except BaseException:
+        writer.abort()
+        raise
+    return {**writer.close(), "duplicates": writer.duplicates}
+
+
+def compact_snapshot(source: Union[str, Path], target: Union[str, Path], rescore: Optional[bool] = None) -> Dict[str, Any]:
+    """Reescribe un snapshot sin fragmentos duplicados (el destino puede ser el mismo fichero)."""
+    store = SnapshotStore(source)
+    try:
+        keep_vectors = store.header["rescore"] if rescore is None else rescore
+        return write_snapshot(target, store.iter_batches(), rescore=keep_vectors, dedupe=True)
+    finally:
+        store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Exporta la colección de Chroma a un snapshot")
+    export.add_argument("snapshot", type=Path)
+    export.add_argument("--no-rescore", action="store_true", help="No guardar los vectores float16")
+    export.add_argument("--env-file", default=".env")
+    compact = commands.add_parser("compact", help="Elimina fragmentos duplicados de un snapshot")
+    compact.add_argument("source", type=Path)
+    compact.add_argument("target", type=Path)
+    info = commands.add_parser("info", help="Muestra la cabecera de un snapshot")
+    info.add_argument("snapshot", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        from src.rag.document_processor import DocumentProcessor
+        from src.utils.config import Config
+        processor = DocumentProcessor(Config(env_file=args.env_file), use_snapshot=False)
+        result = processor.export_snapshot(args.snapshot, rescore=not args.no_rescore)
+    elif args.command == "compact":
+        result = compact_snapshot(args.source, args.target)
+    else:
+        store = SnapshotStore(args.snapshot)
+        result = {**store.header, "size_bytes": args.snapshot.stat().st_size}
+        store.close()
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
-from typing import Dict, Any
-from deep_translator import GoogleTranslator
+from typing import Dict, Any, List
 from src.utils.config import Config
+from src.utils.helpers import lazy_import
+
+deep_translator = lazy_import("deep_translator")
+
+# Separador que el traductor conserva intacto para poder enviar varios textos en una petición
+BATCH_SEPARATOR = "\n\n⁂\n\n"
+# Límite de caracteres por petición de GoogleTranslator
+MAX_REQUEST_CHARS = 5000
 
 class Translator:
     """Clase para manejar traducciones de contenido."""
@@ -30,7 +37,7 @@ class Translator:
         """
         try:
             # Inicializar el traductor
-            translator = GoogleTranslator(
+            translator = deep_translator.GoogleTranslator(
                 source='es',  # Idioma fuente fijo como español según generator.py
                 target=target_lang
             )
@@ -41,4 +48,38 @@ class Translator:
             return translated_content
             
         except Exception as e:
-            raise Exception(f"Error en la traducción: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error en la traducción: {str(e)}")
+
+    def translate_batch(self, contents: List[str], target_lang: str) -> List[str]:
+        """
+        Traduce varios textos con el menor número de peticiones posible.
+
+        Si caben en una petición, se unen con un separador y se traducen de una vez;
+        si la respuesta no conserva el separador, se traducen uno a uno.
+
+        Args:
+            contents (List[str]): Contenidos a traducir
+            target_lang (str): Idioma destino
+
+        Returns:
+            List[str]: Contenidos traducidos, en el mismo orden
+
+        Raises:
+            Exception: Si hay un error en la traducción
+        """
+        if len(contents) == 1:
+            return [self.translate(contents[0], target_lang)]
+
+        try:
+            translator = deep_translator.GoogleTranslator(source='es', target=target_lang)
+
+            joined = BATCH_SEPARATOR.join(contents)
+            if len(joined) <= MAX_REQUEST_CHARS:
+                parts = [part.strip() for part in translator.translate(joined).split(BATCH_SEPARATOR.strip())]
+                if len(parts) == len(contents):
+                    return parts
+
+            return [translator.translate(content) for content in contents]
+
+        except Exception as e:
+            raise Exception(f"Error en la traducción: {str(e)}")
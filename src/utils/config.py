@@ -2,7 +2,7 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 from typing import Any, Dict
-import logging
+from src.monitoring.structured_logging import parse_sampling, setup_logging
 
 
 class Config:
@@ -32,6 +32,31 @@ class Config:
         self.llm_provider = self._get_env("LLM_PROVIDER", "ollama").lower()  # Nuevo: Proveedor de LLM
         self.openai_api_key = self._get_env("OPENAI_API_KEY", required=True)
         self.ollama_host = self._get_env("OLLAMA_HOST", "http://localhost:11434")
+        # Servidores compatibles con OpenAI (groq, vllm, llamacpp, lmstudio, openai_compatible)
+        self.llm_base_url = self._get_env("LLM_BASE_URL")
+        self.llm_model = self._get_env("LLM_MODEL")
+        self.llm_api_key = self._get_env("LLM_API_KEY", os.getenv("GROQ_API_KEY"))
+        self.llm_connect_timeout = float(self._get_env("LLM_CONNECT_TIMEOUT", "5"))
+        self.llm_read_timeout = float(self._get_env("LLM_READ_TIMEOUT", "60"))
+        self.llm_max_retries = int(self._get_env("LLM_MAX_RETRIES", "3"))
+        # Cortar la generación en streaming al alcanzar el límite de la plataforma
+        self.stream_truncate = self._get_env("STREAM_TRUNCATE", "True").lower() == "true"
+        
+        # Caché semántica de borradores (peticiones casi duplicadas reutilizan la generación)
+        self.semantic_cache_enabled = self._get_env("SEMANTIC_CACHE_ENABLED", "False").lower() == "true"
+        self.semantic_cache_threshold = float(self._get_env("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+        # Umbral por plataforma, p. ej. "twitter=0.9,blog=0.96"
+        self.semantic_cache_thresholds = {
+            platform.strip().lower(): float(value)
+            for platform, _, value in (
+                item.partition("=") for item in self._get_env("SEMANTIC_CACHE_THRESHOLDS", "").split(",") if "=" in item
+            )
+        }
+        self.semantic_cache_size = int(self._get_env("SEMANTIC_CACHE_SIZE", "1000"))
+        self.semantic_cache_ttl = float(self._get_env("SEMANTIC_CACHE_TTL", "86400"))
+        
+        # Verificación de afirmaciones contra la base de conocimiento (requiere el índice RAG)
+        self.fact_check_enabled = self._get_env("FACT_CHECK_ENABLED", "False").lower() == "true"
         
         # Image generation
         self.huggingface_token = os.getenv("HUGGINGFACE_TOKEN")
@@ -39,13 +64,27 @@ class Config:
         
         # Database settings
         self.chroma_persist_directory = self._get_env("CHROMA_PERSIST_DIRECTORY", "./data/chroma")
+        # Snapshot cuantizado de solo lectura: si existe, se consulta en lugar de abrir Chroma
+        rag_snapshot = self._get_env("RAG_SNAPSHOT")
+        self.rag_snapshot = Path(rag_snapshot) if rag_snapshot else None
+        self.rag_rescore = self._get_env("RAG_RESCORE", "True").lower() == "true"
         self.neo4j_uri = self._get_env("NEO4J_URI")
         self.neo4j_user = self._get_env("NEO4J_USER")
         self.neo4j_password = self._get_env("NEO4J_PASSWORD")
         
         # External APIs
         self.arxiv_email = self._get_env("ARXIV_EMAIL")
+        # Temas que el agente científico mantiene indexados en segundo plano (separados por comas)
+        self.scientific_topics = [
+            topic.strip() for topic in self._get_env("SCIENTIFIC_TOPICS", "").split(",") if topic.strip()
+        ]
+        self.scientific_refresh_interval = float(self._get_env("SCIENTIFIC_REFRESH_INTERVAL", "21600"))
         self.financial_api_key = self._get_env("FINANCIAL_API_KEY")
+        # alphavantage con clave; csv lee series locales de FINANCIAL_DATA_DIR (sin red)
+        self.financial_provider = self._get_env(
+            "FINANCIAL_PROVIDER", "alphavantage" if self.financial_api_key else "csv"
+        ).lower()
+        self.financial_data_dir = Path(self._get_env("FINANCIAL_DATA_DIR", "./data/market"))
         self.news_api_key = self._get_env("NEWS_API_KEY")
         
         # Monitoring
@@ -56,6 +95,14 @@ class Config:
         self.data_dir = Path(self._get_env("DATA_DIR", "./data"))
         self.temp_dir = Path(self._get_env("TEMP_DIR", "./temp"))
         self.log_dir = Path(self._get_env("LOG_DIR", "./logs"))
+        # Imágenes generadas, con nombre por hash de contenido y servidas en /media
+        self.media_dir = Path(self._get_env("MEDIA_DIR", str(self.temp_dir / "images")))
+        # Prefijo interno de nginx (X-Accel-Redirect) para que el proxy envíe el fichero con sendfile
+        self.media_accel_redirect = self._get_env("MEDIA_ACCEL_REDIRECT")
+        
+        # Historial de generaciones (SQLite, escritura en segundo plano)
+        self.history_enabled = self._get_env("HISTORY_ENABLED", "True").lower() == "true"
+        self.history_db = Path(self._get_env("HISTORY_DB", str(self.data_dir / "history.sqlite3")))
         
         # Create necessary directories
         self._create_directories()
@@ -89,18 +136,21 @@ class Config:
             directory.mkdir(parents=True, exist_ok=True)
     
     def _setup_logging(self) -> None:
-        """Configure logging for the application."""
-        log_level = getattr(logging, self._get_env("LOG_LEVEL", "INFO").upper())
+        """Configure asynchronous JSON logging (queue + background listener)."""
+        log_level = self._get_env("LOG_LEVEL", "INFO").upper()
         log_format = self._get_env("LOG_FORMAT",
                                  "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        artifact_max_age = self._get_env("LOG_ARTIFACT_MAX_AGE_DAYS", "7")
         
-        logging.basicConfig(
+        setup_logging(
+            self.log_dir,
             level=log_level,
-            format=log_format,
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler(self.log_dir / "app.log")
-            ]
+            console_format=log_format,
+            max_bytes=int(self._get_env("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backup_count=int(self._get_env("LOG_BACKUP_COUNT", "5")),
+            rotate_when=self._get_env("LOG_ROTATE_WHEN") or None,
+            sampling=parse_sampling(self._get_env("LOG_SAMPLING", "")),
+            artifact_max_age_days=float(artifact_max_age) if artifact_max_age else None
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -128,6 +178,7 @@ class Config:
             "secret_key",
             "openai_api_key" if self.llm_provider == "openai" else None,
             "ollama_host" if self.llm_provider == "ollama" else None,
+            "llm_api_key" if self.llm_provider == "groq" else None,
         ]
         
         missing_keys = [
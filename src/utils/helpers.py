@@ -0,0 +1,129 @@
+import importlib
+import importlib.util
+import os
+import threading
+import types
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_SENTENCE_ENDS = ".!?…\n"
+
+
+class LazyModule(types.ModuleType):
+    """
+    Proxy de módulo que difiere el import real hasta el primer acceso a un atributo.
+
+    Permite declarar dependencias pesadas (torch, diffusers, langchain...) a nivel
+    de módulo sin pagar su coste de carga al importar el paquete `src`.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module: Optional[types.ModuleType] = None
+
+    def _load(self) -> types.ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+            self.__dict__.update(self._module.__dict__)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Devuelve un proxy perezoso para el módulo indicado.
+
+    Args:
+        name (str): Nombre completo del módulo (por ejemplo "diffusers")
+
+    Returns:
+        LazyModule: Proxy que importa el módulo en el primer uso
+    """
+    return LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """Indica si un módulo opcional está instalado sin llegar a importarlo."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=1)
+def default_file_mode() -> int:
+    """
+    Permisos que tendría un fichero creado con `open` (0o666 menos la umask).
+
+    `tempfile.mkstemp` crea con 0o600; quien publique el fichero con un reemplazo
+    atómico debe aplicar estos permisos para que otros procesos (nginx) lo lean.
+    """
+    umask = os.umask(0o022)  # Solo se puede leer cambiándola; se restaura al momento
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def truncate_at_sentence(text: str, limit: int) -> str:
+    """
+    Recorta un texto al límite de caracteres cortando en el último final de frase.
+
+    Si no hay un final de frase en la segunda mitad del texto recortado, corta en
+    el último espacio y añade "…".
+
+    Args:
+        text (str): Texto a recortar
+        limit (int): Número máximo de caracteres
+
+    Returns:
+        str: Texto de como máximo `limit` caracteres
+    """
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = max(cut.rfind(end) for end in _SENTENCE_ENDS)
+    if boundary >= limit // 2:
+        return cut[:boundary + 1].rstrip()
+    space = cut.rfind(" ", 0, limit - 1)
+    if space <= 0:
+        space = limit - 1
+    return cut[:space].rstrip() + "…"
+
+
+class SingleFlight:
+    """
+    Agrupa las llamadas concurrentes con la misma clave en una sola ejecución.
+
+    El primer hilo ejecuta la función; los que llegan mientras tanto esperan y
+    reciben el mismo resultado (o la misma excepción).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
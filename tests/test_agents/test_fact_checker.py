@@ -0,0 +1,69 @@
+import unittest
+from benchmarks.stubs import FakeEmbeddings
+from src.agents.fact_checker import FactChecker, NLIScorer, SimilarityScorer, extract_claims
+from src.utils.helpers import is_available
+
+EVIDENCE = "El estudio demuestra que la inteligencia artificial reduce un 30% los errores de diagnóstico"
+
+
+class InMemoryIndex:
+    """Índice mínimo con la interfaz de `DocumentProcessor` que usa el verificador."""
+
+    def __init__(self, texts):
+        self.embeddings = FakeEmbeddings()
+        self.texts = texts
+        self.vectors = self.embeddings.embed_documents(texts)
+        self.batch_calls = 0
+
+    def query_knowledge_base_batch(self, queries, k=3, query_vectors=None):
+        self.batch_calls += 1
+        results = []
+        for query_vector in query_vectors:
+            ranked = sorted(
+                zip(self.texts, self.vectors),
+                key=lambda item: -sum(a * b for a, b in zip(query_vector, item[1]))
+            )
+            results.append([{"text": text, "metadata": {"source": "arxiv:1"}} for text, _ in ranked[:k]])
+        return results
+
+
+@unittest.skipUnless(is_available("numpy"), "numpy no instalado")
+class TestFactChecker(unittest.TestCase):
+    def test_extract_claims_skips_questions_and_hashtags(self):
+        text = (
+            f"{EVIDENCE}. ¿Te lo imaginas? Síguenos. "
+            "Los hospitales ganan eficiencia con nuevas herramientas digitales. ✨ #IA #Salud"
+        )
+        claims = extract_claims(text, max_claims=1)
+        self.assertEqual(claims, [EVIDENCE + "."])
+        self.assertEqual(len(extract_claims(text)), 2)
+
+    def test_batched_verdicts(self):
+        index = InMemoryIndex([EVIDENCE, "Los gatos duermen muchas horas durante el día"])
+        checker = FactChecker(index, scorer=SimilarityScorer(index.embeddings))
+        result = checker.check(
+            f"{EVIDENCE}. Los coches eléctricos cargan completamente en cinco minutos exactos."
+        )
+
+        self.assertEqual(index.batch_calls, 1)
+        self.assertEqual([claim["verdict"] for claim in result["claims"]], ["supported", "unverified"])
+        self.assertEqual(result["claims"][0]["source"], "arxiv:1")
+        self.assertEqual((result["supported"], result["unverified"]), (1, 1))
+
+    def test_annotate_reports_contradictions_as_warnings(self):
+        class ContradictingScorer(NLIScorer):
+            def __init__(self):
+                pass
+
+            def score(self, pairs, known_vectors=None):
+                return [(0.1, 0.9) for _ in pairs]
+
+        checker = FactChecker(InMemoryIndex([EVIDENCE]), scorer=ContradictingScorer())
+        report = checker.annotate({"overall_valid": True, "violations": []}, EVIDENCE)
+        self.assertEqual(report["fact_check"]["contradicted"], 1)
+        self.assertEqual(report["violations"][0]["severity"], "warning")
+        self.assertTrue(report["overall_valid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from src.utils.helpers import is_available
+
+if is_available("pandas"):
+    import numpy as np
+    import pandas as pd
+    from src.agents.financial_agent import (
+        CSVProvider, ChartRenderer, FinancialAgent, MarketDataCache, compute_indicators
+    )
+
+
+def _prices(days, start=100.0, step=1.0):
+    index = pd.bdate_range("2024-01-01", periods=days, name="date")
+    close = start + step * np.arange(days)
+    return pd.DataFrame({
+        "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1000.0
+    }, index=index)
+
+
+class CountingProvider(CSVProvider):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.starts = []
+        self.fail = False
+
+    def fetch(self, ticker, start=None):
+        self.starts.append(start)
+        if self.fail:
+            raise RuntimeError("proveedor caído")
+        return super().fetch(ticker, start)
+
+
+@unittest.skipUnless(is_available("pandas"), "pandas no instalado")
+class TestFinancialAgent(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "src").mkdir()
+        _prices(60).to_csv(self.root / "src" / "AAA.csv")
+        _prices(60, start=50.0, step=-0.5).to_csv(self.root / "src" / "BBB.csv")
+        self.provider = CountingProvider(self.root / "src")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_incremental_refresh(self):
+        cache = MarketDataCache(self.root / "cache", self.provider, refresh_interval=0)
+        self.assertEqual(len(cache.history("AAA")), 60)
+        _prices(65).to_csv(self.root / "src" / "AAA.csv")
+
+        # Nueva instancia: lee la caché en disco y solo pide los días posteriores
+        cache = MarketDataCache(self.root / "cache", self.provider, refresh_interval=0)
+        self.assertEqual(len(cache.history("AAA")), 65)
+        self.assertIsNone(self.provider.starts[0])
+        self.assertEqual(str(self.provider.starts[1]), "2024-03-23")
+
+    def test_failed_refresh_waits_for_next_interval(self):
+        cache = MarketDataCache(self.root / "cache", self.provider, refresh_interval=0.2)
+        cached = cache.history("AAA")
+        time.sleep(0.25)
+        self.provider.fail = True
+
+        for _ in range(3):
+            self.assertIs(cache.history("AAA"), cached)  # Sirve la caché sin volver a llamar al proveedor
+        self.assertEqual(len(self.provider.starts), 2)
+        time.sleep(0.25)
+        cache.history("AAA")
+        self.assertEqual(len(self.provider.starts), 3)
+
+    def test_indicators_are_vectorized_over_tickers(self):
+        closes = pd.concat({"AAA": _prices(60)["close"], "BBB": _prices(60, 50.0, -0.5)["close"]}, axis=1)
+        indicators = compute_indicators(closes, windows=(20,))
+        self.assertEqual(list(indicators.index), ["AAA", "BBB"])
+        self.assertAlmostEqual(indicators.loc["AAA", "return_1d"], 159 / 158 - 1)
+        self.assertAlmostEqual(indicators.loc["AAA", "sma_20"], np.mean(np.arange(140, 160)))
+        self.assertAlmostEqual(indicators.loc["AAA", "max_drawdown"], 0.0)
+        self.assertLess(indicators.loc["BBB", "max_drawdown"], 0.0)
+
+    @unittest.skipUnless(is_available("matplotlib"), "matplotlib no instalado")
+    def test_agent_returns_summary_and_chart_future(self):
+        cache = MarketDataCache(self.root / "cache", self.provider)
+        agent = FinancialAgent("financial", cache, ChartRenderer(self.root / "charts"))
+        result = agent.process("aaa, bbb")
+        self.assertIn("AAA: cierre 159.00", result["summary"])
+        self.assertEqual(len(result["indicators"]), 2)
+        self.assertTrue(Path(result["chart"].result(timeout=30)).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import time
+import unittest
+from src.agents.base_agent import BaseAgent
+from src.agents.content_writer import ContentWriterAgent
+from src.agents.runtime import AgentGraph
+
+
+class SleepyAgent(BaseAgent):
+    """Agente síncrono que tarda `delay` segundos y concatena sus entradas."""
+
+    def __init__(self, name, inputs, outputs, delay=0.0, fail=False, **kwargs):
+        super().__init__(name, inputs=inputs, outputs=outputs, **kwargs)
+        self.delay = delay
+        self.fail = fail
+
+    def process(self, task):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} falló")
+        return f"{self.name}({task})"
+
+
+class TestAgentGraph(unittest.TestCase):
+    def test_independent_agents_overlap(self):
+        graph = AgentGraph([
+            ContentWriterAgent("writer", inputs=("prompt", "research", "market_data")),
+            SleepyAgent("scientific", ("topic",), ("research",), delay=0.2),
+            SleepyAgent("financial", ("topic",), ("market_data",), delay=0.2),
+        ])
+        start = time.perf_counter()
+        context = graph.run_sync({"topic": "IA", "prompt": "Escribe"})
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(context.ok)
+        self.assertLess(elapsed, 0.35)  # En serie serían 0.4 s
+        self.assertIn("scientific(IA)", context.values["draft"])
+        self.assertIn("Market data:", context.values["draft"])
+        self.assertEqual([agent.name for agent in graph.order][-1], "writer")
+
+    def test_optional_failure_and_timeout(self):
+        graph = AgentGraph([
+            SleepyAgent("financial", ("topic",), ("market_data",), fail=True, required=False),
+            SleepyAgent("slow", ("topic",), ("research",), delay=0.5, timeout=0.05),
+            SleepyAgent("summary", ("market_data",), ("summary",)),
+            SleepyAgent("fact_checker", ("research",), ("report",)),
+        ])
+        context = asyncio.run(graph.run({"topic": "IA"}))
+
+        self.assertEqual(context.values["summary"], "summary(None)")
+        self.assertIn("Timeout", context.errors["slow"])
+        self.assertIn("dependencia", context.errors["fact_checker"])
+        self.assertNotIn("report", context.values)
+
+    def test_run_sync_returns_at_timeout(self):
+        graph = AgentGraph([SleepyAgent("slow", ("topic",), ("research",), delay=1.0, timeout=0.1)])
+        start = time.perf_counter()
+        context = graph.run_sync({"topic": "IA"})
+        elapsed = time.perf_counter() - start
+
+        self.assertIn("Timeout", context.errors["slow"])
+        self.assertLess(elapsed, 0.5)  # No espera a que termine el hilo del agente
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            AgentGraph([
+                SleepyAgent("a", ("y",), ("x",)),
+                SleepyAgent("b", ("x",), ("y",)),
+            ])
+        graph = AgentGraph([SleepyAgent("a", ("topic",), ("x",))])
+        self.assertEqual(graph.required_inputs, ["topic"])
+        with self.assertRaises(ValueError):
+            graph.run_sync({})
+
+
+if __name__ == "__main__":
+    unittest.main()
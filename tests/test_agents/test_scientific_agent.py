@@ -0,0 +1,86 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from benchmarks.stubs import FakeEmbeddings
+from src.agents.scientific_agent import BackgroundRefresher, ScientificAgent, ScientificIndex
+from src.utils.helpers import is_available
+
+
+class FakeArxiv:
+    """Sustituto de `DocumentProcessor`: papers deterministas con latencia y recuento de descargas."""
+
+    def __init__(self, latency=0.0):
+        self.embeddings = FakeEmbeddings()
+        self.latency = latency
+        self.fetches = []
+        self.processed = 0
+
+    def fetch_arxiv_papers(self, query, max_results=5):
+        self.fetches.append(query)
+        time.sleep(self.latency)
+        return [
+            {
+                "title": f"{query} paper {i}",
+                "abstract": f"Estudio sobre {query} número {i}. Más detalles.",
+                "url": f"http://arxiv.org/abs/{abs(hash(query)) % 1000}.{i}",
+            }
+            for i in range(max_results)
+        ]
+
+    def process_papers(self, papers):
+        self.processed += len(papers)
+
+
+@unittest.skipUnless(is_available("numpy"), "numpy no instalado")
+class TestScientificIndex(unittest.TestCase):
+    def test_concurrent_unknown_topic_is_ingested_once(self):
+        source = FakeArxiv(latency=0.1)
+        index = ScientificIndex(source, papers_per_topic=3)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(index.get("Inteligencia artificial en salud")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(source.fetches, ["inteligencia artificial en salud"])
+        self.assertEqual(len({id(entry) for entry in results}), 1)
+        self.assertEqual(len(results[0].papers), 3)
+        self.assertEqual(source.processed, 3)
+
+    def test_lookup_by_name_and_centroid_without_fetching(self):
+        source = FakeArxiv()
+        index = ScientificIndex(source, similarity_threshold=0.3)
+        index.ingest("computación cuántica")
+        self.assertIs(index.lookup("  Computación   CUÁNTICA "), index.entry("computación cuántica"))
+        self.assertEqual(index.get("estudio sobre computación cuántica").topic, "computación cuántica")
+        self.assertIsNone(index.lookup("recetas de cocina mediterránea"))
+        self.assertEqual(len(source.fetches), 1)
+
+    def test_refresh_does_not_store_known_papers_again(self):
+        source = FakeArxiv()
+        index = ScientificIndex(source, papers_per_topic=3)
+        index.ingest("robótica")
+        index.ingest("robótica")
+        self.assertEqual((len(source.fetches), source.processed), (2, 3))
+
+    def test_refresher_persists_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.json"
+            source = FakeArxiv()
+            refresher = BackgroundRefresher(ScientificIndex(source, path), ["robótica"], pause=0)
+            self.assertEqual(refresher.run_once(), 1)
+            self.assertEqual(refresher.run_once(), 0)  # Aún fresco
+
+            agent = ScientificAgent("scientific", ScientificIndex(source, path))
+            self.assertIn("robótica paper", agent.process("Robótica"))
+            self.assertEqual(source.fetches, ["robótica"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+from src.utils.helpers import is_available
+
+
+@unittest.skipUnless(is_available("fastapi") and is_available("httpx"), "fastapi/httpx no instalados")
+class TestMediaEndpoint(unittest.TestCase):
+    def setUp(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from src.api.middleware import CompressionMiddleware
+        from src.api.routers import MediaSettings, get_media_settings, router
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = bytes(range(256)) * 40
+        self.digest = hashlib.sha256(self.data).hexdigest()
+        (Path(self.tmp.name) / f"{self.digest}.webp").write_bytes(self.data)
+
+        app = FastAPI()
+        app.include_router(router)
+        app.add_middleware(CompressionMiddleware)
+        app.dependency_overrides[get_media_settings] = lambda: MediaSettings(Path(self.tmp.name))
+
+        @app.get("/payload")
+        def payload():
+            return {"items": ["contenido"] * 200}
+
+        self.client = TestClient(app)
+        self.url = f"/media/{self.digest}.webp"
+
+    def tearDown(self):
+        self.client.close()
+        self.tmp.cleanup()
+
+    def test_serves_with_strong_etag_and_immutable_cache(self):
+        response = self.client.get(self.url, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.data)
+        self.assertEqual(response.headers["etag"], f'"{self.digest}"')
+        self.assertIn("immutable", response.headers["cache-control"])
+        self.assertNotIn("content-encoding", response.headers)  # Las imágenes no se recomprimen
+
+        revalidated = self.client.get(self.url, headers={"If-None-Match": f'W/"x", "{self.digest}"'})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b"")
+
+    def test_range_and_unknown_media(self):
+        partial = self.client.get(self.url, headers={"Range": "bytes=10-19"})
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.content, self.data[10:20])
+        self.assertEqual(partial.headers["content-range"], f"bytes 10-19/{len(self.data)}")
+
+        self.assertEqual(self.client.get("/media/" + "0" * 64 + ".webp").status_code, 404)
+        self.assertEqual(self.client.get("/media/..%2Fsecreto.webp").status_code, 404)
+
+    def test_json_is_compressed_when_accepted(self):
+        response = self.client.get("/payload", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertEqual(len(response.json()["items"]), 200)
+
+        raw = self.client.get("/payload", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", raw.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
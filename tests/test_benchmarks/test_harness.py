@@ -0,0 +1,41 @@
+import json
+import tempfile
+import unittest
+import urllib.request
+from benchmarks.harness import BenchmarkResult, compare_to_baseline, percentile, run_benchmark
+from benchmarks.stubs import FakeImageGenerator, OllamaStubServer
+
+class TestHarness(unittest.TestCase):
+    def test_percentile_interpolates(self):
+        samples = list(range(1, 101))
+        self.assertAlmostEqual(percentile(samples, 50), 50.5)
+        self.assertAlmostEqual(percentile(samples, 99), 99.01)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_compare_detects_regressions(self):
+        result = run_benchmark("noop", lambda i: None, iterations=20, warmup=0)
+        self.assertEqual(result.errors, 0)
+        slower = BenchmarkResult("noop", 20, 1, 10.0, 90.0, 100.0, 110.0, 95.0, result.peak_rss_mb)
+        baseline = {"noop": {**slower.to_dict(), "p95_ms": 10.0, "throughput": 100.0, "mean_ms": 9.0}}
+        regressions = compare_to_baseline([slower], baseline)
+        self.assertEqual(len(regressions), 2)
+
+    def test_ollama_stub_honours_num_predict(self):
+        with OllamaStubServer() as stub:
+            request = urllib.request.Request(
+                stub.url + "/api/generate",
+                data=json.dumps({"prompt": "hola", "stream": False, "options": {"num_predict": 4}}).encode(),
+            )
+            with urllib.request.urlopen(request) as response:
+                payload = json.load(response)
+        self.assertTrue(payload["done"])
+        self.assertEqual(payload["eval_count"], 4)
+
+    def test_fake_image_is_a_png(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = FakeImageGenerator(output_dir=tmp).generate("montañas")
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import json
+import random
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from benchmarks.loadtest import HttpClient, TrafficMix, run_open_loop, summarize, timeline
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = 500 if request["platform"] == "Blog" else 200
+        body = json.dumps({"platform": request["platform"]}).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Process-Time", "0.001")
+        self.end_headers()
+        self.wfile.write(body)
+
+class TestLoadTest(unittest.TestCase):
+    def test_open_loop_against_local_server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            mix = TrafficMix(platforms={"Twitter": 3, "Blog": 1})
+
+            async def run():
+                client = HttpClient(f"http://127.0.0.1:{server.server_address[1]}", max_connections=4)
+                try:
+                    return await run_open_loop(client, mix, rps=40, duration=0.5, rng=random.Random(1))
+                finally:
+                    await client.close()
+
+            records = asyncio.run(run())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        summary = summarize(records, 0.5)
+        self.assertGreater(summary["requests"], 5)
+        self.assertEqual(summary["errors"].keys(), {"HTTP 500"})
+        self.assertAlmostEqual(summary["server_time_ms"]["p50"], 1.0)
+        self.assertEqual(sum(b["sent"] for b in timeline(records)), summary["requests"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from src.content.campaign import CampaignRunner, load_checkpoint, read_rows
+from src.content.templates import get_registry
+
+CALENDAR = """topic,platform,language,audience
+IA en salud,instagram,es,médicos
+IA en salud,instagram,en,médicos
+IA en salud,twitter,es,médicos
+Energía solar,instagram,es,ingenieros
+"""
+
+
+class FakeImageGenerator:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_image(self, prompt):
+        self.prompts.append(prompt)
+        return prompt
+
+
+class FakeGenerator:
+    """Generador mínimo: escribe la imagen en disco con nombre por hash, como ImageOptimizer."""
+
+    def __init__(self, image_dir, fail_topics=()):
+        self.templates = get_registry()
+        self.image_generator = FakeImageGenerator()
+        self.image_dir = image_dir
+        self.fail_topics = set(fail_topics)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, platform, topic, audience, language, company_info, model_name, variants, base_image):
+        with self._lock:
+            self.calls += 1
+        if topic in self.fail_topics:
+            raise RuntimeError("backend caído")
+        images = {}
+        if base_image is not None:
+            data = f"{base_image}|{platform}".encode()
+            path = self.image_dir / f"{hashlib.sha256(data).hexdigest()}.png"
+            path.write_bytes(data)
+            images["feed"] = str(path)
+        return {"content": {"text": f"{topic} ({language})"}, "images": images}
+
+
+class TestCampaignRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.calendar = self.root / "calendario.csv"
+        self.calendar.write_text(CALENDAR, encoding="utf-8")
+        (self.root / "tmp").mkdir()
+        self.output = self.root / "salida"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _records(self):
+        lines = (self.output / "results.jsonl").read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_groups_share_image_and_write_content_addressed_files(self):
+        generator = FakeGenerator(self.root / "tmp")
+        summary = CampaignRunner(generator, self.output, workers=3).run(read_rows(self.calendar))
+
+        self.assertEqual((summary.succeeded, summary.failed, summary.shared_images), (4, 0, 1))
+        self.assertEqual(len(generator.image_generator.prompts), 2)  # Una por tema con imagen
+        records = {record["row"]: record for record in self._records()}
+        self.assertEqual(records[2]["text"], "IA en salud (en)")
+        self.assertIsNone(records[3]["image"])
+        self.assertTrue((self.output / records[1]["image"]).exists())
+
+    def test_resume_skips_completed_rows_and_retries_failures(self):
+        CampaignRunner(FakeGenerator(self.root / "tmp", fail_topics={"Energía solar"}), self.output).run(
+            read_rows(self.calendar)
+        )
+        with open(self.output / "results.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"row": 9, "status": "o')  # Corte a mitad de línea
+
+        generator = FakeGenerator(self.root / "tmp")
+        summary = CampaignRunner(generator, self.output).run(read_rows(self.calendar))
+
+        self.assertEqual((summary.skipped, summary.succeeded, generator.calls), (3, 1, 1))
+        self.assertEqual(len(load_checkpoint(self.output / "results.jsonl")), 4)
+        self.assertEqual(self._records()[-1]["status"], "ok")
+
+    def test_invalid_rows_are_recorded_without_stopping(self):
+        rows = CALENDAR.replace("audience\n", "audience,company_info,variants\n", 1)
+        rows += "IA,myspace,es,todos\n,twitter,es,todos\nIA,twitter,es,todos,,dos\n"
+        self.calendar.write_text(rows, encoding="utf-8")
+        generator = FakeGenerator(self.root / "tmp")
+        summary = CampaignRunner(generator, self.output).run(read_rows(self.calendar))
+
+        self.assertEqual((summary.succeeded, summary.failed, generator.calls), (4, 3, 4))
+        errors = {record["row"]: record["error"] for record in self._records() if record["status"] == "error"}
+        self.assertEqual(sorted(errors), [5, 6, 7])
+        self.assertIn("variants", errors[7])
+
+    def test_missing_columns(self):
+        self.calendar.write_text("topic,platform\nIA,twitter\n", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            list(read_rows(self.calendar))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from benchmarks.stubs import FakeTranslator
+from src.content.generator import ContentGenerator
+
+SHORT = "La IA llega a la salud."
+FULL = ("La IA transforma la salud. " * 8).strip()
+TOO_LONG = "La IA transforma la salud. " * 20
+
+
+class FakeSelector:
+    """Devuelve variantes fijas y registra las llamadas."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.variant_calls = []
+
+    def generate_variants(self, prompt, n, model_name="local", limits=None):
+        self.variant_calls.append(n)
+        return self.texts[:n]
+
+    def generate_content(self, prompt, model_name="local", limits=None, stream_truncate=False):
+        raise AssertionError("Con variants > 1 no se genera texto a texto")
+
+
+class TestGenerateVariants(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.config = SimpleNamespace(
+            data_dir=root / "data", media_dir=root / "media", stream_truncate=True,
+            history_enabled=False, fact_check_enabled=False, semantic_cache_enabled=False
+        )
+        self.selector = FakeSelector([SHORT, TOO_LONG, FULL])
+        self.translator = FakeTranslator()
+        self.generator = ContentGenerator(
+            self.config, llm_selector=self.selector, image_generator=object(), translator=self.translator
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_variants_are_ranked_by_score(self):
+        result = self.generator.generate("twitter", "IA en salud", "médicos", variants=3)
+
+        self.assertEqual(self.selector.variant_calls, [3])
+        self.assertEqual(result["content"]["text"], FULL)
+        scores = [variant["score"] for variant in result["variants"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(result["variants"]), 3)  # La demasiado larga se repara
+        self.assertTrue(result["variants"][1]["validation"]["repaired"])
+
+    def test_variants_are_translated_in_one_batch(self):
+        result = self.generator.generate("twitter", "IA en salud", "médicos", language="en", variants=2)
+
+        self.assertEqual(self.translator.requests, 1)
+        self.assertTrue(all(variant["content"]["text"].startswith("[en]") for variant in result["variants"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
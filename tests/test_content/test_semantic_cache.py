@@ -0,0 +1,57 @@
+import time
+import unittest
+from benchmarks.stubs import FakeEmbeddings
+from src.content.semantic_cache import SemanticCache
+from src.utils.helpers import is_available
+
+
+@unittest.skipUnless(is_available("numpy"), "numpy no instalado")
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(FakeEmbeddings(), threshold=0.8, thresholds={"blog": 0.99})
+
+    def test_near_duplicate_hits_within_partition(self):
+        self.cache.store("twitter", "Inteligencia artificial en la salud", "médicos", ["borrador"], partition="local")
+
+        hit = self.cache.lookup("twitter", "inteligencia artificial en salud", "médicos", partition="local")
+        self.assertEqual(hit.texts, ("borrador",))
+        self.assertGreaterEqual(hit.similarity, 0.8)
+        self.assertIsNone(self.cache.lookup("twitter", "recetas de cocina", "médicos", partition="local"))
+        self.assertIsNone(self.cache.lookup("twitter", "inteligencia artificial en salud", "médicos", partition="openai"))
+        self.assertIsNone(self.cache.lookup("twitter", "inteligencia artificial en salud", "médicos",
+                                            partition="local", min_texts=3))
+
+    def test_platform_threshold(self):
+        self.cache.store("blog", "Inteligencia artificial en la salud", "médicos", ["post"])
+        self.assertIsNone(self.cache.lookup("blog", "inteligencia artificial en salud", "médicos"))
+        self.assertIsNotNone(self.cache.lookup("blog", "Inteligencia artificial en la salud", "médicos"))
+
+    def test_lru_and_ttl_eviction(self):
+        cache = SemanticCache(FakeEmbeddings(), threshold=0.99, capacity=2, ttl=0.05)
+        cache.store("twitter", "tema uno", "a", ["1"])
+        cache.store("twitter", "tema dos", "a", ["2"])
+        self.assertIsNotNone(cache.lookup("twitter", "tema uno", "a"))  # Pasa a ser el más reciente
+        cache.store("twitter", "tema tres", "a", ["3"])
+        self.assertIsNone(cache.lookup("twitter", "tema dos", "a"))
+        self.assertIsNotNone(cache.lookup("twitter", "tema uno", "a"))
+
+        time.sleep(0.06)
+        self.assertIsNone(cache.lookup("twitter", "tema uno", "a"))
+        stats = cache.stats()
+        self.assertEqual((stats["evictions"], stats["expirations"], stats["size"]), (1, 2, 0))
+
+    def test_hit_quality_metrics(self):
+        self.cache.store("twitter", "tema", "a", ["x"])
+        self.cache.lookup("twitter", "tema", "a")
+        self.cache.lookup("twitter", "otro asunto distinto", "b")
+        self.cache.record_outcome(valid=True)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertAlmostEqual(stats["mean_hit_similarity"], 1.0, places=5)
+        self.assertEqual(stats["similarity_histogram"]["0.98-1.00"], 1)
+        self.assertEqual(stats["reuse_valid_rate"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from src.content.templates import TemplateRegistry, get_template
+
+class TestTemplateRegistry(unittest.TestCase):
+    def test_get_template_is_cached(self):
+        self.assertIs(get_template("twitter"), get_template("Twitter"))
+        with self.assertRaises(ValueError):
+            get_template("myspace")
+
+    def test_prompt_prefix_is_byte_stable(self):
+        template = get_template("instagram")
+        first = template.build_prompt("IA en salud", "médicos")
+        second = template.build_prompt("energía solar", "estudiantes", "Acme S.A.")
+        self.assertTrue(first.startswith(template.prompt_prefix))
+        self.assertTrue(second.startswith(template.prompt_prefix))
+        self.assertNotIn("IA en salud", template.prompt_prefix)
+        self.assertIn("Acme S.A.", second)
+
+    def test_loads_and_reloads_templates_from_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "newsletter.json"
+            path.write_text(json.dumps({"platform": "Newsletter", "tone": "cercano",
+                                        "max_length": 1000, "style": "resumen"}))
+            registry = TemplateRegistry(tmp, reload_interval=0)
+            self.assertEqual(registry.get("newsletter").max_length, 1000)
+
+            path.write_text(json.dumps({"platform": "Newsletter", "tone": "cercano",
+                                        "max_length": 500, "style": "resumen"}))
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            self.assertEqual(registry.get("newsletter").max_length, 500)
+            self.assertEqual(registry.get("blog").platform, "Blog")
+
+if __name__ == "__main__":
+    unittest.main()
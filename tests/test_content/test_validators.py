@@ -0,0 +1,53 @@
+import unittest
+from src.content.templates import get_template
+from src.content.validators import ContentValidator, scan_content, score_content
+
+class TestContentValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = ContentValidator(config=None)
+
+    def test_scan_counts_in_one_pass(self):
+        stats = scan_content("Hola 👋🏽 mundo #IA #Salud y C# no cuenta\nMeta descripción: " + "x" * 155)
+        self.assertEqual(stats.hashtags, 2)
+        self.assertTrue(stats.has_emoji)
+        self.assertEqual(stats.meta_description_length, 155)
+        self.assertEqual(stats.graphemes, stats.chars - 1)
+
+    def test_structured_violations(self):
+        template = get_template("twitter")
+        text = "La IA transforma la salud. " * 12 + "#a #b #c #d"
+        report = self.validator.validate_content(text, template)
+        self.assertFalse(report["overall_valid"])
+        rules = {v["rule"] for v in report["violations"]}
+        self.assertEqual(rules, {"max_length", "max_hashtags"})
+
+    def test_repair_truncates_at_sentence_and_trims_hashtags(self):
+        template = get_template("twitter")
+        text = "La IA transforma la salud. " * 12 + "#a #b #c #d"
+        report = self.validator.validate_content(text, template)
+        repaired = self.validator.repair_content(text, report, template)
+        self.assertTrue(self.validator.validate_content(repaired, template)["overall_valid"])
+        self.assertTrue(repaired.endswith("."))
+
+    def test_repair_adds_missing_hashtag(self):
+        template = get_template("instagram")
+        report = self.validator.validate_content("Post sin etiquetas ✨", template, {"style": ""})
+        repaired = self.validator.repair_content("Post sin etiquetas ✨", report, template, topic="IA en salud")
+        self.assertTrue(repaired.endswith("#IAEnSalud"))
+
+    def test_score_prefers_valid_and_fuller_variants(self):
+        template = get_template("twitter")
+        short = self.validator.validate_content("Hola.", template)
+        full = self.validator.validate_content("La IA transforma la salud. " * 8, template)
+        too_long = self.validator.validate_content("La IA transforma la salud. " * 20, template)
+        self.assertGreater(score_content(full, template), score_content(short, template))
+        self.assertGreater(score_content(short, template), score_content(too_long, template))
+
+    def test_accepts_template_mapping(self):
+        report = self.validator.validate_content(
+            "Texto", {"platform": "LinkedIn", "tone": "", "max_length": 3000, "style": "", "requires_image": False}
+        )
+        self.assertTrue(report["overall_valid"])
+
+if __name__ == "__main__":
+    unittest.main()
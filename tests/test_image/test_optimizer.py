@@ -0,0 +1,53 @@
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from src.utils.helpers import is_available
+from src.image.optimizer import ImageOptimizer
+
+@unittest.skipUnless(is_available("PIL"), "Pillow no está instalado")
+class TestImageOptimizer(unittest.TestCase):
+    def setUp(self):
+        from PIL import Image
+        self.image = Image.linear_gradient("L").resize((768, 768)).convert("RGB")
+        self.optimizer = ImageOptimizer()
+
+    def test_platform_renditions_fit_size_targets(self):
+        renditions = self.optimizer.optimize(self.image, "blog")
+        self.assertEqual(list(renditions), ["hero", "link_preview", "thumbnail"])
+        thumbnail = renditions["thumbnail"]
+        self.assertEqual((thumbnail.width, thumbnail.height), (400, 225))
+        self.assertLessEqual(len(thumbnail.data), 25_000)
+        # Nunca amplía: el hero conserva el ancho original recortado a 16:9
+        self.assertEqual(renditions["hero"].width, 768)
+
+    def test_save_is_content_addressed(self):
+        renditions = self.optimizer.optimize(self.image, "instagram")
+        with tempfile.TemporaryDirectory() as tmp:
+            first = self.optimizer.save(renditions, Path(tmp))
+            second = self.optimizer.save(renditions, Path(tmp))
+            self.assertEqual(first, second)
+            self.assertTrue(Path(first["feed"]).name.startswith(renditions["feed"].sha256))
+
+    def test_concurrent_saves_of_same_rendition(self):
+        from concurrent.futures import ThreadPoolExecutor
+        renditions = self.optimizer.optimize(self.image, "instagram")
+        with tempfile.TemporaryDirectory() as tmp:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(lambda _: self.optimizer.save(renditions, Path(tmp)), range(16)))
+            self.assertTrue(all(result == results[0] for result in results))
+            self.assertEqual(len(list(Path(tmp).iterdir())), len(renditions))  # Sin temporales huérfanos
+
+    def test_saved_files_get_default_permissions(self):
+        renditions = self.optimizer.optimize(self.image, "instagram")
+        with tempfile.TemporaryDirectory() as tmp:
+            reference = Path(tmp) / "referencia"
+            reference.write_bytes(b"")  # Mismos permisos que cualquier fichero creado con open()
+            expected = stat.S_IMODE(reference.stat().st_mode)
+            for path in self.optimizer.save(renditions, Path(tmp)).values():
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), expected)  # No 0o600 de mkstemp
+
+
+if __name__ == "__main__":
+    unittest.main()
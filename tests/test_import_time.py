@@ -0,0 +1,28 @@
+import unittest
+from benchmarks.import_time import measure_import, load_budget, check_budget, missing_optional_dependency
+
+class TestImportTime(unittest.TestCase):
+    def test_entry_points_within_budget(self):
+        budget = load_budget()
+        results = [measure_import(module) for module in budget]
+        if all(missing_optional_dependency(r["error"]) for r in results):
+            self.skipTest("Ningún punto de entrada es importable en este entorno")
+        self.assertEqual(check_budget(results, budget), [])
+
+    def test_import_errors_are_failures(self):
+        budget = {"src.a": 50, "src.b": 50, "src.c": 50}
+        results = [
+            {"module": "src.a", "error": "ModuleNotFoundError: No module named 'chromadb'"},
+            {"module": "src.b", "error": "SyntaxError: invalid syntax"},
+            {"module": "src.c", "error": "ModuleNotFoundError: No module named 'src.utils.borrado'"},
+        ]
+        failures = check_budget(results, budget)
+        self.assertEqual([failure.split()[0] for failure in failures], ["src.b", "src.c"])
+
+    def test_templates_do_not_load_heavy_backends(self):
+        result = measure_import("src.content.templates")
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["heavy_modules"], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import time
+import unittest
+from benchmarks.stubs import OllamaStubServer
+from src.llms.groq_handler import OpenAICompatibleLLM, RateLimiter, parse_duration
+from src.utils.helpers import is_available
+
+
+class TestRateLimitHeaders(unittest.TestCase):
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("2"), 2.0)
+        self.assertAlmostEqual(parse_duration("1m3.5s"), 63.5)
+        self.assertAlmostEqual(parse_duration("120ms"), 0.12)
+        self.assertIsNone(parse_duration("pronto"))
+        self.assertIsNone(parse_duration(None))
+
+    def test_exhausted_quota_blocks_until_reset(self):
+        limiter = RateLimiter()
+        self.assertIsNone(limiter.update(200, {"x-ratelimit-remaining-requests": "5"}))
+        delay = limiter.update(200, {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "50ms"})
+        self.assertAlmostEqual(delay, 0.05)
+        start = time.monotonic()
+        limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.03)
+
+
+@unittest.skipUnless(is_available("requests"), "requests no instalado")
+class TestOpenAICompatibleLLM(unittest.TestCase):
+    def setUp(self):
+        self.stub = OllamaStubServer(words=40).start()
+        self.llm = OpenAICompatibleLLM(f"{self.stub.url}/v1", "llama3.2", backoff_base=0.01)
+
+    def tearDown(self):
+        self.llm.close()
+        self.stub.stop()
+
+    def test_invoke_respects_max_tokens(self):
+        text = self.llm.invoke("Post sobre IA", max_tokens=5)
+        self.assertEqual(len(text.split()), 5)
+
+    def test_stream_matches_invoke(self):
+        streamed = "".join(self.llm.stream("Post sobre IA", max_tokens=10))
+        self.assertEqual(streamed, self.llm.invoke("Post sobre IA", max_tokens=10))
+
+    def test_stream_decodes_utf8(self):
+        streamed = "".join(self.llm.stream("Post sobre IA"))
+        self.assertIn("✨", streamed)
+        self.assertEqual(streamed, self.llm.invoke("Post sobre IA"))
+
+    def test_retries_after_rate_limit(self):
+        self.stub.rate_limit_failures = 2
+        self.assertTrue(self.llm.invoke("Post sobre IA", max_tokens=3))
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.stub.rate_limit_failures = 10
+        self.llm.max_retries = 1
+        with self.assertRaises(RuntimeError):
+            self.llm.invoke("Post sobre IA")
+
+    def test_n_requires_support(self):
+        with self.assertRaises(ValueError):
+            self.llm.generate("Post sobre IA", n=2)
+        self.llm.supports_n = True
+        self.assertEqual(len(set(self.llm.generate("Post sobre IA", n=3, max_tokens=8))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from src.llms.length_control import TokenEstimator, limits_for_length, truncate_stream
+
+class TestLengthControl(unittest.TestCase):
+    def test_limits_scale_with_platform_length(self):
+        twitter = limits_for_length(280)
+        blog = limits_for_length(5000)
+        self.assertGreater(twitter.max_tokens, 280 / 6)
+        self.assertLess(twitter.max_tokens, 280)
+        self.assertGreater(blog.max_tokens, twitter.max_tokens)
+        self.assertEqual(limits_for_length(63206).max_tokens, 4096)
+
+    def test_fixed_ratio_estimator(self):
+        self.assertEqual(TokenEstimator(chars_per_token=4).tokens_for_chars(280), 70)
+
+    def test_truncate_stream_stops_consuming(self):
+        consumed = []
+
+        def stream():
+            for i in range(100):
+                consumed.append(i)
+                yield f"Frase número {i}. "
+
+        text = truncate_stream(stream(), 60)
+        self.assertLessEqual(len(text), 60)
+        self.assertTrue(text.endswith("."))
+        self.assertLess(len(consumed), 10)
+
+if __name__ == "__main__":
+    unittest.main()
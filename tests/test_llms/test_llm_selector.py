@@ -0,0 +1,40 @@
+import unittest
+from types import SimpleNamespace
+from benchmarks.stubs import OllamaStubServer
+from src.llms.length_control import limits_for_length
+from src.llms.llm_selector import LLMSelector
+from src.utils.helpers import is_available
+
+
+@unittest.skipUnless(is_available("requests"), "requests no instalado")
+class TestGenerateVariants(unittest.TestCase):
+    def setUp(self):
+        self.stub = OllamaStubServer(words=80).start()
+
+    def tearDown(self):
+        for model in self.selector.models.values():
+            model.close()
+        self.stub.stop()
+
+    def _selector(self, provider):
+        self.selector = LLMSelector(SimpleNamespace(
+            llm_provider=provider, llm_base_url=f"{self.stub.url}/v1", llm_model="llama3.2", llm_api_key=None,
+            llm_connect_timeout=2.0, llm_read_timeout=10.0, llm_max_retries=0
+        ))
+        return self.selector
+
+    def test_uses_n_in_one_request_when_supported(self):
+        texts = self._selector("vllm").generate_variants("Post sobre IA", 3)
+        self.assertEqual(self.stub.requests, 1)
+        self.assertEqual(len(set(texts)), 3)
+
+    def test_falls_back_to_parallel_requests(self):
+        limits = limits_for_length(280)
+        texts = self._selector("llamacpp").generate_variants("Post sobre IA", 3, limits=limits)
+        self.assertEqual(self.stub.requests, 3)
+        self.assertEqual(len(texts), 3)
+        self.assertTrue(all(len(text) <= limits.max_chars for text in texts))
+
+
+if __name__ == "__main__":
+    unittest.main()
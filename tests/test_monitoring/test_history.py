@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from pathlib import Path
+from src.monitoring.history import BUCKET_SECONDS, GenerationRecord, HistoryStore
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(Path(self.tmp.name) / "history.sqlite3", flush_interval=0.05)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _record(self, created_at, platform="twitter", model="local", **kwargs):
+        self.store.record(GenerationRecord(
+            created_at=created_at, platform=platform, language="es", model=model, **kwargs
+        ))
+
+    def test_rollups_aggregate_batches(self):
+        base = 1_700_000_000 // BUCKET_SECONDS * BUCKET_SECONDS
+        self._record(base + 10, total_ms=100, completion_tokens=50)
+        self._record(base + 20, total_ms=300, valid=False, error="ValueError")
+        self.assertTrue(self.store.flush())
+        # Segundo lote sobre el mismo grupo: el UPSERT acumula
+        self._record(base + 30, platform="blog", total_ms=200, cache_hit=True)
+        self._record(base + 40, total_ms=200)
+        self.assertTrue(self.store.flush())
+
+        rows = {row["platform"]: row for row in self.store.rollups()}
+        self.assertEqual(rows["twitter"]["count"], 3)
+        self.assertEqual(rows["twitter"]["errors"], 1)
+        self.assertAlmostEqual(rows["twitter"]["avg_total_ms"], 200)
+        self.assertAlmostEqual(rows["twitter"]["valid_rate"], 2 / 3)
+        self.assertEqual(rows["twitter"]["completion_tokens"], 50)
+        self.assertEqual(rows["blog"]["cache_hit_rate"], 1.0)
+
+    def test_rollups_filter_and_group_by_time(self):
+        base = 1_700_000_000 // BUCKET_SECONDS * BUCKET_SECONDS
+        self._record(base + 5)
+        self._record(base + BUCKET_SECONDS + 5, model="openai")
+        self.store.flush()
+
+        hours = self.store.rollups(since=base + BUCKET_SECONDS, group_by=("hour", "model"))
+        self.assertEqual(hours, [dict(hours[0], hour=base + BUCKET_SECONDS, model="openai")])
+        self.assertEqual(hours[0]["count"], 1)
+        with self.assertRaises(ValueError):
+            self.store.rollups(group_by=("topic",))
+
+    def test_recent_is_newest_first(self):
+        for i in range(5):
+            self._record(1_700_000_000 + i, platform="blog" if i % 2 else "twitter")
+        self.store.flush()
+        recent = self.store.recent(limit=2, platform="blog")
+        self.assertEqual([row["created_at"] for row in recent], [1_700_000_003, 1_700_000_001])
+
+
+if __name__ == "__main__":
+    unittest.main()
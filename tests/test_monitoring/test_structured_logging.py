@@ -0,0 +1,74 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from src.monitoring.structured_logging import (
+    SamplingFilter, log_artifacts, parse_sampling, setup_logging, shutdown_logging
+)
+
+
+class TestStructuredLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_dir = Path(self.tmp.name)
+        self.previous = logging.getLogger().handlers[:], logging.getLogger().level
+
+    def tearDown(self):
+        shutdown_logging()
+        root = logging.getLogger()
+        root.handlers[:], level = self.previous
+        root.setLevel(level)
+        self.tmp.cleanup()
+
+    def _lines(self):
+        shutdown_logging()  # Vacía la cola antes de leer
+        return [json.loads(line) for line in (self.log_dir / "app.log").read_text(encoding="utf-8").splitlines()]
+
+    def test_json_records_reference_compressed_artifacts(self):
+        store = setup_logging(self.log_dir, level="DEBUG", console_format="%(message)s")
+        prompt = "Escribe un post sobre IA. " * 500
+        logging.getLogger("src.content.generator").debug(
+            "Prompt generado", extra={"platform": "blog", **log_artifacts(prompt=prompt)}
+        )
+
+        [entry] = [line for line in self._lines() if line["message"] == "Prompt generado"]
+        self.assertEqual(entry["platform"], "blog")
+        self.assertEqual(entry["level"], "DEBUG")
+        self.assertNotIn(prompt, json.dumps(entry))
+        reference = entry["artifacts"]["prompt"]
+        self.assertEqual(store.get(reference), prompt)
+        self.assertLess((store.directory / reference).stat().st_size, len(prompt) // 10)
+
+    def test_sampling_only_drops_verbose_records(self):
+        setup_logging(self.log_dir, level="DEBUG", sampling=parse_sampling("src.content=0"))
+        logger = logging.getLogger("src.content.generator")
+        logger.info("descartado")
+        logger.warning("conservado")
+        logging.getLogger("src.api").info("sin regla")
+
+        messages = [line["message"] for line in self._lines()]
+        self.assertEqual(messages, ["conservado", "sin regla"])
+
+    def test_exception_is_kept_apart_from_message(self):
+        setup_logging(self.log_dir, console_format="%(message)s")
+        try:
+            raise ValueError("fallo de prueba")
+        except ValueError:
+            logging.getLogger("src.api").exception("Error procesando %s", "petición")
+
+        [entry] = self._lines()
+        self.assertEqual(entry["message"], "Error procesando petición")
+        self.assertIn("Traceback", entry["exception"])
+        self.assertIn("ValueError: fallo de prueba", entry["exception"])
+
+    def test_longest_prefix_wins(self):
+        sampling = SamplingFilter({"src": 0.0, "src.api": 1.0}, seed=1)
+        record = logging.LogRecord("src.api.middleware", logging.INFO, "", 0, "x", (), None)
+        self.assertTrue(sampling.filter(record))
+        record.name = "src.content"
+        self.assertFalse(sampling.filter(record))
+
+
+if __name__ == "__main__":
+    unittest.main()
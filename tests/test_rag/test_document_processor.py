@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from benchmarks.stubs import FakeEmbeddings
+from src.rag.document_processor import DocumentProcessor
+from src.utils.helpers import is_available
+
+
+def paper(i):
+    return {"title": f"Paper {i}", "abstract": f"Resumen del paper {i} sobre IA en salud.",
+            "authors": ["Autora"], "url": f"http://arxiv.org/abs/{i}"}
+
+
+@unittest.skipUnless(is_available("chromadb") and is_available("langchain"), "chromadb o langchain no instalados")
+class TestDocumentProcessorWithSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.config = SimpleNamespace(
+            chroma_persist_directory=str(root / "chroma"), rag_snapshot=root / "kb.snap", rag_rescore=True
+        )
+        self.embeddings = FakeEmbeddings()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_go_to_chroma_while_queries_use_snapshot(self):
+        writer = DocumentProcessor(self.config, embeddings=self.embeddings, use_snapshot=False)
+        writer.process_papers([paper(1), paper(2)])
+        writer.export_snapshot(self.config.rag_snapshot)
+
+        processor = DocumentProcessor(self.config, embeddings=self.embeddings)
+        self.assertEqual(len(processor.vector_store), 2)
+        processor.process_papers([paper(2), paper(3)])  # El 2 se sustituye (mismo id)
+        self.assertEqual(processor.compact_vector_store(), 0)
+        header = processor.export_snapshot(self.config.rag_snapshot)
+        self.assertEqual(header["count"], 3)
+
+        processor.load_vector_store()
+        [result] = processor.query_knowledge_base("Paper 3", k=1)
+        self.assertIn("source", result["metadata"])
+
+
+if __name__ == "__main__":
+    unittest.main()
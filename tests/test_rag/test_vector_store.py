@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+from pathlib import Path
+from src.rag.vector_store import SnapshotStore, compact_snapshot, write_snapshot
+from src.utils.helpers import is_available
+
+
+@unittest.skipUnless(is_available("numpy"), "numpy no instalado")
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        self.np = np
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "kb.snap"
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(300, 384)).astype(np.float32)
+        self.texts = [f"fragmento {i}" for i in range(300)]
+        self.metadatas = [{"source": f"paper-{i // 3}"} for i in range(300)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _exact_top(self, query, k):
+        np = self.np
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        return list(np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:k])
+
+    def test_round_trip_matches_exact_search(self):
+        batches = [(self.vectors[i:i + 100], self.texts[i:i + 100], self.metadatas[i:i + 100], None)
+                   for i in range(0, 300, 100)]
+        header = write_snapshot(self.path, iter(batches))
+        self.assertEqual((header["count"], header["dim"]), (300, 384))
+
+        store = SnapshotStore(self.path, block_size=128)
+        try:
+            query = self.vectors[42] + 0.1
+            hits = store.search([query], k=5)[0]
+            self.assertEqual([index for index, _ in hits], self._exact_top(query, 5))
+            [document] = store.similarity_search_by_vector(query, k=1)
+            self.assertEqual((document.page_content, document.metadata), ("fragmento 42", {"source": "paper-14"}))
+            with self.assertRaises(RuntimeError):
+                store.add_texts(["nuevo"])
+        finally:
+            store.close()
+
+    def test_int8_only_snapshot_keeps_ranking_close(self):
+        write_snapshot(self.path, iter([(self.vectors, self.texts, self.metadatas, None)]), rescore=False)
+        store = SnapshotStore(self.path)
+        try:
+            self.assertIsNone(store.vectors)
+            query = self.vectors[7]
+            self.assertEqual(store.search([query], k=1)[0][0][0], 7)
+            self.assertLess(self.path.stat().st_size, self.vectors.nbytes * 0.4)
+        finally:
+            store.close()
+
+    def test_compaction_drops_duplicates(self):
+        duplicated = (self.np.vstack([self.vectors, self.vectors[:50]]),
+                      self.texts + self.texts[:50], self.metadatas + self.metadatas[:50], None)
+        header = write_snapshot(self.path, iter([duplicated]), dedupe=False)
+        self.assertEqual(header["count"], 350)
+
+        result = compact_snapshot(self.path, self.path)
+        self.assertEqual((result["count"], result["duplicates"]), (300, 50))
+        store = SnapshotStore(self.path)
+        try:
+            self.assertEqual(len(store), 300)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from types import SimpleNamespace
+import src.translation.translator as translator_module
+from src.translation.translator import BATCH_SEPARATOR, MAX_REQUEST_CHARS, Translator
+
+
+class FakeGoogleTranslator:
+    """Sustituto de deep_translator.GoogleTranslator que registra cada petición."""
+    requests = []
+    keep_separator = True
+
+    def __init__(self, source, target):
+        pass
+
+    def translate(self, text):
+        FakeGoogleTranslator.requests.append(text)
+        if not self.keep_separator:
+            text = text.replace("⁂", "")  # Como un traductor que "limpia" el símbolo
+        return text.upper()
+
+
+class TestTranslateBatch(unittest.TestCase):
+    def setUp(self):
+        self.previous = translator_module.deep_translator
+        translator_module.deep_translator = SimpleNamespace(GoogleTranslator=FakeGoogleTranslator)
+        FakeGoogleTranslator.requests = []
+        FakeGoogleTranslator.keep_separator = True
+        self.translator = Translator(config=None)
+
+    def tearDown(self):
+        translator_module.deep_translator = self.previous
+
+    def test_joins_texts_in_one_request(self):
+        texts = ["Primera variante.", "Segunda variante.", "Tercera variante."]
+        translated = self.translator.translate_batch(texts, "en")
+
+        self.assertEqual(len(FakeGoogleTranslator.requests), 1)
+        self.assertIn(BATCH_SEPARATOR, FakeGoogleTranslator.requests[0])
+        self.assertEqual(translated, [text.upper() for text in texts])
+
+    def test_falls_back_per_item_when_separator_is_lost(self):
+        FakeGoogleTranslator.keep_separator = False
+        texts = ["Primera variante.", "Segunda variante."]
+        translated = self.translator.translate_batch(texts, "en")
+
+        self.assertEqual(len(FakeGoogleTranslator.requests), 3)  # El lote fallido y uno por texto
+        self.assertEqual(translated, [text.upper() for text in texts])
+
+    def test_texts_over_request_limit_go_one_by_one(self):
+        texts = ["a" * MAX_REQUEST_CHARS, "b"]
+        translated = self.translator.translate_batch(texts, "fr")
+
+        self.assertEqual(FakeGoogleTranslator.requests, texts)
+        self.assertEqual(translated, [text.upper() for text in texts])
+
+
+if __name__ == "__main__":
+    unittest.main()